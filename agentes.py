@@ -1,5 +1,8 @@
 from mesa import Agent
-from objetos import Recurso, Estrutura
+from crencas import BaseCrencas, CONFIRMADO
+from memoria import nova_memoria
+from fronteira import MapaExploracao
+import alocacao
 import math
 import random
 
@@ -11,6 +14,7 @@ class AgenteReativoSimples(Agent):
         self.base_pos = base_pos
         self.recurso_atual = None  # agente está transportando um recurso
         self.pontuacao = 0
+        self.entregas = 0
        
 
     def step(self):
@@ -19,36 +23,41 @@ class AgenteReativoSimples(Agent):
         else:
             self.explorar_ambiente()
 
+    def advance(self):
+        """ Ativação simultânea: efetiva o movimento e a coleta decididos no step(). """
+        if not self.model.efetivar(self):
+            self.recurso_atual = None  # outro agente ficou com o recurso
+
     def explorar_ambiente(self):
       """ Move aleatoriamente pelo ambiente e coleta recursos leves (ignorando estruturas). """
-      vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
-      vizinhos_livres = [pos for pos in vizinhos if not any(isinstance(obj, Estrutura) for obj in self.model.grid.get_cell_list_contents(pos))]
+      vizinhos_livres = self.model.navegacao.vizinhos_livres(self.pos)
 
       if vizinhos_livres:
           nova_pos = self.random.choice(vizinhos_livres)
-          self.model.grid.move_agent(self, nova_pos)
+          self.model.mover(self, nova_pos)
 
           # Verifica se há um recurso leve na nova posição e inicia transporte
-          for objeto in self.model.grid.get_cell_list_contents(nova_pos):
-              if isinstance(objeto, Recurso) and objeto.tipo in ["Cristal", "Metal"] and not objeto.transportado:
-                  self.recurso_atual = objeto
-                  objeto.transportado = True  # Marca o recurso como coletado
-                  self.model.grid.remove_agent(objeto)  # Remove o recurso do grid
-                  return  # Fim do passo
+          recurso = self.model.recurso_em(nova_pos)
+          if recurso is not None:
+              self.recurso_atual = recurso
+              self.model.coletar(self, recurso)  # Marca como coletado e remove do grid
+              return  # Fim do passo
       else:
-          print(f"Agente {self.unique_id} não encontrou um caminho livre, tentando novamente.")
+          self.model.eventos.debug("sem_caminho_livre", agente=self.unique_id)
 
     def mover_para_base(self):
         """ Move o agente em direção à base para entregar o recurso coletado. """
         if self.pos != self.base_pos:
-            self.mover_em_direcao(self.base_pos)
+            if not self.model.viajar_para_base(self):
+                self.mover_em_direcao(self.base_pos)
         else:
             # Entrega o recurso na base e reinicia a exploração
             if self.recurso_atual:
-                self.model.base.registrar_recurso(self.recurso_atual)
+                self.model.base.registrar_recurso(self.recurso_atual, self)
     
                 self.pontuacao += self.recurso_atual.utilidade
-                print(f"Agente {self.unique_id} entregou {self.recurso_atual.tipo}, pontuação: {self.pontuacao}")
+                self.entregas += 1
+                self.model.eventos.info("entrega", agente=self.unique_id, recurso=self.recurso_atual.tipo, pontuacao=self.pontuacao)
 
                 self.recurso_atual = None
 
@@ -56,13 +65,10 @@ class AgenteReativoSimples(Agent):
             self.explorar_ambiente()
 
     def mover_em_direcao(self, destino):
-        """ Move um passo na direção do destino. """
-        dx, dy = destino[0] - self.pos[0], destino[1] - self.pos[1]
-        nova_pos = (self.pos[0] + (1 if dx > 0 else -1 if dx < 0 else 0),
-                    self.pos[1] + (1 if dy > 0 else -1 if dy < 0 else 0))
-
-        if not self.model.grid.out_of_bounds(nova_pos):
-            self.model.grid.move_agent(self, nova_pos)
+        """ Move um passo na direção do destino, seguindo o campo de distâncias compartilhado do modelo. """
+        nova_pos = self.model.navegacao.proximo_passo(self.pos, destino, self.unique_id)
+        if nova_pos is not None:
+            self.model.mover(self, nova_pos)
  
 
 #------------------------------------------------------------------------
@@ -74,12 +80,12 @@ class AgenteBaseadoEmEstado(Agent):
         super().__init__(unique_id, model)
         self.base_pos = base_pos
         self.recurso_atual = None
-        self.historico_movimento = set()
-        self.registros_locais = []  # Armazena informações sobre recursos e estruturas
+        self.memoria = nova_memoria(model.width, model.height)  # Células visitadas e recursos e estruturas avistados
         self.estado = "explorando"
         self.destino_atual = None
         self.objetivo_atual = "explorar"
         self.pontuacao = 0
+        self.entregas = 0
                 
  
     def step(self):
@@ -92,23 +98,36 @@ class AgenteBaseadoEmEstado(Agent):
         elif self.objetivo_atual == "buscar_recurso":
             if self.destino_atual:
                 self.mover_em_direcao(self.destino_atual)
+                if self.pos == self.destino_atual:
+                    self.objetivo_atual = "coletar"
             else:
                 self.destino_atual = None
                 self.explorar_ambiente()
         elif self.objetivo_atual == "coletar":
             self.tentar_coletar_recurso()
+        elif self.objetivo_atual == "explorar_fronteira":
+            self.seguir_para_fronteira()
         else:
             self.explorar_ambiente()
 
+    def advance(self):
+        """ Ativação simultânea: efetiva o movimento e a coleta decididos no step(). """
+        if not self.model.efetivar(self):
+            self.recurso_atual = None  # outro agente ficou com o recurso
+            self.destino_atual = None
+            self.objetivo_atual = "explorar"
+
     def mover_para_base(self):
         """ Move para a base para entregar o recurso e define um novo objetivo. """
         if self.pos != self.base_pos:
-            self.mover_em_direcao(self.base_pos)
+            if not self.model.viajar_para_base(self):
+                self.mover_em_direcao(self.base_pos)
         else:
-            if isinstance(self.recurso_atual, Recurso):
-                self.model.base.registrar_recurso(self.recurso_atual)
+            if self.recurso_atual is not None:
+                self.model.base.registrar_recurso(self.recurso_atual, self)
                 self.pontuacao += self.recurso_atual.utilidade
-                print(f"Agente {self.unique_id} entregou {self.recurso_atual.tipo}, pontuação: {self.pontuacao}")
+                self.entregas += 1
+                self.model.eventos.info("entrega", agente=self.unique_id, recurso=self.recurso_atual.tipo, pontuacao=self.pontuacao)
                 self.recurso_atual = None
 
             self.recurso_atual = None
@@ -119,43 +138,79 @@ class AgenteBaseadoEmEstado(Agent):
 
     def explorar_ambiente(self):
         """ Explora e registra informações sobre recursos e estruturas. """
-        vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
-        vizinhos_nao_visitados = [pos for pos in vizinhos if pos not in self.historico_movimento]
-
-        melhor_pos = random.choice(vizinhos_nao_visitados) if vizinhos_nao_visitados else random.choice(vizinhos)
-        self.model.grid.move_agent(self, melhor_pos)
-        self.historico_movimento.add(melhor_pos)
-
-        objetos = self.model.grid.get_cell_list_contents(melhor_pos)
-        for objeto in objetos:
-            if isinstance(objeto, Estrutura):
-                self.registros_locais.append({"tipo": "Estrutura", "pos": objeto.pos})  
-            elif isinstance(objeto, Recurso) and not objeto.transportado:
-                self.registros_locais.append({"tipo": objeto.tipo, "pos": objeto.pos})  
-                if not self.recurso_atual:
-                    self.recurso_atual = objeto
-                    objeto.transportado = True
-                    self.model.grid.remove_agent(objeto)
-                    self.objetivo_atual = "transportar"
-                    return
-
-    def definir_destino(self, destino):
+        vizinhos = self.model.navegacao.vizinhos_livres(self.pos)
+        if not vizinhos:
+            self.model.eventos.debug("sem_caminho_livre", agente=self.unique_id)
+            return
+        vizinhos_nao_visitados = [pos for pos in vizinhos if not self.memoria.visitada(pos)]
+
+        melhor_pos = self.random.choice(vizinhos_nao_visitados) if vizinhos_nao_visitados else self.random.choice(vizinhos)
+        self.model.mover(self, melhor_pos)
+        self.memoria.visitar(melhor_pos)
+
+        for pos in self.model.navegacao.vizinhos_bloqueados(melhor_pos):
+            self.memoria.registrar("Estrutura", pos)
+        self.perceber_recursos()
+        recurso = self.model.recurso_em(melhor_pos)
+        if recurso is not None:
+            self.memoria.registrar(recurso.tipo, recurso.pos)
+            if not self.recurso_atual:
+                self.recurso_atual = recurso
+                self.model.coletar(self, recurso)
+                self.objetivo_atual = "transportar"
+                return
+
+    def seguir_para_fronteira(self):
+        """ Anda até o alvo de fronteira indicado pelo BDI, registrando o caminho e coletando o que encontrar. """
+        self.mover_em_direcao(self.destino_atual)
+        self.memoria.visitar(self.pos)
+        for pos in self.model.navegacao.vizinhos_bloqueados(self.pos):
+            self.memoria.registrar("Estrutura", pos)
+        recurso = self.model.recurso_em(self.pos)
+        if recurso is not None:
+            self.memoria.registrar(recurso.tipo, recurso.pos)
+            self.recurso_atual = recurso
+            self.model.coletar(self, recurso)
+            self.destino_atual = None
+            self.objetivo_atual = "transportar"
+        elif self.pos == self.destino_atual:
+            self.destino_atual = None
+            self.objetivo_atual = "explorar"
+
+    def tentar_coletar_recurso(self):
+        """ Coleta o recurso no destino alcançado; se ele já não estiver lá, volta a explorar. """
+        recurso = self.model.recurso_em(self.pos)
+        if recurso is not None:
+            self.recurso_atual = recurso
+            self.model.coletar(self, recurso)
+            self.objetivo_atual = "transportar"
+            return
+
+        self.destino_atual = None
+        self.objetivo_atual = "explorar"
+
+    def definir_destino(self, destino, objetivo="buscar_recurso"):
         """ Define um novo destino baseado em informações do BDI ou lógica interna. """
         if destino:
             self.destino_atual = destino
-            self.objetivo_atual = "buscar_recurso"
+            self.objetivo_atual = objetivo
         else:
             self.objetivo_atual = "explorar"
 
     def mover_em_direcao(self, destino):
-        """Move um passo na direção do destino de maneira eficiente, usando distância euclidiana."""
+        """Move um passo na direção do destino pelo menor caminho que contorna as estruturas."""
         if not destino:
             return
 
-        vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
-        melhor_pos = min(vizinhos, key=lambda p: math.dist(p, destino))  # 🚀 Escolhe o vizinho mais próximo do destino
+        melhor_pos = self.model.navegacao.proximo_passo(self.pos, destino, self.unique_id)  # 🚀 Menor caminho, contornando estruturas
+        if melhor_pos is not None:
+            self.model.mover(self, melhor_pos)
+            self.perceber_recursos()
 
-        self.model.grid.move_agent(self, melhor_pos)
+    def perceber_recursos(self):
+        """ Registra na memória os recursos da célula atual e das vizinhas, inclusive os que não vai coletar. """
+        for recurso in self.model.recursos_vizinhos(self.pos):
+            self.memoria.registrar(recurso.tipo, recurso.pos)
 
  
 
@@ -169,9 +224,10 @@ class AgenteBaseadoEmObjetivos(Agent):
         self.base_pos = base_pos
         self.recurso_atual = None  # Inicialmente sem recurso
         self.destino_recurso = None
-        self.registros_locais = []  # Guarda informações de recursos e estruturas
+        self.memoria = nova_memoria(model.width, model.height)  # Guarda informações de recursos e estruturas
         self.objetivo_atual = "explorar"
         self.pontuacao = 0
+        self.entregas = 0
 
     def step(self):
         """ Executa ações estratégicas conforme o estado do agente. """
@@ -191,63 +247,89 @@ class AgenteBaseadoEmObjetivos(Agent):
 
         elif self.objetivo_atual == "coletar":
             self.tentar_coletar_recurso()
-            
+
+        elif self.objetivo_atual == "explorar_fronteira":
+            self.seguir_para_fronteira()
+
         elif self.objetivo_atual == "explorar":
             self.explorar_ambiente()
 
         else:
             self.explorar_ambiente()
 
+    def advance(self):
+        """ Ativação simultânea: efetiva o movimento e a coleta decididos no step(). """
+        if not self.model.efetivar(self):
+            self.recurso_atual = None  # outro agente ficou com o recurso
+            self.destino_recurso = None
+            self.objetivo_atual = "explorar"
+
     def explorar_ambiente(self):
         """ Registra estruturas e recursos no ambiente. """
-        vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
-        recursos_proximos = [obj for obj in self.model.grid.get_cell_list_contents(self.pos) if isinstance(obj, Recurso) and not obj.transportado]
-
-        if recursos_proximos:
+        if self.model.recurso_em(self.pos) is not None:
             self.objetivo_atual = "coletar"
             self.tentar_coletar_recurso()
         else:
-            # Movimenta estrategicamente sem interagir com estruturas
-            nova_pos = random.choice(vizinhos)
-            self.model.grid.move_agent(self, nova_pos)
-
-            objetos = self.model.grid.get_cell_list_contents(nova_pos)
-            for objeto in objetos:
-                if isinstance(objeto, Estrutura):
-                    self.registros_locais.append({"tipo": "Estrutura", "pos": objeto.pos})  # Registra a estrutura
-                elif isinstance(objeto, Recurso) and not objeto.transportado:
-                    self.registros_locais.append({"tipo": objeto.tipo, "pos": objeto.pos})
-
-    def definir_destino(self, destino):
-        """ Define o destino do agente para buscar um recurso. """
+            # Movimenta estrategicamente, contornando as estruturas
+            vizinhos = self.model.navegacao.vizinhos_livres(self.pos)
+            if not vizinhos:
+                self.model.eventos.debug("sem_caminho_livre", agente=self.unique_id)
+                return
+            nova_pos = self.random.choice(vizinhos)
+            self.model.mover(self, nova_pos)
+            self.memoria.visitar(nova_pos)
+
+            for pos in self.model.navegacao.vizinhos_bloqueados(nova_pos):
+                self.memoria.registrar("Estrutura", pos)  # Registra as estruturas vistas
+            self.perceber_recursos()
+
+    def definir_destino(self, destino, objetivo="buscar_recurso"):
+        """ Define o destino do agente para buscar um recurso (ou, com `objetivo`, explorar a fronteira). """
         if destino:
             self.destino_recurso = destino
-            self.objetivo_atual = "buscar_recurso"
+            self.objetivo_atual = objetivo
         else:
             self.objetivo_atual = "explorar"
 
+    def seguir_para_fronteira(self):
+        """ Anda até o alvo de fronteira indicado pelo BDI, registrando o caminho e coletando o que encontrar. """
+        self.mover_em_direcao(self.destino_recurso)
+        self.memoria.visitar(self.pos)
+        for pos in self.model.navegacao.vizinhos_bloqueados(self.pos):
+            self.memoria.registrar("Estrutura", pos)
+        recurso = self.model.recurso_em(self.pos)
+        if recurso is not None:
+            self.memoria.registrar(recurso.tipo, recurso.pos)
+            self.recurso_atual = recurso
+            self.model.coletar(self, recurso)
+            self.destino_recurso = None
+            self.objetivo_atual = "transportar"
+        elif self.pos == self.destino_recurso:
+            self.destino_recurso = None
+            self.objetivo_atual = "explorar"
+
     def tentar_coletar_recurso(self):
         """ Coleta um recurso e muda para transporte. """
-        objetos = self.model.grid.get_cell_list_contents(self.pos)
-        for obj in objetos:
-            if isinstance(obj, Recurso) and not obj.transportado:
-                self.recurso_atual = obj
-                obj.transportado = True  # Marca o recurso como coletado
-                self.model.grid.remove_agent(obj)  # Remove o recurso do grid
-                self.objetivo_atual = "transportar"
-                return
+        recurso = self.model.recurso_em(self.pos)
+        if recurso is not None:
+            self.recurso_atual = recurso
+            self.model.coletar(self, recurso)  # Marca como coletado e remove do grid
+            self.objetivo_atual = "transportar"
+            return
 
         self.definir_destino(self.recurso_mais_proximo())
 
     def mover_para_base(self):
         """ Move para a base para entregar o recurso e continua explorando. """
         if self.pos != self.base_pos:
-            self.mover_em_direcao(self.base_pos)
+            if not self.model.viajar_para_base(self):
+                self.mover_em_direcao(self.base_pos)
         else:
-            if isinstance(self.recurso_atual, Recurso):  # Garante que é um objeto válido
-                self.model.base.registrar_recurso(self.recurso_atual)
+            if self.recurso_atual is not None:  # Garante que há um recurso sendo carregado
+                self.model.base.registrar_recurso(self.recurso_atual, self)
                 self.pontuacao += self.recurso_atual.utilidade
-                print(f"Agente {self.unique_id} entregou {self.recurso_atual.tipo}, pontuação: {self.pontuacao}")
+                self.entregas += 1
+                self.model.eventos.info("entrega", agente=self.unique_id, recurso=self.recurso_atual.tipo, pontuacao=self.pontuacao)
 
                 self.recurso_atual = None  # Após a entrega, ele não carrega mais um recurso
 
@@ -258,23 +340,25 @@ class AgenteBaseadoEmObjetivos(Agent):
             self.objetivo_atual = "explorar"
 
     def mover_em_direcao(self, destino):
-        """Move um passo na direção do destino de maneira eficiente."""
+        """Move um passo na direção do destino pelo menor caminho que contorna as estruturas."""
         if not destino:
             return
 
-        vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
-        melhor_pos = min(vizinhos, key=lambda p: math.hypot(destino[0] - p[0], destino[1] - p[1]))  # Escolhe o vizinho mais próximo do destino
+        melhor_pos = self.model.navegacao.proximo_passo(self.pos, destino, self.unique_id)  # Menor caminho, contornando estruturas
+        if melhor_pos is not None:
+            self.model.mover(self, melhor_pos)
+            self.perceber_recursos()
 
-        self.model.grid.move_agent(self, melhor_pos)
+    def perceber_recursos(self):
+        """ Registra na memória os recursos da célula atual e das vizinhas, inclusive os que não vai coletar. """
+        for recurso in self.model.recursos_vizinhos(self.pos):
+            self.memoria.registrar(recurso.tipo, recurso.pos)
 
 
     def recurso_mais_proximo(self):
-        """ Retorna o recurso mais próximo para coleta. """
-        recursos = [ag for ag in self.model.schedule.agents if isinstance(ag, Recurso) and not ag.transportado]
-        if not recursos:
-            return None
-        mais_proximo = min(recursos, key=lambda r: math.hypot(r.pos[0] - self.pos[0], r.pos[1] - self.pos[1]))
-        return mais_proximo.pos
+        """ Retorna a posição do recurso disponível mais próximo, consultando o índice espacial do modelo. """
+        mais_proximo = self.model.indice_recursos.mais_proximo(self.pos)
+        return mais_proximo.pos if mais_proximo else None
 
 
 
@@ -284,7 +368,6 @@ class AgenteBaseadoEmObjetivos(Agent):
 import random
 import math
 from mesa import Agent
-from objetos import Recurso, Estrutura
 
 class AgenteCooperativo(Agent):
     """ Agente que explora o ambiente, armazena percepções e otimiza a coleta de recursos. """
@@ -294,9 +377,10 @@ class AgenteCooperativo(Agent):
         self.base_pos = base_pos
         self.recurso_atual = None  # Inicialmente sem recurso
         self.destino_recurso = None
-        self.registros_locais = []  # Registros de exploração e recursos descobertos
+        self.memoria = nova_memoria(model.width, model.height)  # Registros de exploração e recursos descobertos
         self.objetivo_atual = "explorar"
         self.pontuacao = 0
+        self.entregas = 0
 
     def step(self):
         """ Executa ações com base na análise do ambiente e registro de percepções. """
@@ -307,31 +391,37 @@ class AgenteCooperativo(Agent):
         else:
             self.analisar_ambiente()
 
+    def advance(self):
+        """ Ativação simultânea: efetiva o movimento e a coleta decididos no step(). """
+        if not self.model.efetivar(self):
+            self.recurso_atual = None  # outro agente ficou com o recurso
+            self.destino_recurso = None
+
     def analisar_ambiente(self):
         """ Explora o ambiente e define o melhor curso de ação com base nas percepções acumuladas. """
-        objetos = self.model.grid.get_cell_list_contents(self.pos)
-        recursos_disponiveis = [obj for obj in objetos if isinstance(obj, Recurso) and not obj.transportado]
+        recurso = self.model.recurso_em(self.pos)
 
-        if recursos_disponiveis:
-            melhor_recurso = max(recursos_disponiveis, key=lambda r: r.utilidade / (self.distancia_para_base(r.pos) + 1))
-            self.destino_recurso = melhor_recurso.pos
+        if recurso is not None:
+            self.destino_recurso = recurso.pos
         else:
             self.explorar_ambiente()
 
-        for obj in objetos:
-            if isinstance(obj, Estrutura):
-                self._registrar_local("Estrutura", obj.pos)
-            elif isinstance(obj, Recurso) and not obj.transportado:
-                self._registrar_local("Recurso", obj.pos)
+        for pos in self.model.navegacao.vizinhos_bloqueados(self.pos):
+            self._registrar_local("Estrutura", pos)
+        if recurso is not None:
+            self._registrar_local("Recurso", recurso.pos)
 
     def mover_para_base(self):
         """ Move para a base e envia informações para o BDI após entregar um recurso. """
         if self.pos != self.base_pos:
-            self.mover_em_direcao(self.base_pos)
+            if not self.model.viajar_para_base(self):
+                self.mover_em_direcao(self.base_pos)
         else:
-            if isinstance(self.recurso_atual, Recurso):  # Garante que é um objeto válido
-                self.model.base.registrar_recurso(self.recurso_atual)
+            if self.recurso_atual is not None:  # Garante que há um recurso sendo carregado
+                self.model.base.registrar_recurso(self.recurso_atual, self)
                 self.pontuacao += self.recurso_atual.utilidade
+                self.entregas += 1
+                self.model.eventos.info("entrega", agente=self.unique_id, recurso=self.recurso_atual.tipo, pontuacao=self.pontuacao)
                 self.recurso_atual = None  # Após a entrega, ele não carrega mais um recurso
 
             self.destino_recurso = None  
@@ -343,13 +433,17 @@ class AgenteCooperativo(Agent):
 
     def explorar_ambiente(self):
         """ Explora o ambiente evitando áreas já visitadas. """
-        vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
-        conhecidos = [reg["pos"] for reg in self.registros_locais if reg["tipo"] == "Explorado"]
-        nao_visitados = [pos for pos in vizinhos if pos not in conhecidos]
+        vizinhos = self.model.navegacao.vizinhos_livres(self.pos)
+        if not vizinhos:
+            self.model.eventos.debug("sem_caminho_livre", agente=self.unique_id)
+            return
+        nao_visitados = [pos for pos in vizinhos if not self.memoria.visitada(pos)]
 
-        nova_pos = random.choice(nao_visitados if nao_visitados else vizinhos)
-        self.model.grid.move_agent(self, nova_pos)
+        nova_pos = self.random.choice(nao_visitados if nao_visitados else vizinhos)
+        self.model.mover(self, nova_pos)
+        self.memoria.visitar(nova_pos)
         self._registrar_local("Explorado", nova_pos)
+        self.perceber_recursos()
 
     def mover_para_destino(self):
         """ Move para o destino do recurso valioso identificado. """
@@ -360,24 +454,27 @@ class AgenteCooperativo(Agent):
 
     def tentar_coletar_recurso(self):
         """ Coleta um recurso e inicia transporte corretamente. """
-        objetos = self.model.grid.get_cell_list_contents(self.pos)
-        for obj in objetos:
-            if isinstance(obj, Recurso) and not obj.transportado:
-                self.recurso_atual = obj  # Agora armazena corretamente o objeto
-                obj.transportado = True
-                self.model.grid.remove_agent(obj)
-                self.destino_recurso = None  # 🔥 Após coleta, redefine destino 
-                return
+        recurso = self.model.recurso_em(self.pos)
+        if recurso is not None:
+            self.recurso_atual = recurso  # Agora armazena corretamente o objeto
+            self.model.coletar(self, recurso)
+            self.destino_recurso = None  # 🔥 Após coleta, redefine destino 
+            return
 
     def mover_em_direcao(self, destino):
-        """Move um passo na direção do destino de maneira eficiente."""
+        """Move um passo na direção do destino pelo menor caminho que contorna as estruturas."""
         if not destino:
             return
 
-        vizinhos = self.model.grid.get_neighborhood(self.pos, moore=True, include_center=False)
-        melhor_pos = min(vizinhos, key=lambda p: math.hypot(destino[0] - p[0], destino[1] - p[1]))  # Escolhe o vizinho mais próximo do destino
+        melhor_pos = self.model.navegacao.proximo_passo(self.pos, destino, self.unique_id)  # Menor caminho, contornando estruturas
+        if melhor_pos is not None:
+            self.model.mover(self, melhor_pos)
+            self.perceber_recursos()
 
-        self.model.grid.move_agent(self, melhor_pos)
+    def perceber_recursos(self):
+        """ Registra os recursos da célula atual e das vizinhas, para o BDI repassá-los a outros agentes. """
+        for recurso in self.model.recursos_vizinhos(self.pos):
+            self._registrar_local("Recurso", recurso.pos)
 
 
     def distancia_para_base(self, pos):
@@ -386,16 +483,11 @@ class AgenteCooperativo(Agent):
 
     def _registrar_local(self, tipo, pos):
         """ Armazena locais explorados e recursos descobertos para evitar repetição. """
-        if {"tipo": tipo, "pos": pos} not in self.registros_locais:
-            self.registros_locais.append({"tipo": tipo, "pos": pos})
+        self.memoria.registrar(tipo, pos)
 
     def enviar_informacoes_para_bdi(self):
         """ Envia as informações registradas sobre recursos e estruturas ao BDI. """
-        for reg in self.registros_locais:
-            if reg["tipo"] == "Estrutura":
-                self.model.agente_bdi.beliefs["estruturas_marcadas"].append(reg)  #  Registrando estrutura corretamente
-            elif reg["tipo"] == "Recurso":
-                self.model.agente_bdi.beliefs["recursos_confirmados"].append(reg)  #  Registrando recurso corretamente
+        self.model.agente_bdi.receber_informacoes(self)
 
 
 
@@ -404,29 +496,59 @@ class AgenteCooperativo(Agent):
 
 class AgenteBDI(Agent):
 
-    def __init__(self, unique_id, model):
+    def __init__(self, unique_id, model, idade_maxima_crenca=None, modo_alocacao="fifo", exploracao="aleatoria"):
         super().__init__(unique_id, model)
-        self.beliefs = {"explorados": set(),
-                        "recursos_confirmados": [],
-                        "estruturas_marcadas": []}
+        self.beliefs = BaseCrencas()
+        self.idade_maxima_crenca = idade_maxima_crenca  # None: crenças não ficam obsoletas
+        self.modo_alocacao = modo_alocacao  # "fifo", "hungaro" ou "guloso"
         self.intentions = {}
+        self._reservas = {}  # destino -> unique_id do agente enviado para lá
+        self._ultimo_plano = None
+        self._registros_lidos = {}  # unique_id -> quantos registros da memória do agente já foram processados
+        # "aleatoria": agentes sem missão andam ao acaso; "fronteira": o BDI os envia à fronteira do mapa explorado
+        self.exploracao = exploracao
+        self.mapa_exploracao = None
+        self._fronteiras = {}  # unique_id -> (alvo, passo limite) das missões de exploração em andamento
+        self._visitas_lidas = {}  # unique_id -> quantas células visitadas pelo agente já foram marcadas no mapa
+
+    def _mapa(self):
+        """Mapa global de exploração, criado no primeiro uso (a navegação só existe depois do BDI)."""
+        if self.mapa_exploracao is None:
+            mapa = MapaExploracao(self.model.width, self.model.height, self.model.navegacao.obstaculos)
+            base = self.model.base_pos
+            mapa.marcar([base[0] * self.model.height + base[1]])
+            self.mapa_exploracao = mapa
+        return self.mapa_exploracao
+
+    def _incorporar_visitas(self, agente):
+        """Marca no mapa global as células que o agente visitou desde o último relato."""
+        memoria = agente.memoria
+        inicio = self._visitas_lidas.get(agente.unique_id, 0)
+        self._mapa().marcar(memoria.visitas_desde(inicio))
+        self._visitas_lidas[agente.unique_id] = len(memoria.visitas)
 
     def receber_informacoes(self, agente):
         """ Processa informações enviadas pelos agentes ao chegarem na base. """
-        if self.pos == self.model.base_pos and hasattr(agente, 'registros_locais'):
-            for reg in agente.registros_locais:
-                if reg['tipo'] == 'Estrutura' and reg not in self.beliefs['estruturas_marcadas']:
-                    self.beliefs['estruturas_marcadas'].append(reg)  # registra a estrutura
-                elif reg['tipo'] != 'Estrutura' and reg not in self.beliefs['recursos_confirmados']:
-                    self.beliefs['recursos_confirmados'].append(reg) 
+        if self.pos == self.model.base_pos and hasattr(agente, 'memoria'):
+            # A memória só cresce: basta processar o que chegou desde a última visita
+            memoria = agente.memoria
+            inicio = self._registros_lidos.get(agente.unique_id, 0)
+            for tipo, pos in memoria.desde(inicio):
+                self.beliefs.registrar(tipo, pos, self.model.passos)
+            self._registros_lidos[agente.unique_id] = len(memoria)
+            if self.exploracao == "fronteira":
+                self._incorporar_visitas(agente)
 
     def direcionar_agentes(self):
         """ Define missões apenas para coleta de recursos, ignorando estruturas. """
         for ag in self.model.agentes_baseados_estado + self.model.agentes_baseados_objetivos:
+            if ag.objetivo_atual == "explorar_fronteira":
+                continue  # missão de exploração em andamento
             destino = None
-            
-            if self.beliefs["recursos_confirmados"]:  # prioriza recursos
-                destino = self.beliefs["recursos_confirmados"].pop(0)["pos"]
+
+            crenca = self.beliefs.proximo_pendente()  # prioriza recursos
+            if crenca:
+                destino = crenca.pos
 
             if destino:
                 self.intentions[ag.unique_id] = destino
@@ -434,9 +556,111 @@ class AgenteBDI(Agent):
             else:
                 ag.objetivo_atual = "explorar"
 
+    def alocar_por_custo(self):
+        """ Envia os agentes livres aos recursos confirmados minimizando o custo total de ida e volta. """
+        livres = []
+        for ag in self.model.agentes_baseados_estado + self.model.agentes_baseados_objetivos:
+            if ag.recurso_atual:
+                continue
+            if ag.unique_id in self._fronteiras:
+                livres.append(ag)  # explorando a fronteira, mas disponível para um recurso
+                continue
+            destino = self.intentions.get(ag.unique_id)
+            if destino is not None and self.beliefs.estado(destino) == CONFIRMADO:
+                if ag.objetivo_atual not in ("buscar_recurso", "coletar"):
+                    ag.definir_destino(destino)  # retoma a missão após uma entrega no caminho
+                continue
+            if destino is not None:
+                del self.intentions[ag.unique_id]
+                self._reservas.pop(destino, None)
+            livres.append(ag)
+
+        # Só replaneja quando as crenças ou o conjunto de agentes livres mudaram
+        plano = (self.beliefs.versao, tuple(ag.unique_id for ag in livres))
+        if not livres or plano == self._ultimo_plano:
+            return
+        self._ultimo_plano = plano
+
+        candidatos = [c for c in self.beliefs.confirmados() if c.pos not in self._reservas]
+        pares = alocacao.alocar(
+            [ag.pos for ag in livres],
+            [c.pos for c in candidatos],
+            self.model.base_pos,
+            [alocacao.UTILIDADE_POR_TIPO.get(c.tipo, alocacao.UTILIDADE_DESCONHECIDA) for c in candidatos],
+            metodo=self.modo_alocacao,
+        ) if candidatos else []
+
+        atribuidos = set()
+        for i, j in pares:
+            ag, destino = livres[i], candidatos[j].pos
+            self.intentions[ag.unique_id] = destino
+            self._reservas[destino] = ag.unique_id
+            ag.definir_destino(destino)
+            atribuidos.add(i)
+
+        for i, ag in enumerate(livres):
+            if i not in atribuidos and ag.objetivo_atual not in ("explorar", "explorar_fronteira"):
+                ag.definir_destino(None)
+
+    def direcionar_exploradores(self):
+        """ Envia os agentes ociosos aos blocos da fronteira de exploração que ainda não têm ninguém a caminho. """
+        mapa = self._mapa()
+        passos = self.model.passos
+        agentes = self.model.agentes_baseados_estado + self.model.agentes_baseados_objetivos
+
+        # Encerra as missões concluídas, trocadas por um recurso, vencidas ou cujo alvo já foi explorado
+        for ag in agentes:
+            missao = self._fronteiras.get(ag.unique_id)
+            if missao is None:
+                continue
+            alvo, limite = missao
+            if ag.objetivo_atual == "explorar_fronteira" and passos <= limite and mapa.na_fronteira(alvo):
+                continue
+            del self._fronteiras[ag.unique_id]
+            if self.intentions.get(ag.unique_id) == alvo:
+                del self.intentions[ag.unique_id]
+            self._incorporar_visitas(ag)
+            if ag.objetivo_atual == "explorar_fronteira":
+                ag.definir_destino(None)
+            if passos > limite and mapa.na_fronteira(alvo):
+                mapa.marcar([alvo[0] * self.model.height + alvo[1]])  # inalcançável: não é reenviado
+
+        livres = [ag for ag in agentes
+                  if not ag.recurso_atual and ag.objetivo_atual == "explorar" and ag.unique_id not in self._fronteiras]
+        if not livres:
+            return
+        reservados = {mapa.bloco(alvo) for alvo, _ in self._fronteiras.values()}
+        alvos = mapa.alvos(excluir=reservados)
+        if not alvos:
+            return
+
+        pares = alocacao.alocar(
+            [ag.pos for ag in livres],
+            [alvo for alvo, _ in alvos],
+            self.model.base_pos,
+            [tamanho for _, tamanho in alvos],
+            metodo="guloso" if self.modo_alocacao == "fifo" else self.modo_alocacao,
+        )
+        for i, j in pares:
+            ag, alvo = livres[i], alvos[j][0]
+            distancia = max(abs(alvo[0] - ag.pos[0]), abs(alvo[1] - ag.pos[1]))
+            self._fronteiras[ag.unique_id] = (alvo, passos + 2 * distancia + 20)
+            self.intentions[ag.unique_id] = alvo
+            ag.definir_destino(alvo, objetivo="explorar_fronteira")
+
     def step(self):
-        if not self.beliefs["recursos_confirmados"]:  # ignora completamente `estruturas_marcadas`
-            for ag in self.model.agentes_baseados_estado + self.model.agentes_baseados_objetivos:
-                ag.objetivo_atual = "explorar"
+        if self.idade_maxima_crenca is not None:
+            self.beliefs.marcar_obsoletas(self.model.passos, self.idade_maxima_crenca)
+
+        if self.modo_alocacao != "fifo":
+            self.alocar_por_custo()
+        else:
+            if not self.beliefs.tem_pendentes():  # ignora completamente as estruturas
+                for ag in self.model.agentes_baseados_estado + self.model.agentes_baseados_objetivos:
+                    if ag.objetivo_atual != "explorar_fronteira":
+                        ag.objetivo_atual = "explorar"
+
+            self.direcionar_agentes()
 
-        self.direcionar_agentes()
\ No newline at end of file
+        if self.exploracao == "fronteira":
+            self.direcionar_exploradores()
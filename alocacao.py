@@ -0,0 +1,99 @@
+"""Alocação de agentes a recursos por custo mínimo, usada pelo AgenteBDI.
+
+O custo de mandar um agente buscar um recurso é a quantidade de passos até o
+recurso, mais a volta até a base, menos a utilidade do recurso (ponderada).
+Como os agentes andam nas 8 direções, a distância em passos é a de Chebyshev.
+"""
+import numpy as np
+
+# Utilidade presumida por tipo de crença; "Recurso" (agente cooperativo) não informa o tipo
+UTILIDADE_POR_TIPO = {"Cristal": 10, "Metal": 20}
+UTILIDADE_DESCONHECIDA = 15
+
+
+def distancias(origens, destinos):
+    """Matriz (N, M) de distâncias de Chebyshev entre dois conjuntos de posições."""
+    origens = np.asarray(origens, dtype=np.int32).reshape(-1, 2)
+    destinos = np.asarray(destinos, dtype=np.int32).reshape(-1, 2)
+    dx = np.abs(origens[:, 0, None] - destinos[None, :, 0])
+    dy = np.abs(origens[:, 1, None] - destinos[None, :, 1])
+    return np.maximum(dx, dy, out=dx)
+
+
+def matriz_custos(pos_agentes, pos_recursos, base_pos, utilidades, peso_utilidade=1.0):
+    """Custo (agentes x recursos) de ida ao recurso e volta à base, descontada a utilidade."""
+    ida = distancias(pos_agentes, pos_recursos)
+    volta = distancias([base_pos], pos_recursos)[0]
+    return ida + volta[None, :] - peso_utilidade * np.asarray(utilidades, dtype=np.float64)[None, :]
+
+
+def resolver_hungaro(custos):
+    """Atribuição ótima (algoritmo húngaro do SciPy). Retorna pares (agente, recurso)."""
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError as erro:
+        raise ImportError("A alocação 'hungaro' requer o SciPy; use 'guloso' sem ele.") from erro
+    linhas, colunas = linear_sum_assignment(custos)
+    return list(zip(linhas.tolist(), colunas.tolist()))
+
+
+def resolver_guloso(custos):
+    """Atribuição gulosa: repete a escolha do par de menor custo entre agentes e recursos livres.
+
+    Mantém o mínimo de cada linha e só recalcula as linhas cujo mínimo foi
+    ocupado, o que custa O(agentes x recursos) no total em vez de por escolha.
+    """
+    custos = np.array(custos, dtype=np.float64)
+    n_agentes, n_recursos = custos.shape
+    if not n_agentes or not n_recursos:
+        return []
+    melhor = custos.argmin(axis=1)
+    valor = custos[np.arange(n_agentes), melhor]
+
+    pares = []
+    for _ in range(min(n_agentes, n_recursos)):
+        agente = int(valor.argmin())
+        recurso = int(melhor[agente])
+        pares.append((agente, recurso))
+        valor[agente] = np.inf
+        custos[:, recurso] = np.inf
+
+        afetados = np.flatnonzero((melhor == recurso) & np.isfinite(valor))
+        if len(afetados):
+            melhor[afetados] = custos[afetados].argmin(axis=1)
+            valor[afetados] = custos[afetados, melhor[afetados]]
+    return pares
+
+
+RESOLVEDORES = {"hungaro": resolver_hungaro, "guloso": resolver_guloso}
+
+
+def podar_candidatos(pos_agentes, pos_recursos, limite):
+    """Índices de no máximo ~`limite` recursos: os mais próximos de cada agente (união).
+
+    Usa uma KD-tree do SciPy quando disponível; sem ela, mantém todos os recursos.
+    """
+    if len(pos_recursos) <= limite:
+        return np.arange(len(pos_recursos))
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        return np.arange(len(pos_recursos))
+    k = max(1, min(len(pos_recursos), limite // max(1, len(pos_agentes))))
+    _, indices = cKDTree(pos_recursos).query(pos_agentes, k=k, p=np.inf)
+    return np.unique(indices)
+
+
+def alocar(pos_agentes, pos_recursos, base_pos, utilidades, metodo="hungaro",
+           peso_utilidade=1.0, limite_candidatos=2048):
+    """Atribui no máximo um recurso a cada agente minimizando o custo total.
+
+    Retorna pares (índice do agente, índice do recurso) referentes às listas de entrada.
+    """
+    if not len(pos_agentes) or not len(pos_recursos):
+        return []
+    pos_recursos = np.asarray(pos_recursos, dtype=np.int64).reshape(-1, 2)
+    candidatos = podar_candidatos(np.asarray(pos_agentes), pos_recursos, limite_candidatos)
+    custos = matriz_custos(pos_agentes, pos_recursos[candidatos], base_pos,
+                           np.asarray(utilidades)[candidatos], peso_utilidade)
+    return [(agente, int(candidatos[recurso])) for agente, recurso in RESOLVEDORES[metodo](custos)]
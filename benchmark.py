@@ -0,0 +1,345 @@
+"""Benchmarks de desempenho do PlanetaModelo.
+
+Cada cenário roda com semente fixa em um processo novo (para que a memória de
+pico de um não contamine o outro) e mede o tempo de montagem, os passos por
+segundo e a memória de pico. A curva de escala repete um cenário variando o
+número de agentes e o tamanho do grid; a curva distribuída (--distribuido)
+divide o cenário "grande_denso" entre 1, 2, 4 e 8 processos (distribuido.py)
+e compara com o modelo em um só processo. Também mede o tempo de importação
+dos módulos que os processos de trabalho carregam e, com --servico, a vazão
+e a latência do serviço HTTP (servico.py) com centenas de trabalhos curtos
+simultâneos. Os resultados são gravados em JSON e podem ser comparados com
+uma execução anterior para apontar regressões.
+
+    python benchmark.py --saida resultados.json
+    python benchmark.py --cenarios ui_20x20,medio --comparar resultados.json
+    python benchmark.py --cenarios grande_denso --sem-escala --distribuido
+    python benchmark.py --cenarios ui_20x20 --sem-escala --servico
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import chain
+
+SEMENTE = 42
+
+BASE = {
+    "width": 20, "height": 20,
+    "num_crystals": 30, "num_metals": 15, "num_structures": 2,
+    "num_agentes_reativos": 1, "num_agentes_estado": 1,
+    "num_agentes_objetivos": 1, "num_agentes_cooperativos": 1,
+}
+
+# nome -> (parâmetros do modelo, passos medidos)
+CENARIOS = {
+    "ui_20x20": (BASE, 500),
+    "medio": ({**BASE, "width": 100, "height": 100, "num_crystals": 600, "num_metals": 300,
+               "num_structures": 30, "num_agentes_reativos": 20, "num_agentes_estado": 20,
+               "num_agentes_objetivos": 20, "num_agentes_cooperativos": 20}, 300),
+    "grande_esparso": ({**BASE, "width": 500, "height": 500, "num_crystals": 500, "num_metals": 250,
+                        "num_structures": 50, "num_agentes_reativos": 50, "num_agentes_estado": 50,
+                        "num_agentes_objetivos": 50, "num_agentes_cooperativos": 50}, 200),
+    "grande_denso": ({**BASE, "width": 500, "height": 500, "num_crystals": 40000, "num_metals": 20000,
+                      "num_structures": 2000, "num_agentes_reativos": 100, "num_agentes_estado": 100,
+                      "num_agentes_objetivos": 100, "num_agentes_cooperativos": 100}, 200),
+    "so_reativos": ({**BASE, "width": 200, "height": 200, "num_crystals": 4000, "num_metals": 2000,
+                     "num_structures": 100, "num_agentes_reativos": 1000, "num_agentes_estado": 0,
+                     "num_agentes_objetivos": 0, "num_agentes_cooperativos": 0}, 200),
+    "so_reativos_vetorizado": ({**BASE, "width": 200, "height": 200, "num_crystals": 4000, "num_metals": 2000,
+                                "num_structures": 100, "num_agentes_reativos": 1000, "num_agentes_estado": 0,
+                                "num_agentes_objetivos": 0, "num_agentes_cooperativos": 0,
+                                "motor_reativo": True}, 200),
+    "so_cooperativos": ({**BASE, "width": 200, "height": 200, "num_crystals": 4000, "num_metals": 2000,
+                         "num_structures": 100, "num_agentes_reativos": 0, "num_agentes_estado": 0,
+                         "num_agentes_objetivos": 0, "num_agentes_cooperativos": 500}, 200),
+    "bdi_pesado": ({**BASE, "width": 200, "height": 200, "num_crystals": 4000, "num_metals": 2000,
+                    "num_structures": 100, "num_agentes_reativos": 0, "num_agentes_estado": 250,
+                    "num_agentes_objetivos": 250, "num_agentes_cooperativos": 100,
+                    "modo_alocacao": "hungaro"}, 200),
+    "milhao_compacto": ({**BASE, "width": 1500, "height": 1500, "num_crystals": 500000, "num_metals": 500000,
+                         "num_structures": 1000, "num_agentes_reativos": 5000, "num_agentes_estado": 50,
+                         "num_agentes_objetivos": 50, "num_agentes_cooperativos": 50,
+                         "motor_reativo": True, "recursos_compactos": True}, 100),
+    # Quase todos os agentes voltando carregados à base: avanço rápido das viagens
+    "viagens_agendadas": ({**BASE, "width": 400, "height": 400, "num_crystals": 100000, "num_metals": 40000,
+                           "num_structures": 50, "num_agentes_reativos": 200, "num_agentes_estado": 200,
+                           "num_agentes_objetivos": 200, "num_agentes_cooperativos": 200,
+                           "recursos_compactos": True, "avanco_rapido": True}, 100),
+    # Planeta de 10^6 x 10^6 células gerado em blocos sob demanda: custo segue a área explorada
+    "planeta_esparso": ({**BASE, "width": 10 ** 6, "height": 10 ** 6, "num_crystals": 10 ** 9, "num_metals": 5 * 10 ** 8,
+                         "num_structures": 10 ** 9, "num_agentes_reativos": 50, "num_agentes_estado": 50,
+                         "num_agentes_objetivos": 50, "num_agentes_cooperativos": 50,
+                         "mundo_esparso": True}, 300),
+}
+
+# Curva de escala: cenário "medio" com agentes de cada tipo e lado do grid variando
+ESCALA_AGENTES = [5, 25, 125, 625]
+ESCALA_LADO = [50, 100, 200, 400]
+PASSOS_ESCALA = 100
+
+# Curva distribuída: número de trabalhadores (processos) para o cenário "grande_denso"
+TRABALHADORES_DISTRIBUIDOS = [1, 2, 4, 8]
+
+# Módulos cujo tempo de importação é medido: os que cada processo de uma varredura carrega
+MODULOS_IMPORTACAO = ["cli", "planet_model", "lote"]
+REPETICOES_IMPORTACAO = 3
+
+# Carga do serviço: trabalhos curtos do cenário "ui_20x20" enviados de uma vez, com nova tentativa após 503
+TRABALHOS_SERVICO = 300
+PASSOS_TRABALHO_SERVICO = 50
+FILA_SERVICO = 64
+
+# Métricas comparadas entre execuções: nome -> True se maior é melhor
+METRICAS = {"passos_por_segundo": True, "montagem_s": False, "memoria_pico_mb": False, "importacao_s": False,
+            "trabalhos_por_segundo": True, "latencia_p95_s": False}
+
+
+def _memoria_mb():
+    # ru_maxrss é em KiB no Linux e em bytes no macOS
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def medir(parametros, passos, seed=SEMENTE, trabalhadores=None):
+    """Mede montagem, passos por segundo e memória de pico de uma simulação (no processo atual).
+
+    Com `trabalhadores`, a simulação é dividida entre esse número de
+    processos (SimulacaoDistribuida) e a memória de pico é só a do coordenador.
+    """
+    from planet_model import PlanetaModelo
+    from distribuido import SimulacaoDistribuida
+
+    memoria_inicial = _memoria_mb()
+    inicio = time.perf_counter()
+    if trabalhadores:
+        simulacao = SimulacaoDistribuida(trabalhadores, **parametros, seed=seed, nivel_eventos="aviso")
+        modelo = simulacao.modelo
+    else:
+        simulacao = modelo = PlanetaModelo(**parametros, seed=seed, nivel_eventos="aviso")
+    montagem = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    for _ in range(passos):
+        simulacao.step()
+    duracao = time.perf_counter() - inicio
+    if trabalhadores:
+        simulacao.fechar()
+
+    return {
+        "parametros": parametros,
+        "passos": passos,
+        "montagem_s": round(montagem, 4),
+        "passos_por_segundo": round(passos / duracao, 2) if duracao else None,
+        "memoria_inicial_mb": round(memoria_inicial, 1),
+        "memoria_pico_mb": round(_memoria_mb(), 1),
+        "pontuacoes": dict(modelo.pontuacoes),
+    }
+
+
+def medir_importacao(modulo, repeticoes=REPETICOES_IMPORTACAO):
+    """Tempo de `import modulo` (com tudo o que ele puxa) num interpretador novo; o menor de `repeticoes`."""
+    diretorio = os.path.dirname(os.path.abspath(__file__))
+    tempos = []
+    for _ in range(repeticoes):
+        processo = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+                                  cwd=diretorio, capture_output=True, text=True, check=True)
+        # Última linha: "import time: <próprio> | <acumulado> | <módulo>", em microssegundos
+        acumulado = processo.stderr.strip().splitlines()[-1].split("|")[1]
+        tempos.append(int(acumulado) / 1e6)
+    return {"modulo": modulo, "importacao_s": round(min(tempos), 4)}
+
+
+def medir_servico(trabalhos=TRABALHOS_SERVICO, passos=PASSOS_TRABALHO_SERVICO, tamanho_fila=FILA_SERVICO,
+                  trabalhadores=None):
+    """Vazão e latência (do envio ao último evento do progresso) do serviço com `trabalhos` clientes simultâneos."""
+    import asyncio
+    from servico import ServicoSimulacoes, requisitar
+
+    async def cliente(porta, seed, latencias, rejeicoes):
+        inicio = time.perf_counter()
+        pedido = {"parametros": CENARIOS["ui_20x20"][0], "seed": seed, "passos": passos, "periodo": passos}
+        while True:
+            status, resposta = await requisitar(porta, "POST", "/simulacoes", pedido)
+            if status != 503:
+                break
+            rejeicoes.append(seed)
+            await asyncio.sleep(0.05)
+        _, eventos = await requisitar(porta, "GET", f"/simulacoes/{resposta['id']}/progresso")
+        if eventos[-1]["estado"] != "concluida":
+            raise RuntimeError(f"Trabalho {resposta['id']} terminou em {eventos[-1]['estado']}.")
+        latencias.append(time.perf_counter() - inicio)
+
+    async def carga():
+        servico = ServicoSimulacoes(trabalhadores, tamanho_fila)
+        porta = await servico.iniciar(porta=0)
+        latencias, rejeicoes = [], []
+        try:
+            # Aquece os processos de trabalho (importações) antes de medir
+            await asyncio.gather(*(cliente(porta, -1 - i, [], []) for i in range(servico.trabalhadores)))
+            inicio = time.perf_counter()
+            await asyncio.gather(*(cliente(porta, seed, latencias, rejeicoes) for seed in range(trabalhos)))
+            duracao = time.perf_counter() - inicio
+        finally:
+            await servico.fechar()
+        latencias.sort()
+
+        def quantil(q):
+            return round(latencias[min(len(latencias) - 1, int(q * len(latencias)))], 4)
+
+        return {
+            "trabalhos": trabalhos,
+            "passos": passos,
+            "trabalhadores": servico.trabalhadores,
+            "limite_fila": tamanho_fila,
+            "trabalhos_por_segundo": round(trabalhos / duracao, 2),
+            "latencia_p50_s": quantil(0.50),
+            "latencia_p95_s": quantil(0.95),
+            "latencia_p99_s": quantil(0.99),
+            "rejeicoes_503": len(rejeicoes),
+        }
+
+    return asyncio.run(carga())
+
+
+def _medir_tarefa(tarefa):
+    nome, parametros, passos = tarefa
+    return nome, medir(parametros, passos)
+
+
+def _em_processos_novos(tarefas):
+    """Roda cada tarefa em um processo recém-criado, uma de cada vez, para isolar tempo e memória."""
+    contexto = multiprocessing.get_context("spawn")
+    with contexto.Pool(1, maxtasksperchild=1) as pool:
+        for resultado in pool.imap(_medir_tarefa, tarefas):
+            yield resultado
+
+
+def tarefas_escala():
+    nome, (base, _) = "medio", CENARIOS["medio"]
+    for n in ESCALA_AGENTES:
+        parametros = {**base, "num_agentes_reativos": n, "num_agentes_estado": n,
+                      "num_agentes_objetivos": n, "num_agentes_cooperativos": n}
+        yield (f"escala_agentes_{4 * n}", parametros, PASSOS_ESCALA)
+    for lado in ESCALA_LADO:
+        fator = (lado / base["width"]) ** 2
+        parametros = {**base, "width": lado, "height": lado,
+                      "num_crystals": int(base["num_crystals"] * fator),
+                      "num_metals": int(base["num_metals"] * fator),
+                      "num_structures": int(base["num_structures"] * fator)}
+        yield (f"escala_grid_{lado}", parametros, PASSOS_ESCALA)
+
+
+def tarefas_distribuidas():
+    nome, (parametros, passos) = "grande_denso", CENARIOS["grande_denso"]
+    parametros = {**parametros, "recursos_compactos": True}
+    yield (f"{nome}_1_processo", parametros, passos, None)
+    for trabalhadores in TRABALHADORES_DISTRIBUIDOS:
+        yield (f"{nome}_distribuido_{trabalhadores}", parametros, passos, trabalhadores)
+
+
+def _medir_distribuidas(fator_passos):
+    """Curva distribuída, medida no processo atual: os processos de um Pool não podem criar os trabalhadores."""
+    base = None
+    for nome, parametros, passos, trabalhadores in tarefas_distribuidas():
+        medida = medir(parametros, max(1, int(passos * fator_passos)), trabalhadores=trabalhadores)
+        medida["trabalhadores"] = trabalhadores or 0
+        base = base or medida["passos_por_segundo"]
+        medida["aceleracao"] = round(medida["passos_por_segundo"] / base, 2)
+        yield nome, medida
+
+
+def executar(cenarios=None, escala=True, fator_passos=1.0, saida=None, distribuido=False, servico=False):
+    """Executa os cenários escolhidos (todos por padrão), a curva de escala e, se pedidos, a distribuída e o serviço."""
+    nomes = cenarios or list(CENARIOS)
+    tarefas = [(nome, CENARIOS[nome][0], max(1, int(CENARIOS[nome][1] * fator_passos))) for nome in nomes]
+    if escala:
+        tarefas += [(nome, parametros, max(1, int(passos * fator_passos)))
+                    for nome, parametros, passos in tarefas_escala()]
+
+    resultados = {}
+    medidas = _em_processos_novos(tarefas)
+    if distribuido:
+        medidas = chain(medidas, _medir_distribuidas(fator_passos))
+    for modulo in MODULOS_IMPORTACAO:
+        medida = resultados[f"importacao_{modulo}"] = medir_importacao(modulo)
+        print(f"{'importacao_' + modulo:28s} {medida['importacao_s']:8.3f}s", file=sys.stderr)
+    for nome, medida in medidas:
+        resultados[nome] = medida
+        print(f"{nome:28s} montagem {medida['montagem_s']:8.3f}s  "
+              f"{medida['passos_por_segundo']:10.1f} passos/s  pico {medida['memoria_pico_mb']:8.1f} MB",
+              file=sys.stderr)
+    if servico:
+        medida = resultados["servico"] = medir_servico()
+        print(f"{'servico':28s} {medida['trabalhos_por_segundo']:8.1f} trabalhos/s  "
+              f"p50 {medida['latencia_p50_s']:.3f}s  p95 {medida['latencia_p95_s']:.3f}s  "
+              f"503 {medida['rejeicoes_503']}", file=sys.stderr)
+
+    relatorio = {
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semente": SEMENTE,
+        "resultados": resultados,
+    }
+    if saida:
+        with open(saida, "w", encoding="utf-8") as arquivo:
+            json.dump(relatorio, arquivo, indent=2, ensure_ascii=False)
+    return relatorio
+
+
+def comparar(anterior, atual, tolerancia=0.10):
+    """Lista as métricas que pioraram mais que `tolerancia` (fração) entre dois relatórios."""
+    regressoes = []
+    for nome, medida in atual["resultados"].items():
+        referencia = anterior["resultados"].get(nome)
+        if not referencia:
+            continue
+        for metrica, maior_melhor in METRICAS.items():
+            antes, depois = referencia.get(metrica), medida.get(metrica)
+            if not antes or depois is None:
+                continue
+            variacao = (depois - antes) / antes
+            if (variacao < -tolerancia) if maior_melhor else (variacao > tolerancia):
+                regressoes.append({"cenario": nome, "metrica": metrica, "antes": antes,
+                                   "depois": depois, "variacao": round(variacao, 3)})
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de desempenho do PlanetaModelo.")
+    parser.add_argument("--cenarios", help=f"lista separada por vírgulas (padrão: todos): {', '.join(CENARIOS)}")
+    parser.add_argument("--sem-escala", action="store_true", help="não mede a curva de escala")
+    parser.add_argument("--rapido", action="store_true", help="mede 10%% dos passos de cada cenário")
+    parser.add_argument("--distribuido", action="store_true",
+                        help="mede também a curva com o modelo dividido entre processos")
+    parser.add_argument("--servico", action="store_true",
+                        help="mede também vazão e latência do serviço HTTP de simulações")
+    parser.add_argument("--saida", help="arquivo JSON de resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    cenarios = args.cenarios.split(",") if args.cenarios else None
+    relatorio = executar(cenarios, escala=not args.sem_escala, fator_passos=0.1 if args.rapido else 1.0,
+                         saida=args.saida, distribuido=args.distribuido,
+                         servico=args.servico)
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            regressoes = comparar(json.load(arquivo), relatorio, args.tolerancia)
+        for r in regressoes:
+            print(f"REGRESSÃO {r['cenario']} {r['metrica']}: {r['antes']} -> {r['depois']} "
+                  f"({r['variacao']:+.1%})", file=sys.stderr)
+        return 1 if regressoes else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import math
+
+import numpy as np
+
+# Códigos da grade de tipos (0 = célula sem recurso disponível)
+TIPOS = ("", "Cristal", "Metal")
+CODIGOS = {nome: codigo for codigo, nome in enumerate(TIPOS) if nome}
+
+
+class RecursoLeve:
+    """Recurso da camada compacta depois de coletado: o que o agente carrega até a base."""
+
+    __slots__ = ("tipo", "utilidade", "pos", "transportado")
+
+    def __init__(self, tipo, utilidade, pos, transportado=False):
+        self.tipo = tipo
+        self.utilidade = utilidade
+        self.pos = pos
+        self.transportado = transportado
+
+    @property
+    def unique_id(self):
+        return f"{self.tipo}@{self.pos[0]},{self.pos[1]}"
+
+    def __repr__(self):
+        return f"RecursoLeve({self.tipo!r}, {self.utilidade}, {self.pos})"
+
+
+class CamadaRecursos:
+    """Recursos leves guardados em grades NumPy (tipo e utilidade por célula) em vez de agentes Mesa.
+
+    Oferece a mesma interface de consulta do IndiceRecursos (`em`,
+    `mais_proximo`, `no_raio`, `remover`...), então o modelo a usa no lugar do
+    índice. Cada célula custa 3 bytes; os recursos só viram objetos
+    (RecursoLeve) quando alguém os consulta ou coleta.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.tipos = np.zeros((width, height), dtype=np.int8)
+        self.utilidades = np.zeros((width, height), dtype=np.int16)
+        self.total = 0
+
+    def preencher(self, celulas, tipo, utilidade):
+        """Coloca recursos de um tipo nas células dadas por índice linear (x * height + y)."""
+        celulas = np.asarray(celulas, dtype=np.int64)
+        novas = self.tipos.ravel()[celulas] == 0
+        self.tipos.ravel()[celulas] = CODIGOS[tipo]
+        self.utilidades.ravel()[celulas] = utilidade
+        self.total += int(novas.sum())
+
+    def _recurso(self, x, y):
+        return RecursoLeve(TIPOS[self.tipos[x, y]], int(self.utilidades[x, y]), (x, y))
+
+    # ------------------------------------------------------------------
+    # Interface comum com IndiceRecursos
+
+    def em(self, pos):
+        """Retorna o recurso disponível em `pos`, ou None."""
+        if not self.tipos[pos]:
+            return None
+        return self._recurso(*pos)
+
+    def remover(self, recurso, pos=None):
+        pos = pos if pos is not None else recurso.pos
+        if pos is None or not self.tipos[pos]:
+            return
+        self.tipos[pos] = 0
+        self.utilidades[pos] = 0
+        self.total -= 1
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        xs, ys = np.nonzero(self.tipos)
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            yield self._recurso(x, y)
+
+    def __contains__(self, recurso):
+        pos = recurso.pos
+        return pos is not None and bool(self.tipos[pos]) and TIPOS[self.tipos[pos]] == recurso.tipo
+
+    def posicoes(self):
+        """Array (N, 2) com as posições dos recursos disponíveis."""
+        return np.argwhere(self.tipos)
+
+    def _janela(self, pos, raio):
+        x0, x1 = max(pos[0] - raio, 0), min(pos[0] + raio + 1, self.width)
+        y0, y1 = max(pos[1] - raio, 0), min(pos[1] + raio + 1, self.height)
+        xs, ys = np.nonzero(self.tipos[x0:x1, y0:y1])
+        return xs + x0, ys + y0
+
+    def mais_proximos(self, pos, k=1):
+        """Até `k` recursos mais próximos de `pos` (distância euclidiana; empates pela menor posição).
+
+        Procura em janelas quadradas que dobram de tamanho até que a k-ésima
+        distância encontrada caiba na janela.
+        """
+        if not self.total or k <= 0:
+            return []
+        raio_maximo = max(self.width, self.height)
+        raio = 1
+        while True:
+            xs, ys = self._janela(pos, raio)
+            if len(xs) >= k or raio >= raio_maximo:
+                dist = np.hypot(xs - pos[0], ys - pos[1])
+                ordem = np.lexsort((ys, xs, dist))[:k]
+                limite = dist[ordem[-1]] if len(ordem) else 0
+                # Células fora da janela estão a mais de `raio` de distância
+                if limite <= raio or raio >= raio_maximo:
+                    return [self._recurso(x, y) for x, y in zip(xs[ordem].tolist(), ys[ordem].tolist())]
+                raio = math.ceil(limite)
+            else:
+                raio *= 2
+
+    def mais_proximo(self, pos):
+        proximos = self.mais_proximos(pos, 1)
+        return proximos[0] if proximos else None
+
+    def no_raio(self, pos, raio):
+        xs, ys = self._janela(pos, int(math.floor(raio)))
+        dentro = np.hypot(xs - pos[0], ys - pos[1]) <= raio
+        return [self._recurso(x, y) for x, y in zip(xs[dentro].tolist(), ys[dentro].tolist())]
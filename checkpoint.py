@@ -0,0 +1,94 @@
+"""Instantâneos binários do estado completo de um PlanetaModelo.
+
+O instantâneo é o modelo inteiro serializado com pickle (grid, agentes,
+crenças e intenções do BDI, base, pontuações, coletor de dados e os estados
+dos geradores aleatórios), precedido de um cabeçalho e opcionalmente
+comprimido. Restaurar e seguir simulando dá exatamente o mesmo resultado que
+a execução original, passo a passo.
+
+    checkpoint.salvar(modelo, "passo_10000.ckpt")
+    ramos = checkpoint.bifurcar("passo_10000.ckpt", 8)
+
+Só carregue arquivos de origem confiável: o pickle executa código ao carregar.
+"""
+import lzma
+import pickle
+import zlib
+
+MAGICO = b"PLANETA\x00"
+VERSAO = 1
+
+# nome -> (código no cabeçalho, comprimir, descomprimir)
+COMPRESSOES = {
+    "nenhuma": (0, bytes, bytes),
+    "zlib": (1, lambda dados: zlib.compress(dados, 1), zlib.decompress),
+    "lzma": (2, lzma.compress, lzma.decompress),
+}
+_POR_CODIGO = {codigo: descomprimir for codigo, _, descomprimir in COMPRESSOES.values()}
+
+
+def instantaneo(modelo, compressao="zlib"):
+    """Serializa o modelo em bytes (cabeçalho + pickle, comprimido conforme `compressao`)."""
+    if compressao not in COMPRESSOES:
+        raise ValueError(f"Compressão desconhecida: {compressao!r} (use {', '.join(COMPRESSOES)}).")
+    codigo, comprimir, _ = COMPRESSOES[compressao]
+    # Eventos ainda no lote do arquivo JSONL e linhas da coleta ainda não gravadas vão
+    # para os arquivos agora, para não saírem duplicados (ou perdidos) depois
+    for destino in modelo.eventos.destinos:
+        descarregar = getattr(destino, "descarregar", None)
+        if descarregar:
+            descarregar()
+    modelo.datacollector.descarregar()
+    dados = pickle.dumps(modelo, protocol=pickle.HIGHEST_PROTOCOL)
+    return MAGICO + bytes((VERSAO, codigo)) + comprimir(dados)
+
+
+def restaurar(dados, sem_arquivos=True):
+    """Reconstrói um modelo a partir de bytes gerados por `instantaneo`.
+
+    Por padrão (`sem_arquivos`), o modelo restaurado não grava eventos nem
+    séries em arquivo, para não intercalar linhas nos arquivos do original
+    ainda em execução ou de outra cópia; com `sem_arquivos=False` ele volta a
+    anexar aos mesmos arquivos, para retomar uma execução interrompida.
+    """
+    if dados[:len(MAGICO)] != MAGICO:
+        raise ValueError("Os dados não são um instantâneo de PlanetaModelo.")
+    versao, codigo = dados[len(MAGICO)], dados[len(MAGICO) + 1]
+    if versao != VERSAO:
+        raise ValueError(f"Versão de instantâneo não suportada: {versao} (esperada {VERSAO}).")
+    if codigo not in _POR_CODIGO:
+        raise ValueError(f"Compressão desconhecida no instantâneo: {codigo}.")
+    modelo = pickle.loads(_POR_CODIGO[codigo](memoryview(dados)[len(MAGICO) + 2:]))
+    if sem_arquivos:
+        modelo.eventos.destinos = [d for d in modelo.eventos.destinos if not hasattr(d, "caminho")]
+        modelo.datacollector.desligar_arquivo()
+    return modelo
+
+
+def salvar(modelo, caminho, compressao="zlib"):
+    """Grava o instantâneo do modelo em `caminho`; retorna o tamanho em bytes."""
+    dados = instantaneo(modelo, compressao)
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(dados)
+    return len(dados)
+
+
+def carregar(caminho, sem_arquivos=True):
+    """Lê um instantâneo gravado por `salvar` e retorna o modelo restaurado."""
+    with open(caminho, "rb") as arquivo:
+        return restaurar(arquivo.read(), sem_arquivos)
+
+
+def bifurcar(origem, quantidade, sem_arquivos=True):
+    """Cria `quantidade` cópias independentes de um estado, para simular variações a partir dele.
+
+    `origem` pode ser um modelo, os bytes de um instantâneo ou o caminho de um arquivo.
+    """
+    if isinstance(origem, (bytes, bytearray)):
+        dados = bytes(origem)
+    elif isinstance(origem, str):
+        with open(origem, "rb") as arquivo:
+            dados = arquivo.read()
+    else:
+        dados = instantaneo(origem, compressao="nenhuma")
+    return [restaurar(dados, sem_arquivos) for _ in range(quantidade)]
@@ -0,0 +1,116 @@
+"""Linha de comando do PlanetaModelo.
+
+    python cli.py run -p width=100 -p height=100 --passos 2000 --parar-sem-progresso 50
+    python cli.py sweep --grade grade.json --seeds 5 --saida resultados.csv
+    python cli.py serve --delta
+
+Cada subcomando importa só o que usa: `run` e `sweep` não carregam a
+visualização (Tornado e os módulos web do Mesa) nem montam o servidor, o que
+importa para os processos de trabalho curtos das varreduras.
+"""
+import argparse
+import json
+import sys
+
+
+def _valor(texto):
+    """Interpreta o valor de `-p nome=valor` como JSON (números, listas, true...) ou, se não for, como texto."""
+    try:
+        return json.loads(texto)
+    except ValueError:
+        return texto
+
+
+def _parametros(args):
+    from lote import PARAMETROS_PADRAO
+
+    parametros = dict(PARAMETROS_PADRAO)
+    if args.parametros:
+        with open(args.parametros, encoding="utf-8") as arquivo:
+            parametros.update(json.load(arquivo))
+    for item in args.p:
+        nome, separador, valor = item.partition("=")
+        if not separador:
+            raise SystemExit(f"Parâmetro inválido: {item!r} (use nome=valor).")
+        parametros[nome] = _valor(valor)
+    return parametros
+
+
+def executar(args):
+    """Roda uma simulação até terminar a coleta, parar de progredir ou esgotar os passos."""
+    from planet_model import PlanetaModelo, sem_progresso, utilidade_atingida
+
+    condicoes = []
+    if args.parar_sem_progresso:
+        condicoes.append(sem_progresso(args.parar_sem_progresso))
+    if args.utilidade is not None:
+        condicoes.append(utilidade_atingida(args.utilidade))
+
+    parametros = _parametros(args)
+    if args.trabalhadores:
+        from distribuido import SimulacaoDistribuida
+
+        with SimulacaoDistribuida(args.trabalhadores, **parametros, seed=args.seed) as simulacao:
+            simulacao.run_until(condicoes, args.passos)
+            resumo = simulacao.modelo.resumo()
+    else:
+        modelo = PlanetaModelo(**parametros, seed=args.seed)
+        modelo.run_until(condicoes, args.passos)
+        modelo.encerrar()
+        resumo = modelo.resumo()
+    print(json.dumps(resumo, ensure_ascii=False))
+    return 0
+
+
+def varrer(args):
+    import lote
+
+    return lote.main(args.argumentos) or 0
+
+
+def servir(args):
+    from visualizacao import create_server
+
+    servidor = create_server(delta=args.delta, pular_quadros=args.pular_quadros)
+    servidor.port = args.porta
+    servidor.launch()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulação do planeta: execução, varredura e interface web.")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    run = subcomandos.add_parser("run", help="executa uma simulação e imprime o resumo em JSON")
+    run.add_argument("--parametros", help="arquivo JSON com os parâmetros do modelo")
+    run.add_argument("-p", action="append", default=[], metavar="NOME=VALOR",
+                     help="parâmetro do modelo (repetível); o valor é lido como JSON quando possível")
+    run.add_argument("--seed", type=int, default=None)
+    run.add_argument("--passos", type=int, default=1000, help="máximo de passos")
+    run.add_argument("--parar-sem-progresso", type=int, default=None, metavar="K",
+                     help="encerra após K passos sem coletas nem entregas")
+    run.add_argument("--utilidade", type=int, default=None, help="encerra ao entregar essa utilidade")
+    run.add_argument("--trabalhadores", type=int, default=None,
+                     help="divide o grid entre esse número de processos (distribuido.py)")
+    run.set_defaults(funcao=executar)
+
+    sweep = subcomandos.add_parser("sweep", help="varredura de parâmetros (mesmas opções de lote.py)",
+                                   add_help=False)
+    sweep.set_defaults(funcao=varrer)
+
+    serve = subcomandos.add_parser("serve", help="interface web do Mesa")
+    serve.add_argument("--delta", action="store_true", help="grid incremental com mapas de densidade (até 500x500)")
+    serve.add_argument("--pular-quadros", type=int, default=1)
+    serve.add_argument("--porta", type=int, default=8521)
+    serve.set_defaults(funcao=servir)
+
+    # As opções de `sweep` são repassadas ao lote.py sem passar por este parser
+    args, resto = parser.parse_known_args(argv)
+    if args.comando != "sweep" and resto:
+        parser.error(f"argumentos não reconhecidos: {' '.join(resto)}")
+    args.argumentos = resto
+    return args.funcao(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+import os
+
+import numpy as np
+
+
+class _Serie:
+    """Visão somente leitura de uma coluna, indexável como uma lista (valores como escalares Python)."""
+
+    def __init__(self, valores):
+        self._valores = valores
+
+    def __len__(self):
+        return len(self._valores)
+
+    def __getitem__(self, indice):
+        valor = self._valores[indice]
+        return valor.tolist() if isinstance(valor, np.ndarray) else valor.item()
+
+    def __iter__(self):
+        return iter(self._valores.tolist())
+
+    def __repr__(self):
+        return repr(self._valores.tolist())
+
+
+class ColetorColunar:
+    """Coletor de dados em colunas NumPy pré-alocadas, crescendo em blocos de `tamanho_bloco` linhas.
+
+    Substitui o DataCollector do Mesa mantendo a interface usada pela visualização
+    (`collect` e `model_vars[nome][-1]`). Além dos reporters do modelo, calcula
+    séries por tipo de agente: cada reporter por tipo recebe a lista de agentes
+    daquele tipo e a coluna se chama "<tipo>_<métrica>".
+
+    Com `arquivo` (.csv ou .parquet), cada bloco cheio é gravado em disco e
+    descartado da memória, mantendo apenas as últimas `reter` linhas.
+    """
+
+    def __init__(self, model_reporters=None, reporters_por_tipo=None, tamanho_bloco=4096,
+                 arquivo=None, reter=1):
+        self.model_reporters = dict(model_reporters or {})
+        self.reporters_por_tipo = dict(reporters_por_tipo or {})
+        self.tamanho_bloco = tamanho_bloco
+        self.reter = reter
+        self.arquivo = arquivo
+        self._gravador = None
+        self._colunas = None  # criadas na primeira coleta, quando os tipos dos valores são conhecidos
+        self._n = 0
+        self._inicio_pendente = 0  # primeira linha em memória ainda não gravada em disco
+        self.linhas_gravadas = 0
+
+    def _linha(self, model):
+        linha = {"passo": model.passos}
+        for nome, reporter in self.model_reporters.items():
+            linha[nome] = reporter(model) if callable(reporter) else getattr(model, reporter)
+        if self.reporters_por_tipo:
+            for tipo, agentes in model.agentes_por_tipo().items():
+                for metrica, reporter in self.reporters_por_tipo.items():
+                    linha[f"{tipo}_{metrica}"] = reporter(agentes)
+        return linha
+
+    def _criar_colunas(self, linha):
+        self._colunas = {}
+        for nome, valor in linha.items():
+            dtype = np.int64 if isinstance(valor, (int, np.integer)) and not isinstance(valor, bool) else np.float64
+            self._colunas[nome] = np.zeros(self.tamanho_bloco, dtype=dtype)
+
+    def collect(self, model):
+        """Registra uma linha com os valores atuais dos reporters."""
+        linha = self._linha(model)
+        if self._colunas is None:
+            self._criar_colunas(linha)
+        elif self._n == len(self._colunas["passo"]):
+            if self.arquivo:
+                self.descarregar()
+            else:
+                for nome, coluna in self._colunas.items():
+                    self._colunas[nome] = np.concatenate([coluna, np.zeros(self.tamanho_bloco, dtype=coluna.dtype)])
+
+        n = self._n
+        for nome, valor in linha.items():
+            self._colunas[nome][n] = valor
+        self._n = n + 1
+
+    @property
+    def model_vars(self):
+        """Séries retidas em memória, no formato {nome: sequência de valores}."""
+        if self._colunas is None:
+            return {nome: _Serie(np.zeros(0)) for nome in self.model_reporters}
+        return {nome: _Serie(coluna[:self._n]) for nome, coluna in self._colunas.items()}
+
+    def colunas(self):
+        """Retorna as colunas retidas em memória como arrays NumPy (cópias)."""
+        if self._colunas is None:
+            return {}
+        return {nome: coluna[:self._n].copy() for nome, coluna in self._colunas.items()}
+
+    def get_model_vars_dataframe(self):
+        import pandas as pd
+        return pd.DataFrame(self.colunas()).set_index("passo") if self._colunas else pd.DataFrame()
+
+    def descarregar(self):
+        """Grava em `arquivo` as linhas ainda não gravadas e libera a memória, retendo as últimas `reter`."""
+        if not self.arquivo or self._colunas is None:
+            return
+        bloco = {nome: coluna[self._inicio_pendente:self._n] for nome, coluna in self._colunas.items()}
+        if len(bloco["passo"]):
+            self._gravar(bloco)
+            self.linhas_gravadas += len(bloco["passo"])
+
+        manter = min(self.reter, self._n)
+        for coluna in self._colunas.values():
+            coluna[:manter] = coluna[self._n - manter:self._n]
+        self._n = manter
+        self._inicio_pendente = manter  # as linhas retidas já estão no arquivo
+
+    def _gravar(self, bloco):
+        if self._gravador is None:
+            extensao = os.path.splitext(self.arquivo)[1].lower()
+            self._gravador = _GravadorParquet(self.arquivo) if extensao == ".parquet" else _GravadorCSV(self.arquivo)
+        self._gravador.gravar(bloco)
+
+    def fechar(self):
+        self.descarregar()
+        if self._gravador is not None:
+            self._gravador.fechar()
+            self._gravador = None
+
+    def desligar_arquivo(self):
+        """Passa a manter todas as linhas em memória; as ainda não gravadas não vão para o arquivo atual."""
+        if self._gravador is not None:
+            self._gravador.fechar()
+        self.arquivo = None
+        self._gravador = None
+
+
+class _GravadorCSV:
+    def __init__(self, caminho, modo="w"):
+        self.caminho = caminho
+        self.modo = modo
+        self.arquivo = None  # aberto na primeira gravação
+        self.cabecalho_escrito = False
+
+    # Num instantâneo (checkpoint.py) o gravador guarda só o caminho e volta a anexar ao
+    # arquivo; como só abre ao gravar, uma cópia restaurada que não grava não abre nada
+    def __getstate__(self):
+        return {"caminho": self.caminho, "cabecalho_escrito": self.cabecalho_escrito}
+
+    def __setstate__(self, estado):
+        self.__init__(estado["caminho"], modo="a")
+        self.cabecalho_escrito = estado["cabecalho_escrito"]
+
+    def gravar(self, bloco):
+        if self.arquivo is None:
+            self.arquivo = open(self.caminho, self.modo, encoding="utf-8")
+        if not self.cabecalho_escrito:
+            self.arquivo.write(",".join(bloco) + "\n")
+            self.cabecalho_escrito = True
+        formatos = ["%d" if coluna.dtype.kind == "i" else "%.17g" for coluna in bloco.values()]
+        np.savetxt(self.arquivo, np.column_stack(list(bloco.values())), fmt=formatos, delimiter=",")
+        self.arquivo.flush()
+
+    def fechar(self):
+        if self.arquivo is not None:
+            self.arquivo.close()
+            self.arquivo = None
+
+
+class _GravadorParquet:
+    def __init__(self, caminho):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as erro:
+            raise ImportError("A gravação em Parquet requer o pacote pyarrow (pip install pyarrow).") from erro
+        self.pa = pa
+        self.pq = pq
+        self.caminho = caminho
+        self.escritor = None
+
+    # Um arquivo Parquet não aceita anexar: restaurado de um instantâneo, o
+    # gravador continua em um arquivo novo ao lado ("nome.1.parquet", ...)
+    def __getstate__(self):
+        return {"caminho": self.caminho}
+
+    def __setstate__(self, estado):
+        base, extensao = os.path.splitext(estado["caminho"])
+        partes = base.rsplit(".", 1)
+        if len(partes) == 2 and partes[1].isdigit():
+            base, parte = partes[0], int(partes[1]) + 1
+        else:
+            parte = 1
+        caminho = f"{base}.{parte}{extensao}"
+        while os.path.exists(caminho):
+            parte += 1
+            caminho = f"{base}.{parte}{extensao}"
+        self.__init__(caminho)
+
+    def gravar(self, bloco):
+        tabela = self.pa.table({nome: coluna.copy() for nome, coluna in bloco.items()})
+        if self.escritor is None:
+            self.escritor = self.pq.ParquetWriter(self.caminho, tabela.schema)
+        self.escritor.write_table(tabela)
+
+    def fechar(self):
+        if self.escritor is not None:
+            self.escritor.close()
@@ -0,0 +1,144 @@
+import heapq
+from collections import deque
+
+CONFIRMADO = "confirmado"
+OBSOLETO = "obsoleto"
+CONSUMIDO = "consumido"
+
+
+class Crenca:
+    """Uma observação de recurso ou estrutura em uma posição do grid."""
+
+    __slots__ = ("tipo", "pos", "estado", "passo")
+
+    def __init__(self, tipo, pos, estado, passo):
+        self.tipo = tipo
+        self.pos = pos
+        self.estado = estado
+        self.passo = passo  # passo em que a observação chegou ao BDI
+
+    def __repr__(self):
+        return f"Crenca({self.tipo!r}, {self.pos}, {self.estado}, passo={self.passo})"
+
+
+def categoria(tipo):
+    """Cristal, Metal e "Recurso" (nome usado pelo agente cooperativo) são a mesma categoria de crença."""
+    return "Estrutura" if tipo == "Estrutura" else "Recurso"
+
+
+class BaseCrencas:
+    """Crenças do AgenteBDI indexadas por (posição, categoria), com fila de alvos pendentes.
+
+    Registrar, consultar e consumir custam O(1); a fila de prioridade entrega os
+    recursos confirmados do mais antigo ao mais recente e descarta, ao retirá-los,
+    os que deixaram de estar confirmados.
+    """
+
+    def __init__(self):
+        self.crencas = {}  # (pos, categoria) -> Crenca
+        self.explorados = set()
+        self.consumidos = set()  # posições de recursos coletados antes de qualquer observação chegar
+        self._pendentes = []  # heap de (passo, sequência, chave)
+        self._na_fila = set()  # chaves presentes em _pendentes
+        self._confirmados = {}  # chave -> Crenca, apenas recursos no estado confirmado
+        self._por_idade = deque()  # (passo, chave) dos recursos registrados, do mais antigo ao mais recente
+        self._sequencia = 0
+        self.versao = 0  # incrementada a cada mudança nos recursos confirmados
+
+    def registrar(self, tipo, pos, passo):
+        """Registra uma observação; observações de recursos já consumidos são ignoradas.
+
+        Uma nova observação de uma posição conhecida renova o passo da crença e
+        reconfirma o recurso obsoleto, que volta à fila de pendentes.
+        """
+        if tipo == "Explorado":
+            self.explorados.add(pos)
+            return
+        chave = (pos, categoria(tipo))
+        crenca = self.crencas.get(chave)
+        if crenca is not None:
+            if crenca.estado == CONSUMIDO:
+                return
+            crenca.passo = passo
+            if chave[1] == "Recurso":
+                if crenca.estado == OBSOLETO:
+                    crenca.estado = CONFIRMADO
+                    self._confirmados[chave] = crenca
+                    self._enfileirar(chave, passo)
+                    self.versao += 1
+                self._por_idade.append((passo, chave))  # a entrada antiga é ignorada por não bater com o passo
+            return
+        if chave[1] == "Recurso" and pos in self.consumidos:
+            return
+        crenca = self.crencas[chave] = Crenca(tipo, pos, CONFIRMADO, passo)
+        if chave[1] == "Recurso":
+            self._confirmados[chave] = crenca
+            self._enfileirar(chave, passo)
+            self._por_idade.append((passo, chave))
+            self.versao += 1
+
+    def _enfileirar(self, chave, passo):
+        if chave not in self._na_fila:  # o recurso reconfirmado pode ainda estar na fila
+            heapq.heappush(self._pendentes, (passo, self._sequencia, chave))
+            self._na_fila.add(chave)
+            self._sequencia += 1
+
+    def consumir(self, pos):
+        """Marca o recurso na posição como coletado; se ainda não era conhecido, fica registrado como consumido."""
+        chave = (pos, "Recurso")
+        crenca = self.crencas.get(chave)
+        if crenca is None:
+            self.consumidos.add(pos)
+        elif crenca.estado != CONSUMIDO:
+            crenca.estado = CONSUMIDO
+            self._confirmados.pop(chave, None)
+            self.versao += 1
+
+    def marcar_obsoletas(self, passo_atual, idade_maxima):
+        """Marca como obsoletos os recursos confirmados observados há mais de `idade_maxima` passos.
+
+        Os passos de registro só crescem, então basta retirar da frente da fila
+        por idade: o custo é proporcional às crenças que envelheceram.
+        """
+        por_idade = self._por_idade
+        while por_idade and passo_atual - por_idade[0][0] > idade_maxima:
+            passo, chave = por_idade.popleft()
+            crenca = self.crencas[chave]
+            if crenca.estado == CONFIRMADO and crenca.passo == passo:  # senão, foi observado de novo depois
+                crenca.estado = OBSOLETO
+                self._confirmados.pop(chave, None)
+                self.versao += 1
+
+    def proximo_pendente(self):
+        """Retira da fila e retorna o recurso confirmado mais antigo, ou None."""
+        while self._pendentes:
+            _, _, chave = heapq.heappop(self._pendentes)
+            self._na_fila.discard(chave)
+            crenca = self.crencas[chave]
+            if crenca.estado == CONFIRMADO:
+                return crenca
+        return None
+
+    def tem_pendentes(self):
+        """Indica se há algum recurso confirmado na fila (descarta da frente os que não estão)."""
+        while self._pendentes and self.crencas[self._pendentes[0][2]].estado != CONFIRMADO:
+            self._na_fila.discard(heapq.heappop(self._pendentes)[2])
+        return bool(self._pendentes)
+
+    def pendentes(self):
+        """Recursos confirmados ainda na fila, do mais antigo ao mais recente."""
+        return [self.crencas[chave] for _, _, chave in sorted(self._pendentes)
+                if self.crencas[chave].estado == CONFIRMADO]
+
+    def confirmados(self):
+        """Todos os recursos confirmados, estejam ou não na fila de pendentes."""
+        return list(self._confirmados.values())
+
+    def estado(self, pos, tipo="Recurso"):
+        crenca = self.crencas.get((pos, categoria(tipo)))
+        if crenca is None and categoria(tipo) == "Recurso" and pos in self.consumidos:
+            return CONSUMIDO
+        return crenca.estado if crenca else None
+
+    def estruturas(self):
+        return [crenca for (_, cat), crenca in self.crencas.items() if cat == "Estrutura"]
@@ -0,0 +1,481 @@
+"""Simulação dividida em faixas do grid, cada uma num processo, coordenada pelo processo principal.
+
+Cada trabalhador monta o mesmo mundo (mesmos parâmetros e semente) e fica só
+com os agentes da sua faixa vertical do grid; a cada passo ele executa os
+agentes da faixa. Agentes que saem da faixa migram para o trabalhador
+vizinho. Cada faixa é dona dos recursos das suas colunas e só ela os coleta;
+os recursos das `halo` colunas vizinhas de cada lado ficam visíveis, só para
+leitura (percepção e busca do recurso mais próximo), e são atualizados quando
+a faixa dona os coleta. Um agente que entra numa célula com recurso de outra
+faixa migra primeiro e coleta ao chegar, no passo seguinte, então um recurso
+nunca é coletado duas vezes.
+
+O coordenador mantém a base, o AgenteBDI e sombras só dos agentes que o BDI
+dirige (baseados em estado e em objetivos). O trabalho por agente fica nos
+trabalhadores: eles devolvem apenas os estados que mudaram, os registros de
+memória de quem está na base (o compartilhamento) e as contagens por tipo de
+agente usadas na coleta de dados.
+
+Os resultados são estatisticamente equivalentes aos do modelo em um só
+processo, não idênticos: cada faixa tem seu próprio gerador aleatório e o
+BDI vê o estado dos agentes um passo depois.
+"""
+import multiprocessing
+import os
+import pickle
+from bisect import bisect_right
+
+from memoria import nova_memoria
+from planet_model import PlanetaModelo, condicao_de_parada
+
+TIPOS_DIRIGIDOS = ("AgenteBaseadoEmEstado", "AgenteBaseadoEmObjetivos")  # agentes com sombra no coordenador
+
+
+def _limites(width, faixas):
+    return [round(i * width / faixas) for i in range(faixas + 1)]
+
+
+class _CrencasLocais:
+    """No trabalhador, só registra as posições dos recursos retirados para avisar o coordenador."""
+
+    def __init__(self):
+        self.retirados = []
+
+    def consumir(self, pos):
+        self.retirados.append(pos)
+
+
+class _BDILocal:
+    """Substituto do AgenteBDI no trabalhador: intenções recebidas do coordenador, sem planejamento."""
+
+    def __init__(self):
+        self.beliefs = _CrencasLocais()
+        self.intentions = {}
+
+    def receber_informacoes(self, agente):
+        pass  # o coordenador recebe os registros de quem está na base no fim do passo
+
+
+class _RecursosDaFaixa:
+    """Índice de recursos do trabalhador: enxerga a faixa e o halo, mas só oferece para coleta os da faixa."""
+
+    def __init__(self, recursos, x0, x1):
+        self.recursos = recursos
+        self.x0, self.x1 = x0, x1
+
+    def em(self, pos):
+        return self.recursos.em(pos) if self.x0 <= pos[0] < self.x1 else None
+
+    def __getattr__(self, nome):
+        return getattr(self.recursos, nome)
+
+    def __len__(self):
+        return len(self.recursos)
+
+    def __iter__(self):
+        return iter(self.recursos)
+
+    def __contains__(self, recurso):
+        return recurso in self.recursos
+
+
+class AgenteSombra:
+    """Espelho, no coordenador, de um agente que vive num trabalhador.
+
+    O BDI lê e altera as sombras como se fossem os agentes; as alterações
+    viram ordens, aplicadas ao agente real no passo seguinte. `com_ordens` é o
+    conjunto, compartilhado entre as sombras, das que têm ordens a enviar.
+    """
+
+    def __init__(self, unique_id, tipo, pos, width, height, com_memoria, com_ordens):
+        self.unique_id = unique_id
+        self.tipo = tipo
+        self.pos = pos
+        self.recurso_atual = None  # tipo do recurso carregado
+        self._objetivo = "explorar"
+        self.destino = None
+        if com_memoria:
+            self.memoria = nova_memoria(width, height)
+        self.ordens = []
+        self._com_ordens = com_ordens
+
+    def _ordenar(self, ordem):
+        self.ordens.append(ordem)
+        self._com_ordens.add(self)
+
+    @property
+    def objetivo_atual(self):
+        return self._objetivo
+
+    @objetivo_atual.setter
+    def objetivo_atual(self, valor):
+        self._objetivo = valor
+        self._ordenar(("objetivo", valor))
+
+    # Nomes usados pelas diferentes classes de agente
+    @property
+    def destino_atual(self):
+        return self.destino
+
+    @property
+    def destino_recurso(self):
+        return self.destino
+
+    def definir_destino(self, destino, objetivo="buscar_recurso"):
+        if destino:
+            self.destino = destino
+            self._objetivo = objetivo
+        else:
+            self._objetivo = "explorar"
+        self._ordenar(("destino", destino, objetivo))
+
+    def atualizar(self, estado):
+        """Aplica o estado enviado pelo trabalhador (só quando algo mudou)."""
+        _, self.pos, self.recurso_atual, self._objetivo, self.destino, registros, visitas = estado
+        self.incorporar(registros, visitas)
+
+    def incorporar(self, registros, visitas):
+        """Acrescenta à memória da sombra os registros e visitas novos do agente."""
+        memoria = getattr(self, "memoria", None)
+        if memoria is not None:
+            for tipo, pos in registros:
+                memoria.registrar(tipo, pos)
+            for indice in visitas:
+                memoria.visitar(divmod(indice, memoria.height))
+
+
+class _TotaisTipo:
+    """Contagens de um tipo de agente somadas entre as faixas, no lugar da lista de agentes na coleta de dados."""
+
+    def __init__(self):
+        self.quantidade = self.carregando = self.ocupados = 0
+
+    def __len__(self):
+        return self.quantidade
+
+    def total_carregando(self):
+        return self.carregando
+
+    def total_ocupados(self):
+        return self.ocupados
+
+
+# ----------------------------------------------------------------------
+# Trabalhador
+
+
+class _Faixa:
+    """Parte do mundo executada por um trabalhador: os agentes com x em [x0, x1)."""
+
+    def __init__(self, parametros, indice, limites, halo):
+        self.indice = indice
+        self.x0, self.x1 = limites[indice], limites[indice + 1]
+        self.limites = limites
+        modelo = self.modelo = PlanetaModelo(**parametros)
+        modelo.random.seed(f"{parametros.get('seed')}/{indice}")  # sorteios independentes por faixa
+        modelo.agente_bdi = _BDILocal()
+        self.listas = modelo.agentes_por_tipo()
+        self.entregas_enviadas = 0  # linhas do registro de entregas da base já enviadas ao coordenador
+        # Fica com os recursos da faixa e do halo; os do halo são visíveis, mas não coletáveis
+        for recurso in list(modelo.indice_recursos):
+            if not self.x0 - halo <= recurso.pos[0] < self.x1 + halo:
+                modelo.indice_recursos.remover(recurso)
+        modelo.indice_recursos = _RecursosDaFaixa(modelo.indice_recursos, self.x0, self.x1)
+        for lista in self.listas.values():
+            for agente in list(lista):
+                if not self.x0 <= agente.pos[0] < self.x1:
+                    self._retirar(agente)
+        for lista in self.listas.values():
+            for agente in lista:
+                agente._enviados = [0, 0]
+                agente._ultimo_estado = None
+
+    def _retirar(self, agente):
+        self.modelo.schedule.remove(agente)
+        self.modelo.grid.remove_agent(agente)
+        self.modelo.agents_by_id.pop(agente.unique_id, None)
+
+    def _receber(self, agente, pos):
+        agente.model = self.modelo
+        self.modelo.schedule.add(agente)
+        self.modelo.grid.place_agent(agente, pos)
+        self.modelo.agents_by_id[agente.unique_id] = agente
+
+    def _coletar_na_chegada(self, agente):
+        """Coleta o recurso da célula onde o imigrante chegou (na faixa de origem ele não podia)."""
+        if agente.recurso_atual is not None or self.modelo.recurso_em(agente.pos) is None:
+            return
+        coletar = getattr(agente, "tentar_coletar_recurso", None)
+        if coletar is not None:
+            coletar()
+        else:
+            agente.recurso_atual = self.modelo.recurso_em(agente.pos)
+            self.modelo.retirar_recurso(agente.recurso_atual)
+
+    def passo(self, ordens, intencoes, imigrantes, retirados_halo):
+        modelo = self.modelo
+        modelo.passos += 1
+        for pos in retirados_halo:
+            recurso = modelo.indice_recursos.recursos.em(pos)
+            if recurso is not None:
+                modelo.indice_recursos.remover(recurso)  # coletado pela faixa vizinha
+        for dados in imigrantes:
+            pos, agente = pickle.loads(dados)
+            self._receber(agente, pos)
+            self._coletar_na_chegada(agente)
+        bdi_intencoes = modelo.agente_bdi.intentions
+        for unique_id, destino in intencoes.items():
+            if destino is None:
+                bdi_intencoes.pop(unique_id, None)
+            else:
+                bdi_intencoes[unique_id] = destino
+        for unique_id, lista_ordens in ordens.items():
+            agente = modelo.agents_by_id.get(unique_id)
+            if agente is None:
+                continue
+            for ordem in lista_ordens:
+                if ordem[0] == "destino":
+                    agente.definir_destino(ordem[1], objetivo=ordem[2])
+                else:
+                    agente.objetivo_atual = ordem[1]
+
+        modelo.schedule.step()
+
+        estados, na_base, emigrantes, contagens = [], [], [], {}
+        for tipo, lista in self.listas.items():
+            dirigido = tipo in TIPOS_DIRIGIDOS
+            carregando = ocupados = 0
+            for agente in list(lista):
+                if agente.recurso_atual is not None:
+                    carregando += 1
+                    ocupados += 1
+                elif getattr(agente, "destino_atual", None) or getattr(agente, "destino_recurso", None):
+                    ocupados += 1
+                if dirigido:
+                    estado = self._estado(agente)
+                    if estado is not None:
+                        estados.append(estado)
+                elif agente.pos == modelo.base_pos and hasattr(agente, "memoria"):
+                    na_base.append((agente.unique_id, tipo, *self._novidades(agente)))
+                if not self.x0 <= agente.pos[0] < self.x1:
+                    pos = agente.pos
+                    self._retirar(agente)
+                    agente.model = None
+                    emigrantes.append((bisect_right(self.limites, pos[0]) - 1, pickle.dumps((pos, agente))))
+            contagens[tipo] = (len(lista), carregando, ocupados)
+        crencas = modelo.agente_bdi.beliefs
+        retirados, crencas.retirados = crencas.retirados, []
+        entregas = modelo.base.entregas.desde(self.entregas_enviadas)
+        self.entregas_enviadas += len(entregas)
+        return estados, na_base, emigrantes, retirados, entregas, contagens
+
+    @staticmethod
+    def _novidades(agente):
+        """Registros e visitas da memória do agente ainda não enviados ao coordenador."""
+        memoria = agente.memoria
+        enviados = agente._enviados
+        registros = memoria.desde(enviados[0])
+        visitas = memoria.visitas_desde(enviados[1]).tolist()
+        enviados[0], enviados[1] = len(memoria), len(memoria.visitas)
+        return registros, visitas
+
+    def _estado(self, agente):
+        """Estado de um agente dirigido pelo BDI, ou None se nada mudou desde o último envio."""
+        carga = agente.recurso_atual.tipo if agente.recurso_atual is not None else None
+        destino = getattr(agente, "destino_atual", None) or getattr(agente, "destino_recurso", None)
+        atual = (agente.pos, carga, getattr(agente, "objetivo_atual", "explorar"), destino)
+        registros, visitas = self._novidades(agente)
+        if atual == agente._ultimo_estado and not registros and not visitas:
+            return None
+        agente._ultimo_estado = atual
+        return (agente.unique_id, *atual, registros, visitas)
+
+
+def _trabalhador(conexao, parametros, indice, limites, halo):
+    faixa = _Faixa(parametros, indice, limites, halo)
+    conexao.send("pronto")
+    while True:
+        mensagem = conexao.recv()
+        if mensagem is None:
+            break
+        conexao.send(faixa.passo(*mensagem))
+    conexao.close()
+
+
+# ----------------------------------------------------------------------
+# Coordenador
+
+
+class SimulacaoDistribuida:
+    """PlanetaModelo executado em `trabalhadores` processos, um por faixa vertical do grid.
+
+    Aceita os mesmos parâmetros do modelo (recursos compactos são sempre
+    usados, pois os agentes migram entre processos carregando o recurso);
+    `halo` é quantas colunas das faixas vizinhas cada trabalhador enxerga
+    (1 cobre a percepção dos agentes). `modelo` é o modelo do coordenador,
+    com base, BDI, pontuações e coleta de dados. Use como gerenciador de
+    contexto ou chame `fechar()`.
+    """
+
+    def __init__(self, trabalhadores=None, halo=1, **parametros):
+        conflitos = [nome for nome in ("motor_reativo", "avanco_rapido", "mundo_esparso") if parametros.get(nome)]
+        if conflitos:
+            raise ValueError(f"O modo distribuído não pode ser combinado com {', '.join(conflitos)}.")
+        parametros = {**parametros, "recursos_compactos": True}
+        self.trabalhadores = trabalhadores or os.cpu_count() or 1
+        self.limites = _limites(parametros["width"], self.trabalhadores)
+        self.halo = halo
+
+        contexto = multiprocessing.get_context("spawn")
+        self.processos, self.conexoes = [], []
+        for indice in range(self.trabalhadores):
+            local, remota = contexto.Pipe()
+            processo = contexto.Process(target=_trabalhador, args=(remota, parametros, indice, self.limites, halo),
+                                        daemon=True)
+            processo.start()
+            self.processos.append(processo)
+            self.conexoes.append(local)
+
+        # O coordenador monta o mesmo mundo; os agentes dirigidos pelo BDI viram sombras e os
+        # demais saem do coordenador (a coleta de dados usa as contagens enviadas pelas faixas)
+        modelo = self.modelo = PlanetaModelo(**parametros)
+        self.sombras = {}
+        self._com_ordens = set()
+        self._totais = {}
+        for tipo, lista in modelo.agentes_por_tipo().items():
+            sombras = []
+            for agente in lista:
+                modelo.grid.remove_agent(agente)
+                if tipo in TIPOS_DIRIGIDOS:
+                    sombra = AgenteSombra(agente.unique_id, tipo, agente.pos, modelo.width, modelo.height,
+                                          True, self._com_ordens)
+                    sombras.append(sombra)
+                    self.sombras[agente.unique_id] = sombra
+            self._totais[tipo] = _TotaisTipo()
+            self._totais[tipo].quantidade = len(lista)
+            lista[:] = sombras
+        modelo.agentes_por_tipo = lambda: self._totais  # a coleta de dados lê as contagens das faixas
+        self._memorias = {}  # unique_id -> sombra só com a memória, dos agentes não dirigidos que passam na base
+        self._intencoes_enviadas = {}
+        self._imigrantes = [[] for _ in range(self.trabalhadores)]
+        self._retirados = [[] for _ in range(self.trabalhadores)]
+        self.recursos_iniciais = len(modelo.indice_recursos)
+        for conexao in self.conexoes:
+            conexao.recv()  # espera cada trabalhador montar sua faixa
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *erro):
+        self.fechar()
+
+    @property
+    def pontuacoes(self):
+        return self.modelo.pontuacoes
+
+    def faixa(self, pos):
+        return bisect_right(self.limites, pos[0]) - 1
+
+    def _intencoes_alteradas(self):
+        """Intenções do BDI que mudaram desde o último passo (None para as retiradas)."""
+        intencoes, enviadas = self.modelo.agente_bdi.intentions, self._intencoes_enviadas
+        alteradas = {uid: destino for uid, destino in intencoes.items() if enviadas.get(uid) != destino}
+        alteradas.update((uid, None) for uid in enviadas if uid not in intencoes)
+        self._intencoes_enviadas = dict(intencoes)
+        return alteradas
+
+    def _memoria_de(self, unique_id, tipo):
+        sombra = self.sombras.get(unique_id) or self._memorias.get(unique_id)
+        if sombra is None:
+            sombra = self._memorias[unique_id] = AgenteSombra(
+                unique_id, tipo, self.modelo.base_pos, self.modelo.width, self.modelo.height, True, set())
+        return sombra
+
+    def step(self):
+        modelo = self.modelo
+        modelo.passos += 1
+        modelo.eventos.passo = modelo.passos
+
+        # Ordens do BDI do passo anterior, para a faixa onde cada agente está; as intenções
+        # alteradas vão a todas as faixas, pois os agentes migram
+        ordens = [{} for _ in range(self.trabalhadores)]
+        for sombra in self._com_ordens:
+            ordens[self.faixa(sombra.pos)][sombra.unique_id], sombra.ordens = sombra.ordens, []
+        self._com_ordens.clear()
+        intencoes = self._intencoes_alteradas()
+        for i, conexao in enumerate(self.conexoes):
+            conexao.send((ordens[i], intencoes, self._imigrantes[i], self._retirados[i]))
+
+        self._imigrantes = [[] for _ in range(self.trabalhadores)]
+        self._retirados = [[] for _ in range(self.trabalhadores)]
+        for totais in self._totais.values():
+            totais.quantidade = totais.carregando = totais.ocupados = 0
+        na_base = []
+        for i, conexao in enumerate(self.conexoes):
+            estados, chegados, emigrantes, retirados, entregas, contagens = conexao.recv()
+            for pos in retirados:
+                recurso = modelo.recurso_em(pos)
+                if recurso is not None:
+                    modelo.retirar_recurso(recurso)  # contadores e crenças do BDI
+                for j in (i - 1, i + 1):  # avisa as faixas vizinhas que enxergam a célula no halo
+                    if 0 <= j < self.trabalhadores and \
+                            self.limites[j] - self.halo <= pos[0] < self.limites[j + 1] + self.halo:
+                        self._retirados[j].append(pos)
+            for estado in estados:
+                sombra = self.sombras[estado[0]]
+                sombra.atualizar(estado)
+                if sombra.pos == modelo.base_pos:
+                    na_base.append(sombra)
+            for unique_id, tipo, registros, visitas in chegados:
+                sombra = self._memoria_de(unique_id, tipo)
+                sombra.incorporar(registros, visitas)
+                na_base.append(sombra)
+            for entrega in entregas:
+                modelo.base.entregas.registrar(*entrega)
+                modelo.contabilizar_entrega()
+            for destino, dados in emigrantes:
+                self._imigrantes[destino].append(dados)
+            for tipo, (quantidade, carregando, ocupados) in contagens.items():
+                totais = self._totais[tipo]
+                totais.quantidade += quantidade
+                totais.carregando += carregando
+                totais.ocupados += ocupados
+
+        # Compartilhamento (só de quem está na base), coleta e BDI, como no PlanetaModelo.step
+        for sombra in na_base:
+            modelo.agente_bdi.receber_informacoes(sombra)
+        modelo.datacollector.collect(modelo)
+        if modelo.schedule.deve_ativar("AgenteBDI", modelo.passos):
+            modelo.agente_bdi.step()
+        self.verificar_conservacao()
+        if modelo.concluido():
+            modelo.running = False
+
+    def verificar_conservacao(self):
+        """Confere que cada recurso está em um só lugar: no grid, carregado por um agente ou entregue."""
+        carregados = sum(totais.carregando for totais in self._totais.values())
+        total = len(self.modelo.indice_recursos) + carregados + len(self.modelo.base.entregas)
+        if total != self.recursos_iniciais:
+            raise RuntimeError(f"Recursos não conservados no passo {self.modelo.passos}: "
+                               f"{total} contabilizados de {self.recursos_iniciais}.")
+
+    def run_until(self, condicao=None, max_passos=None):
+        """Como PlanetaModelo.run_until; as condições recebem o modelo do coordenador."""
+        parar = condicao_de_parada(condicao)
+        executados = 0
+        while self.modelo.running and (max_passos is None or executados < max_passos) and not parar(self.modelo):
+            self.step()
+            executados += 1
+        return executados
+
+    def fechar(self):
+        for conexao in self.conexoes:
+            try:
+                conexao.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for processo in self.processos:
+            processo.join(timeout=5)
+        self.conexoes, self.processos = [], []
+        self.modelo.datacollector.fechar()
+        self.modelo.eventos.fechar()
@@ -0,0 +1,62 @@
+from array import array
+
+
+class RegistroEntregas:
+    """Registro só de acréscimos das entregas feitas na base, em arrays tipados.
+
+    Cada entrega é uma linha (passo, agente, classe do agente, tipo do recurso,
+    utilidade, posição de origem); agentes, classes e tipos são guardados como
+    índices nas listas `agentes`, `classes` e `tipos`. Os totais por classe e
+    por tipo são atualizados a cada entrega, então consultá-los custa O(1).
+    """
+
+    def __init__(self, classes=()):
+        self.passo = array("i")
+        self.agente = array("i")
+        self.classe = array("b")
+        self.tipo = array("b")
+        self.utilidade = array("i")
+        self.x = array("i")
+        self.y = array("i")
+        self.agentes, self.classes, self.tipos = [], [], []
+        self._indices = ({}, {}, {})  # agente, classe e tipo -> índice na lista correspondente
+        self.utilidade_por_classe = {classe: 0 for classe in classes}
+        self.entregas_por_classe = {classe: 0 for classe in classes}
+        self.utilidade_por_tipo = {}
+        self.entregas_por_tipo = {}
+        self.utilidade_total = 0
+        for classe in classes:
+            self._indice(1, self.classes, classe)
+
+    def _indice(self, coluna, valores, valor):
+        indices = self._indices[coluna]
+        indice = indices.get(valor)
+        if indice is None:
+            indice = indices[valor] = len(valores)
+            valores.append(valor)
+        return indice
+
+    def registrar(self, passo, agente, classe, tipo, utilidade, pos):
+        self.passo.append(passo)
+        self.agente.append(self._indice(0, self.agentes, agente))
+        self.classe.append(self._indice(1, self.classes, classe))
+        self.tipo.append(self._indice(2, self.tipos, tipo))
+        self.utilidade.append(utilidade)
+        self.x.append(pos[0])
+        self.y.append(pos[1])
+        self.utilidade_por_classe[classe] = self.utilidade_por_classe.get(classe, 0) + utilidade
+        self.entregas_por_classe[classe] = self.entregas_por_classe.get(classe, 0) + 1
+        self.utilidade_por_tipo[tipo] = self.utilidade_por_tipo.get(tipo, 0) + utilidade
+        self.entregas_por_tipo[tipo] = self.entregas_por_tipo.get(tipo, 0) + 1
+        self.utilidade_total += utilidade
+
+    def linha(self, i):
+        return (self.passo[i], self.agentes[self.agente[i]], self.classes[self.classe[i]],
+                self.tipos[self.tipo[i]], self.utilidade[i], (self.x[i], self.y[i]))
+
+    def desde(self, inicio):
+        """Entregas a partir da posição `inicio`, como tuplas na ordem dos argumentos de `registrar`."""
+        return [self.linha(i) for i in range(inicio, len(self))]
+
+    def __len__(self):
+        return len(self.passo)
@@ -0,0 +1,130 @@
+from itertools import chain
+
+from perfilamento import PERFIL_NULO
+
+ATIVACOES = ("fixa", "aleatoria", "simultanea")
+
+
+class Escalonador:
+    """Registro persistente dos agentes por tipo e ativação deles a cada passo do modelo.
+
+    `ativacao` pode ser:
+      - "fixa": classe a classe, na ordem de registro, cada uma na ordem da
+        sua lista (o comportamento histórico do modelo);
+      - "aleatoria": todos os agentes embaralhados com `model.random` a cada passo;
+      - "simultanea": step() em todos e depois advance() nos que o definem.
+        Durante os step() (`decidindo`), o modelo só anota os movimentos e
+        as coletas (ver PlanetaModelo.mover e coletar), então todos decidem
+        sobre o mundo do início do passo; advance() os efetiva.
+
+    `frequencias` ({tipo: k}) ativa um tipo só a cada k passos, inclusive o
+    "AgenteBDI", executado pelo modelo numa fase própria. Agentes adormecidos
+    (ver `adormecer`) são pulados sem custo por passo: as listas de ativos só
+    são refeitas quando alguém dorme ou acorda.
+
+    Expõe também `agents`, `steps`, `add` e `remove`, como os schedules do Mesa.
+    """
+
+    def __init__(self, model, ativacao="fixa", frequencias=None):
+        if ativacao not in ATIVACOES:
+            raise ValueError(f"Ativação desconhecida: {ativacao!r} (use uma de {', '.join(ATIVACOES)}).")
+        self.model = model
+        self.ativacao = ativacao
+        self.frequencias = dict(frequencias or {})
+        self.steps = 0
+        self.decidindo = False  # fase de decisão da ativação simultânea
+        self.tipos = {}  # tipo -> lista de agentes (a mesma lista mantida pelo modelo)
+        self.executores = {}  # tipo -> o que de fato executa step() pelo tipo (a lista ou um motor vetorizado)
+        self.dormindo = set()  # unique_id dos agentes que não devem ser ativados
+        self._ativos = {}  # tipo -> executores sem os adormecidos (cache)
+
+    # ------------------------------------------------------------------
+    # Registro
+
+    def registrar(self, tipo, agentes, executores=None):
+        """Registra a lista de agentes de um tipo; `executores` substitui a lista na hora de ativá-los."""
+        self.tipos[tipo] = agentes
+        self.executores[tipo] = agentes if executores is None else executores
+        self._ativos.pop(tipo, None)
+
+    def add(self, agente):
+        tipo = type(agente).__name__
+        if tipo not in self.tipos:
+            self.registrar(tipo, [])
+        self.tipos[tipo].append(agente)
+        self._ativos.pop(tipo, None)
+
+    def remove(self, agente):
+        tipo = type(agente).__name__
+        self.tipos[tipo].remove(agente)
+        self.dormindo.discard(agente.unique_id)
+        self._ativos.pop(tipo, None)
+
+    def agentes(self):
+        """Itera todos os agentes registrados, tipo a tipo, sem montar uma lista."""
+        return chain.from_iterable(self.tipos.values())
+
+    @property
+    def agents(self):
+        return list(self.agentes())
+
+    def get_agent_count(self):
+        return sum(len(agentes) for agentes in self.tipos.values())
+
+    # ------------------------------------------------------------------
+    # Agentes ociosos
+
+    def adormecer(self, agente):
+        """Deixa de ativar o agente até `acordar`."""
+        self.dormindo.add(agente.unique_id)
+        self._ativos.pop(type(agente).__name__, None)
+
+    def acordar(self, agente):
+        self.dormindo.discard(agente.unique_id)
+        self._ativos.pop(type(agente).__name__, None)
+
+    def ativos(self, tipo):
+        """Executores do tipo que não estão dormindo, na ordem de registro."""
+        ativos = self._ativos.get(tipo)
+        if ativos is None:
+            executores = self.executores[tipo]
+            dormindo = self.dormindo
+            if dormindo and executores is self.tipos[tipo]:
+                ativos = [agente for agente in executores if agente.unique_id not in dormindo]
+            else:
+                ativos = executores
+            self._ativos[tipo] = ativos
+        return ativos
+
+    # ------------------------------------------------------------------
+    # Ativação
+
+    def deve_ativar(self, tipo, passo=None):
+        """Se o tipo é ativado no passo dado (por padrão, o passo atual do escalonador)."""
+        frequencia = self.frequencias.get(tipo, 1)
+        return frequencia <= 1 or (self.steps if passo is None else passo) % frequencia == 0
+
+    def step(self, perfil=None):
+        """Ativa os agentes de um passo; `perfil` (ver perfilamento.py) mede o tempo por tipo."""
+        self.steps += 1
+        if perfil is None:
+            perfil = PERFIL_NULO
+        tipos = [tipo for tipo in self.executores if self.deve_ativar(tipo)]
+        if self.ativacao == "fixa":
+            for tipo in tipos:
+                perfil.executar_passos(tipo, self.ativos(tipo))
+        elif self.ativacao == "aleatoria":
+            ordem = [(tipo, agente) for tipo in tipos for agente in self.ativos(tipo)]
+            self.model.random.shuffle(ordem)
+            perfil.executar_intercalados(ordem)
+        else:
+            self.decidindo = True
+            try:
+                for tipo in tipos:
+                    perfil.executar_passos(tipo, self.ativos(tipo))
+            finally:
+                self.decidindo = False
+            for tipo in tipos:
+                avancam = [agente for agente in self.ativos(tipo) if hasattr(agente, "advance")]
+                if avancam:
+                    perfil.executar_avancos(tipo, avancam)
@@ -0,0 +1,81 @@
+import numpy as np
+
+from navegacao import _DESLOCAMENTOS
+
+
+class MapaExploracao:
+    """Mapa global de células exploradas mantido pelo BDI, com a fronteira agrupada em blocos.
+
+    A fronteira são as células livres ainda não exploradas vizinhas de uma
+    explorada. Ela é atualizada incrementalmente a cada célula marcada (só a
+    vizinhança da célula muda) e agrupada em blocos de `tamanho_bloco` x
+    `tamanho_bloco` células; cada bloco com fronteira é um alvo de exploração,
+    representado por uma de suas células e valendo o tamanho da sua fronteira.
+    """
+
+    def __init__(self, width, height, obstaculos, tamanho_bloco=8):
+        self.width = width
+        self.height = height
+        self.obstaculos = obstaculos  # grade compartilhada com a navegação
+        self.tamanho_bloco = tamanho_bloco
+        self.explorado = np.zeros((width, height), dtype=bool)
+        self.total_explorado = 0
+        self.blocos = {}  # bloco -> conjunto de células (índice linear) da fronteira nele
+        self._representantes = {}  # bloco -> célula escolhida como alvo (cache)
+
+    def bloco(self, pos):
+        return (pos[0] // self.tamanho_bloco, pos[1] // self.tamanho_bloco)
+
+    def marcar(self, celulas):
+        """Marca como exploradas as células dadas por índice linear (x * height + y)."""
+        explorado = self.explorado
+        for indice in celulas:
+            x, y = divmod(int(indice), self.height)
+            if explorado[x, y]:
+                continue
+            explorado[x, y] = True
+            self.total_explorado += 1
+            self._alterar_fronteira((x, y), False)
+            for dx, dy in _DESLOCAMENTOS:
+                vx, vy = x + dx, y + dy
+                if 0 <= vx < self.width and 0 <= vy < self.height \
+                        and not explorado[vx, vy] and not self.obstaculos[vx, vy]:
+                    self._alterar_fronteira((vx, vy), True)
+
+    def _alterar_fronteira(self, pos, incluir):
+        chave = self.bloco(pos)
+        celulas = self.blocos.get(chave)
+        indice = pos[0] * self.height + pos[1]
+        if incluir:
+            if celulas is None:
+                celulas = self.blocos[chave] = set()
+            elif indice in celulas:
+                return
+            celulas.add(indice)
+        else:
+            if celulas is None or indice not in celulas:
+                return
+            celulas.discard(indice)
+            if not celulas:
+                del self.blocos[chave]
+        self._representantes.pop(chave, None)
+
+    def na_fronteira(self, pos):
+        return pos[0] * self.height + pos[1] in self.blocos.get(self.bloco(pos), ())
+
+    def alvos(self, excluir=()):
+        """Lista de (célula alvo, tamanho da fronteira) de cada bloco com fronteira, exceto os de `excluir`."""
+        alvos = []
+        for chave, celulas in self.blocos.items():
+            if chave in excluir:
+                continue
+            alvo = self._representantes.get(chave)
+            if alvo is None:
+                alvo = self._representantes[chave] = divmod(min(celulas), self.height)
+            alvos.append((alvo, len(celulas)))
+        return alvos
+
+    def cobertura(self):
+        """Fração das células livres do grid já exploradas."""
+        livres = self.obstaculos.size - int(self.obstaculos.sum())
+        return self.total_explorado / livres if livres else 1.0
@@ -0,0 +1,124 @@
+import heapq
+import math
+
+import numpy as np
+
+
+class IndiceRecursos:
+    """Índice espacial, em baldes de tamanho fixo, dos recursos ainda disponíveis no grid.
+
+    Cada balde cobre `tamanho_balde` x `tamanho_balde` células. Inserção e remoção
+    custam O(1); as consultas percorrem apenas os baldes em anéis crescentes ao
+    redor da posição consultada, em vez de todos os agentes do modelo.
+    """
+
+    def __init__(self, width, height, tamanho_balde=8):
+        self.width = width
+        self.height = height
+        self.tamanho_balde = tamanho_balde
+        self.baldes = {}  # (bx, by) -> {pos: recurso}
+        self.total = 0
+
+    def _balde(self, pos):
+        return (pos[0] // self.tamanho_balde, pos[1] // self.tamanho_balde)
+
+    def adicionar(self, recurso, pos=None):
+        """Registra um recurso disponível na posição informada (ou em recurso.pos)."""
+        pos = pos if pos is not None else recurso.pos
+        balde = self.baldes.setdefault(self._balde(pos), {})
+        if pos not in balde:
+            self.total += 1
+        balde[pos] = recurso
+
+    def remover(self, recurso, pos=None):
+        """Retira o recurso do índice; ignora recursos que já não estão nele."""
+        pos = pos if pos is not None else recurso.pos
+        if pos is None:
+            return
+        chave = self._balde(pos)
+        balde = self.baldes.get(chave)
+        if balde is None or balde.get(pos) is not recurso:
+            return
+        del balde[pos]
+        self.total -= 1
+        if not balde:
+            del self.baldes[chave]
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        for balde in self.baldes.values():
+            yield from balde.values()
+
+    def em(self, pos):
+        """Retorna o recurso disponível em `pos`, ou None."""
+        return self.baldes.get(self._balde(pos), {}).get(pos)
+
+    def posicoes(self):
+        """Array (N, 2) com as posições dos recursos disponíveis."""
+        return np.array([pos for balde in self.baldes.values() for pos in balde], dtype=np.int64).reshape(-1, 2)
+
+    def __contains__(self, recurso):
+        pos = recurso.pos
+        if pos is None:
+            return False
+        return self.baldes.get(self._balde(pos), {}).get(pos) is recurso
+
+    def _anel(self, centro, raio):
+        """Gera as chaves dos baldes a uma distância (Chebyshev) exata `raio` de `centro`."""
+        cx, cy = centro
+        if raio == 0:
+            yield centro
+            return
+        for bx in range(cx - raio, cx + raio + 1):
+            yield (bx, cy - raio)
+            yield (bx, cy + raio)
+        for by in range(cy - raio + 1, cy + raio):
+            yield (cx - raio, by)
+            yield (cx + raio, by)
+
+    def mais_proximos(self, pos, k=1):
+        """Retorna até `k` recursos mais próximos de `pos` (distância euclidiana), do mais próximo ao mais distante."""
+        if not self.total or k <= 0:
+            return []
+
+        centro = self._balde(pos)
+        raio_maximo = max(self.width, self.height) // self.tamanho_balde + 1
+        candidatos = []  # heap de máximo com os k melhores: (-distância, pos, recurso)
+
+        for raio in range(raio_maximo + 1):
+            for chave in self._anel(centro, raio):
+                for pos_recurso, recurso in self.baldes.get(chave, {}).items():
+                    dist = math.hypot(pos_recurso[0] - pos[0], pos_recurso[1] - pos[1])
+                    item = (-dist, (-pos_recurso[0], -pos_recurso[1]), recurso)
+                    if len(candidatos) < k:
+                        heapq.heappush(candidatos, item)
+                    elif item[:2] > candidatos[0][:2]:
+                        heapq.heapreplace(candidatos, item)
+
+            # Qualquer célula fora dos anéis já visitados está a pelo menos
+            # raio * tamanho_balde de distância
+            if len(candidatos) == k and -candidatos[0][0] <= raio * self.tamanho_balde:
+                break
+
+        candidatos.sort(key=lambda item: item[:2], reverse=True)
+        return [recurso for _, _, recurso in candidatos]
+
+    def mais_proximo(self, pos):
+        """Retorna o recurso disponível mais próximo de `pos`, ou None."""
+        proximos = self.mais_proximos(pos, 1)
+        return proximos[0] if proximos else None
+
+    def no_raio(self, pos, raio):
+        """Retorna os recursos a uma distância euclidiana de no máximo `raio` de `pos`."""
+        x, y = pos
+        bx0, by0 = self._balde((x - raio, y - raio))
+        bx1, by1 = self._balde((x + raio, y + raio))
+        encontrados = []
+        for bx in range(int(bx0), int(bx1) + 1):
+            for by in range(int(by0), int(by1) + 1):
+                for pos_recurso, recurso in self.baldes.get((bx, by), {}).items():
+                    if math.hypot(pos_recurso[0] - x, pos_recurso[1] - y) <= raio:
+                        encontrados.append(recurso)
+        return encontrados
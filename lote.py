@@ -0,0 +1,163 @@
+"""Execução em lote do PlanetaModelo, sem a interface web.
+
+Percorre uma grade de parâmetros do ``PlanetaModelo`` com várias sementes por
+ponto e distribui as execuções por um pool de processos. Os resultados chegam
+como linhas (dicionários): uma por passo de cada execução e uma de resumo ao
+final de cada execução.
+"""
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import sys
+from functools import partial
+
+from planet_model import PlanetaModelo, sem_progresso
+
+# Valores usados quando um parâmetro não aparece na grade (os mesmos da interface web)
+PARAMETROS_PADRAO = {
+    "width": 20,
+    "height": 20,
+    "num_crystals": 30,
+    "num_metals": 15,
+    "num_structures": 2,
+    "num_agentes_reativos": 1,
+    "num_agentes_estado": 1,
+    "num_agentes_objetivos": 1,
+    "num_agentes_cooperativos": 1,
+}
+
+TIPOS_AGENTE = [
+    "AgenteReativoSimples",
+    "AgenteBaseadoEmEstado",
+    "AgenteBaseadoEmObjetivos",
+    "AgenteCooperativo",
+]
+
+
+def gerar_combinacoes(parametros):
+    """Expande a grade de parâmetros em uma lista de kwargs para o modelo.
+
+    Cada valor pode ser único ou iterável; strings e dicionários (como
+    `frequencias` e `perfil`) são tratados como valor único. Para variar um
+    dicionário, passe uma lista deles.
+    """
+    listas = []
+    for nome, valores in {**PARAMETROS_PADRAO, **parametros}.items():
+        if isinstance(valores, (str, dict)):
+            listas.append([(nome, valores)])
+            continue
+        try:
+            listas.append([(nome, valor) for valor in valores])
+        except TypeError:
+            listas.append([(nome, valores)])
+    return [dict(combinacao) for combinacao in itertools.product(*listas)]
+
+
+def gerar_execucoes(parametros, seeds=1):
+    """Lista as execuções (id, semente, kwargs) de uma varredura.
+
+    `seeds` é a quantidade de sementes por ponto (0..N-1) ou uma lista explícita.
+    """
+    sementes = range(seeds) if isinstance(seeds, int) else list(seeds)
+    execucoes = []
+    for kwargs in gerar_combinacoes(parametros):
+        for seed in sementes:
+            execucoes.append((len(execucoes), seed, kwargs))
+    return execucoes
+
+
+def executar_simulacao(execucao, passos=100, periodo_coleta=1, parar_sem_progresso=None):
+    """Executa uma simulação e devolve suas linhas de resultado.
+
+    Gera uma linha a cada `periodo_coleta` passos (0 desativa) e uma linha de
+    resumo ao final. A execução termina antes de `passos` quando todos os
+    recursos foram entregues ou, com `parar_sem_progresso`, depois de tantos
+    passos sem coletas nem entregas.
+    """
+    id_execucao, seed, kwargs = execucao
+    modelo = PlanetaModelo(**kwargs, seed=seed)
+    identificacao = {"execucao": id_execucao, "seed": seed, **kwargs}
+    condicao = sem_progresso(parar_sem_progresso) if parar_sem_progresso else None
+
+    linhas = []
+    bloco = periodo_coleta or passos
+    while modelo.passos < passos:
+        alvo = min(bloco, passos - modelo.passos)
+        executados = modelo.run_until(condicao, alvo)
+        if periodo_coleta and executados:
+            # Também o bloco interrompido no meio, para a série terminar no último passo
+            linhas.append({"tipo": "passo", **identificacao, "passo": modelo.passos, **modelo.pontuacoes})
+        if executados < alvo:
+            break
+
+    linhas.append({
+        "tipo": "execucao",
+        **identificacao,
+        "passo": modelo.passos,
+        **modelo.pontuacoes,
+        "utilidade_total": modelo.base.utilidade_total(),
+        "concluido": modelo.concluido(),
+    })
+    modelo.encerrar()
+    return linhas
+
+
+def varrer_parametros(parametros, seeds=1, passos=100, processos=None, periodo_coleta=1, parar_sem_progresso=None):
+    """Executa a varredura e gera as linhas à medida que as execuções terminam.
+
+    `processos=None` usa todos os núcleos; `processos=1` roda no processo atual.
+    """
+    execucoes = gerar_execucoes(parametros, seeds)
+    tarefa = partial(executar_simulacao, passos=passos, periodo_coleta=periodo_coleta,
+                     parar_sem_progresso=parar_sem_progresso)
+
+    if processos == 1:
+        for execucao in execucoes:
+            yield from tarefa(execucao)
+        return
+
+    with multiprocessing.Pool(processos) as pool:
+        for linhas in pool.imap_unordered(tarefa, execucoes):
+            yield from linhas
+
+
+def escrever_csv(linhas, destino, parametros):
+    """Escreve as linhas em CSV à medida que são geradas."""
+    campos = ["tipo", "execucao", "seed", *{**PARAMETROS_PADRAO, **parametros},
+              "passo", *TIPOS_AGENTE, "utilidade_total", "concluido"]
+    escritor = csv.DictWriter(destino, fieldnames=campos, restval="")
+    escritor.writeheader()
+    for linha in linhas:
+        escritor.writerow(linha)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Varredura de parâmetros do PlanetaModelo sem interface web.")
+    parser.add_argument("--grade", help="arquivo JSON com {parâmetro: valor ou lista de valores}")
+    parser.add_argument("--seeds", type=int, default=1, help="sementes por ponto da grade")
+    parser.add_argument("--passos", type=int, default=100)
+    parser.add_argument("--processos", type=int, default=None, help="padrão: todos os núcleos")
+    parser.add_argument("--periodo-coleta", type=int, default=1, help="0 grava apenas o resumo de cada execução")
+    parser.add_argument("--parar-sem-progresso", type=int, default=None, metavar="K",
+                        help="encerra a execução após K passos sem coletas nem entregas")
+    parser.add_argument("--saida", help="arquivo CSV de saída (padrão: saída padrão)")
+    args = parser.parse_args(argv)
+
+    parametros = {}
+    if args.grade:
+        with open(args.grade, encoding="utf-8") as arquivo:
+            parametros = json.load(arquivo)
+
+    linhas = varrer_parametros(parametros, args.seeds, args.passos, args.processos, args.periodo_coleta,
+                               args.parar_sem_progresso)
+    if args.saida:
+        with open(args.saida, "w", newline="", encoding="utf-8") as destino:
+            escrever_csv(linhas, destino, parametros)
+    else:
+        escrever_csv(linhas, sys.stdout, parametros)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+from array import array
+
+# Acima desta quantidade de células, o bitset de visitadas é paginado (ver nova_memoria)
+LIMITE_DENSO = 1 << 24
+
+
+def nova_memoria(width, height):
+    """Memória de exploração para um grid width x height: bitset único ou, em mapas enormes, paginado."""
+    if width * height > LIMITE_DENSO:
+        return MemoriaPaginada(width, height)
+    return MemoriaExploracao(width, height)
+
+
+class MemoriaExploracao:
+    """Memória de exploração de um agente: células visitadas e avistamentos de recursos e estruturas.
+
+    As células visitadas ficam num bitset (um bit por célula do grid) e os
+    avistamentos num dicionário por (tipo, pos), então marcar e consultar custam
+    O(1) independentemente de quanto o agente já andou. `registros` e `visitas`
+    guardam avistamentos e células visitadas na ordem em que aconteceram, para
+    o BDI ler só os novos.
+    """
+
+    def __init__(self, width, height):
+        self.height = height
+        self.visitadas = bytearray((width * height + 7) // 8)
+        self.avistamentos = {}  # (tipo, pos) -> posição em self.registros
+        self.registros = []  # (tipo, pos), sem repetições
+        self.visitas = array("i")  # índice linear de cada célula, na ordem da primeira visita
+
+    def visitar(self, pos):
+        """Marca a célula como visitada; retorna True se ainda não estava."""
+        indice = pos[0] * self.height + pos[1]
+        byte, bit = indice >> 3, 1 << (indice & 7)
+        if self.visitadas[byte] & bit:
+            return False
+        self.visitadas[byte] |= bit
+        self.visitas.append(indice)
+        return True
+
+    def visitada(self, pos):
+        indice = pos[0] * self.height + pos[1]
+        return bool(self.visitadas[indice >> 3] & (1 << (indice & 7)))
+
+    def registrar(self, tipo, pos):
+        """Registra um avistamento; retorna True se ele é novo."""
+        chave = (tipo, pos)
+        if chave in self.avistamentos:
+            return False
+        self.avistamentos[chave] = len(self.registros)
+        self.registros.append(chave)
+        return True
+
+    def conhece(self, tipo, pos):
+        return (tipo, pos) in self.avistamentos
+
+    def desde(self, inicio):
+        """Avistamentos registrados a partir da posição `inicio` do histórico."""
+        return self.registros[inicio:]
+
+    def visitas_desde(self, inicio):
+        """Células (índice linear x * height + y) visitadas pela primeira vez a partir da posição `inicio`."""
+        return self.visitas[inicio:]
+
+    def __len__(self):
+        return len(self.registros)
+
+
+class MemoriaPaginada(MemoriaExploracao):
+    """Memória com o bitset de visitadas em páginas de 4096 células, criadas só onde o agente passou."""
+
+    def __init__(self, width, height):
+        super().__init__(0, height)
+        self.visitadas = {}  # página -> bytearray(512)
+        self.visitas = array("q")
+
+    def visitar(self, pos):
+        indice = pos[0] * self.height + pos[1]
+        pagina = self.visitadas.get(indice >> 12)
+        if pagina is None:
+            pagina = self.visitadas[indice >> 12] = bytearray(512)
+        byte, bit = (indice & 4095) >> 3, 1 << (indice & 7)
+        if pagina[byte] & bit:
+            return False
+        pagina[byte] |= bit
+        self.visitas.append(indice)
+        return True
+
+    def visitada(self, pos):
+        indice = pos[0] * self.height + pos[1]
+        pagina = self.visitadas.get(indice >> 12)
+        return pagina is not None and bool(pagina[(indice & 4095) >> 3] & (1 << (indice & 7)))
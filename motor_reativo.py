@@ -0,0 +1,120 @@
+import numpy as np
+
+from navegacao import DESLOCAMENTOS
+
+_BITS = np.arange(len(DESLOCAMENTOS), dtype=np.uint8)
+
+
+class MotorReativo:
+    """Motor vetorizado para populações grandes de agentes reativos simples.
+
+    Reproduz o comportamento do AgenteReativoSimples com todos os agentes em
+    arrays: sem recurso, anda para um vizinho aleatório que não seja estrutura
+    e coleta o recurso leve que encontrar; com recurso, segue o campo de
+    distâncias até a base e entrega. Cada passo é um punhado de operações NumPy
+    sobre a população inteira; só coletas e entregas passam por Python, para
+    manter o grid, o índice de recursos e a base do modelo consistentes.
+    """
+
+    TIPO = "AgenteReativoSimples"
+
+    def __init__(self, modelo, posicoes, prefixo="A"):
+        self.modelo = modelo
+        self.prefixo = prefixo
+        n = len(posicoes)
+        self.pos = np.array(posicoes, dtype=np.int64).reshape(n, 2)
+        self.carga = np.full(n, -1, dtype=np.int64)  # utilidade do recurso carregado, ou -1
+        self.recursos = [None] * n  # recurso carregado por cada agente
+        self.pontuacao = np.zeros(n, dtype=np.int64)
+        self.entregas = np.zeros(n, dtype=np.int64)
+        self.base = np.array(modelo.base_pos, dtype=np.int64)
+
+        # Máscara dos recursos disponíveis; com a camada compacta, a própria grade de tipos dela
+        tipos = getattr(modelo.indice_recursos, "tipos", None)
+        if tipos is not None:
+            self.ocupacao = tipos
+        else:
+            self.ocupacao = np.zeros((modelo.width, modelo.height), dtype=bool)
+            posicoes = modelo.indice_recursos.posicoes()
+            self.ocupacao[posicoes[:, 0], posicoes[:, 1]] = True
+
+    def __len__(self):
+        return len(self.pos)
+
+    def recurso_retirado(self, pos):
+        """Avisado pelo modelo quando qualquer agente coleta o recurso de `pos`."""
+        self.ocupacao[pos] = 0
+
+    # ------------------------------------------------------------------
+    # Agregados usados pelos reporters do coletor
+
+    def total_carregando(self):
+        return int((self.carga >= 0).sum())
+
+    def total_entregas(self):
+        return int(self.entregas.sum())
+
+    def total_ocupados(self):
+        return self.total_carregando()
+
+    # ------------------------------------------------------------------
+
+    def step(self):
+        carregando = self.carga >= 0
+        na_base = (self.pos == self.base).all(axis=1)
+
+        # Com recurso e fora da base: um passo pelo campo de distâncias até a base
+        voltando = np.flatnonzero(carregando & ~na_base)
+        if len(voltando):
+            proximo = self.modelo.navegacao.campo(self.modelo.base_pos).proximo
+            indices = proximo[self.pos[voltando, 0], self.pos[voltando, 1]]
+            validos = indices >= 0
+            self.pos[voltando[validos]] += DESLOCAMENTOS[indices[validos]]
+
+        # Com recurso e na base: entrega e volta a explorar no mesmo passo
+        entregando = np.flatnonzero(carregando & na_base)
+        for i in entregando.tolist():
+            self._entregar(i)
+
+        exploradores = np.flatnonzero(self.carga < 0)
+        if len(exploradores):
+            self._explorar(exploradores)
+
+    def _entregar(self, i):
+        recurso = self.recursos[i]
+        self.modelo.base.registrar_recurso(recurso, f"{self.prefixo}_{i}", classe="AgenteReativoSimples")
+        self.pontuacao[i] += recurso.utilidade
+        self.entregas[i] += 1
+        self.carga[i] = -1
+        self.recursos[i] = None
+        self.modelo.eventos.info("entrega", agente=f"{self.prefixo}_{i}", recurso=recurso.tipo,
+                                 pontuacao=int(self.pontuacao[i]))
+
+    def _explorar(self, agentes):
+        """Move cada agente para um vizinho livre sorteado e coleta o recurso que houver na nova célula."""
+        altura = self.modelo.height
+        destinos = self.pos[agentes, None, :] + DESLOCAMENTOS[None, :, :]  # (n, 8, 2)
+        # Vizinhos livres lidos da máscara de passáveis da navegação (bit i = DESLOCAMENTOS[i])
+        mascaras = self.modelo.navegacao.passaveis[self.pos[agentes, 0], self.pos[agentes, 1]]
+        livres = (mascaras[:, None] >> _BITS[None, :]) & 1 == 1
+
+        # Sorteio uniforme entre os vizinhos livres: maior chave aleatória entre os válidos
+        chaves = self.modelo.rng.random(livres.shape)
+        chaves[~livres] = -1.0
+        escolha = chaves.argmax(axis=1)
+        movem = livres.any(axis=1)
+        agentes = agentes[movem]
+        self.pos[agentes] = destinos[movem, escolha[movem]]
+
+        # Coleta: se vários agentes chegam ao mesmo recurso, o primeiro fica com ele
+        xs, ys = self.pos[agentes, 0], self.pos[agentes, 1]
+        com_recurso = self.ocupacao[xs, ys] != 0
+        celulas = xs[com_recurso] * altura + ys[com_recurso]
+        _, primeiros = np.unique(celulas, return_index=True)
+        for agente in agentes[com_recurso][np.sort(primeiros)].tolist():
+            recurso = self.modelo.recurso_em(tuple(self.pos[agente].tolist()))
+            if recurso is None:
+                continue
+            self.recursos[agente] = recurso
+            self.carga[agente] = recurso.utilidade
+            self.modelo.retirar_recurso(recurso)
@@ -0,0 +1,344 @@
+import heapq
+import math
+
+import numpy as np
+from mesa.space import MultiGrid, accept_tuple_argument
+
+from camada_recursos import RecursoLeve
+from navegacao import _DESLOCAMENTOS, Navegacao
+from objetos import Estrutura
+from perfilamento import CONSULTAS_GRID
+
+UTILIDADES = {"Cristal": 10, "Metal": 20}
+
+
+class GradeEsparsa(MultiGrid):
+    """MultiGrid com células num dicionário (só as ocupadas existem), para mapas enormes.
+
+    Antes de qualquer consulta ou movimentação, o bloco da célula é gerado
+    pelo mundo (`mundo.garantir`), de modo que nada é observado antes de existir.
+    """
+
+    limite_cache_vizinhancas = 1 << 16
+
+    def __init__(self, width, height):
+        # Sem _Grid.__init__, que aloca uma lista por célula
+        self.width = width
+        self.height = height
+        self.torus = False
+        self.num_cells = width * height
+        self._empties_built = False
+        self._neighborhood_cache = {}
+        self.celulas = {}  # pos -> lista de agentes
+        self.mundo = None
+
+    def __getstate__(self):
+        estado = {nome: valor for nome, valor in self.__dict__.items() if nome not in CONSULTAS_GRID}
+        estado["_neighborhood_cache"] = {}
+        return estado
+
+    def _garantir(self, pos):
+        if self.mundo is not None:
+            self.mundo.garantir(pos)
+
+    def place_agent(self, agent, pos):
+        self._garantir(pos)
+        celula = self.celulas.setdefault(pos, [])
+        if agent not in celula:
+            celula.append(agent)
+        agent.pos = pos
+
+    def remove_agent(self, agent):
+        celula = self.celulas[agent.pos]
+        celula.remove(agent)
+        if not celula:
+            del self.celulas[agent.pos]
+        agent.pos = None
+
+    def move_agent(self, agent, pos):
+        self.remove_agent(agent)
+        self.place_agent(agent, pos)
+
+    def is_cell_empty(self, pos):
+        self._garantir(pos)
+        return pos not in self.celulas
+
+    @accept_tuple_argument
+    def iter_cell_list_contents(self, cell_list):
+        for pos in cell_list:
+            self._garantir(pos)
+            celula = self.celulas.get(pos)
+            if celula:
+                yield from celula
+
+    @accept_tuple_argument
+    def get_cell_list_contents(self, cell_list):
+        return list(self.iter_cell_list_contents(cell_list))
+
+    def get_neighborhood(self, pos, moore, include_center=False, radius=1):
+        # O cache do Mesa cresce com cada célula visitada; aqui ele é limitado
+        if len(self._neighborhood_cache) > self.limite_cache_vizinhancas:
+            self._neighborhood_cache.clear()
+        return super().get_neighborhood(pos, moore, include_center, radius)
+
+    @property
+    def empties(self):
+        raise NotImplementedError("A grade esparsa não enumera as células vazias.")
+
+
+class Bloco:
+    """Conteúdo gerado de um bloco do mundo: recursos disponíveis e estruturas."""
+
+    __slots__ = ("recursos", "estruturas", "alterado")
+
+    def __init__(self):
+        self.recursos = {}  # pos -> tipo
+        self.estruturas = {}  # pos -> Estrutura
+        self.alterado = False  # algo foi coletado: não pode mais ser regerado da semente
+
+
+class MundoEsparso:
+    """Mundo em blocos gerados sob demanda a partir de uma semente e descartados quando ninguém está perto.
+
+    Cada bloco de `tamanho_bloco` x `tamanho_bloco` células é sorteado por um
+    gerador próprio, semeado com (semente, bx, by): gerá-lo de novo dá sempre
+    o mesmo conteúdo. Blocos são gerados na primeira vez que uma de suas
+    células é observada (grid, recursos ou obstáculos) e despejados por
+    `despejar`, chamado pelo modelo a cada `periodo_despejo` passos, quando
+    não há agente a até `raio_retencao` blocos e nada neles foi coletado. A
+    memória cresce com a área explorada, não com a do mapa.
+
+    Faz as vezes do índice de recursos do modelo (`em`, `remover`,
+    `mais_proximo`, `no_raio`...); as consultas de proximidade só enxergam os
+    blocos já gerados.
+    """
+
+    def __init__(self, modelo, semente, densidades, densidade_estruturas, tamanho_bloco=32, raio_retencao=2,
+                 periodo_despejo=20):
+        self.modelo = modelo
+        self.width = modelo.width
+        self.height = modelo.height
+        self.semente = semente
+        self.densidades = densidades  # tipo -> fração das células com esse recurso
+        self.densidade_estruturas = densidade_estruturas
+        self.tamanho_bloco = tamanho_bloco
+        self.raio_retencao = raio_retencao
+        self.periodo_despejo = periodo_despejo  # o modelo chama `despejar` a cada tantos passos
+        self.blocos = {}  # (bx, by) -> Bloco
+        self.total = 0  # recursos disponíveis nos blocos gerados
+        self.gerados = 0
+        self.despejados = 0
+
+    # ------------------------------------------------------------------
+    # Geração e despejo
+
+    def chave(self, pos):
+        return (pos[0] // self.tamanho_bloco, pos[1] // self.tamanho_bloco)
+
+    def garantir(self, pos):
+        """Retorna o bloco da célula, gerando-o se ainda não existe."""
+        chave = (pos[0] // self.tamanho_bloco, pos[1] // self.tamanho_bloco)
+        bloco = self.blocos.get(chave)
+        if bloco is None:
+            bloco = self._gerar(chave)
+        return bloco
+
+    def _gerar(self, chave):
+        bx, by = chave
+        lado = self.tamanho_bloco
+        x0, y0 = bx * lado, by * lado
+        largura, altura = min(lado, self.width - x0), min(lado, self.height - y0)
+        rng = np.random.default_rng([self.semente, bx, by])
+
+        # Sorteia quantas células de cada conteúdo e depois quais, sem repetir
+        quantidades = [rng.binomial(largura * altura, densidade) for densidade in self.densidades.values()]
+        num_estruturas = rng.binomial(largura * altura, self.densidade_estruturas)
+        total = min(sum(quantidades) + num_estruturas, largura * altura)
+        celulas = rng.choice(largura * altura, size=total, replace=False)
+        xs, ys = np.divmod(celulas, altura)
+        posicoes = list(zip((xs + x0).tolist(), (ys + y0).tolist()))
+
+        bloco = Bloco()
+        self.blocos[chave] = bloco  # antes de colocar as estruturas no grid, que consulta o bloco
+        inicio = 0
+        base_pos = self.modelo.base_pos
+        for tipo, quantidade in zip(self.densidades, quantidades):
+            for pos in posicoes[inicio:inicio + quantidade]:
+                if pos != base_pos:
+                    bloco.recursos[pos] = tipo
+            inicio += quantidade
+        for i, pos in enumerate(posicoes[inicio:]):
+            if pos != base_pos:
+                estrutura = Estrutura(f"E_{bx}_{by}_{i}", self.modelo, pos)
+                bloco.estruturas[pos] = estrutura
+                self.modelo.grid.place_agent(estrutura, pos)
+        self.total += len(bloco.recursos)
+        self.gerados += 1
+        return bloco
+
+    def despejar(self, posicoes):
+        """Descarta os blocos não alterados a mais de `raio_retencao` blocos de todas as `posicoes`."""
+        raio = self.raio_retencao
+        perto = set()
+        for pos in posicoes:
+            if pos is None:
+                continue
+            bx, by = self.chave(pos)
+            for dx in range(-raio, raio + 1):
+                for dy in range(-raio, raio + 1):
+                    perto.add((bx + dx, by + dy))
+        for chave in [chave for chave, bloco in self.blocos.items() if not bloco.alterado and chave not in perto]:
+            bloco = self.blocos.pop(chave)
+            for estrutura in bloco.estruturas.values():
+                self.modelo.grid.remove_agent(estrutura)
+            self.total -= len(bloco.recursos)
+            self.despejados += 1
+
+    # ------------------------------------------------------------------
+    # Obstáculos
+
+    def obstaculo(self, pos):
+        estrutura = self.garantir(pos).estruturas.get(pos)
+        return estrutura is not None and not estrutura.sendo_transportada
+
+    # ------------------------------------------------------------------
+    # Interface comum com IndiceRecursos
+
+    def em(self, pos):
+        tipo = self.garantir(pos).recursos.get(pos)
+        return None if tipo is None else RecursoLeve(tipo, UTILIDADES[tipo], pos)
+
+    def remover(self, recurso, pos=None):
+        pos = pos if pos is not None else recurso.pos
+        if pos is None:
+            return
+        bloco = self.garantir(pos)
+        if bloco.recursos.pop(pos, None) is not None:
+            bloco.alterado = True
+            self.total -= 1
+
+    def __len__(self):
+        return self.total
+
+    def __iter__(self):
+        for bloco in list(self.blocos.values()):
+            for pos, tipo in bloco.recursos.items():
+                yield RecursoLeve(tipo, UTILIDADES[tipo], pos)
+
+    def __contains__(self, recurso):
+        bloco = self.blocos.get(self.chave(recurso.pos)) if recurso.pos is not None else None
+        return bloco is not None and bloco.recursos.get(recurso.pos) == recurso.tipo
+
+    def posicoes(self):
+        return np.array([pos for bloco in self.blocos.values() for pos in bloco.recursos],
+                        dtype=np.int64).reshape(-1, 2)
+
+    def mais_proximos(self, pos, k=1):
+        """Até `k` recursos mais próximos de `pos` entre os blocos já gerados (distância euclidiana)."""
+        if not self.total or k <= 0:
+            return []
+        cx, cy = self.chave(pos)
+        raio_maximo = max(max(abs(bx - cx), abs(by - cy)) for bx, by in self.blocos)
+        candidatos = []  # heap de máximo com os k melhores: (-distância, -pos, pos, tipo)
+        for raio in range(raio_maximo + 1):
+            for chave in self._anel((cx, cy), raio):
+                bloco = self.blocos.get(chave)
+                if bloco is None:
+                    continue
+                for pos_recurso, tipo in bloco.recursos.items():
+                    dist = math.hypot(pos_recurso[0] - pos[0], pos_recurso[1] - pos[1])
+                    item = (-dist, (-pos_recurso[0], -pos_recurso[1]), pos_recurso, tipo)
+                    if len(candidatos) < k:
+                        heapq.heappush(candidatos, item)
+                    elif item[:2] > candidatos[0][:2]:
+                        heapq.heapreplace(candidatos, item)
+            if len(candidatos) == k and -candidatos[0][0] <= raio * self.tamanho_bloco:
+                break
+        candidatos.sort(key=lambda item: item[:2], reverse=True)
+        return [RecursoLeve(tipo, UTILIDADES[tipo], pos_recurso) for _, _, pos_recurso, tipo in candidatos]
+
+    def mais_proximo(self, pos):
+        proximos = self.mais_proximos(pos, 1)
+        return proximos[0] if proximos else None
+
+    def no_raio(self, pos, raio):
+        x, y = pos
+        bx0, by0 = self.chave((x - raio, y - raio))
+        bx1, by1 = self.chave((x + raio, y + raio))
+        encontrados = []
+        for bx in range(int(bx0), int(bx1) + 1):
+            for by in range(int(by0), int(by1) + 1):
+                bloco = self.blocos.get((bx, by))
+                if bloco is None:
+                    continue
+                for pos_recurso, tipo in bloco.recursos.items():
+                    if math.hypot(pos_recurso[0] - x, pos_recurso[1] - y) <= raio:
+                        encontrados.append(RecursoLeve(tipo, UTILIDADES[tipo], pos_recurso))
+        return encontrados
+
+    @staticmethod
+    def _anel(centro, raio):
+        cx, cy = centro
+        if raio == 0:
+            yield centro
+            return
+        for bx in range(cx - raio, cx + raio + 1):
+            yield (bx, cy - raio)
+            yield (bx, cy + raio)
+        for by in range(cy - raio + 1, cy + raio):
+            yield (cx - raio, by)
+            yield (cx + raio, by)
+
+
+class _ObstaculosDoMundo:
+    """Visão `obstaculos[x, y]` das estruturas do mundo esparso, como a grade booleana da Navegacao."""
+
+    __slots__ = ("mundo",)
+
+    def __init__(self, mundo):
+        self.mundo = mundo
+
+    def __getitem__(self, pos):
+        return self.mundo.obstaculo(pos)
+
+
+class NavegacaoEsparsa(Navegacao):
+    """Navegação sem grades do tamanho do mapa: sempre o passo guloso, contornando as estruturas vizinhas.
+
+    Campos de distância cobririam o mapa inteiro, então não são calculados;
+    com estruturas esparsas, o passo guloso sempre encontra um vizinho livre
+    que se aproxima do destino.
+    """
+
+    def __init__(self, mundo, width, height, base_pos):
+        self.width = width
+        self.height = height
+        self.base_pos = base_pos
+        self.obstaculos = _ObstaculosDoMundo(mundo)
+        self.campos = {}
+        self.pedidos = {}
+        self.campos_calculados = 0
+
+    def proximo_passo(self, pos, destino, agente=None):
+        if pos == destino:
+            return None
+        return self.passo_guloso(pos, destino)
+
+    def distancia(self, pos, destino):
+        return max(abs(pos[0] - destino[0]), abs(pos[1] - destino[1]))
+
+    def mascara(self, pos):
+        # Sem tabela do tamanho do mapa: a máscara é montada consultando as estruturas dos blocos
+        x, y = pos
+        mascara = 0
+        for i, (dx, dy) in enumerate(_DESLOCAMENTOS):
+            vx, vy = x + dx, y + dy
+            if 0 <= vx < self.width and 0 <= vy < self.height and not self.obstaculos[vx, vy]:
+                mascara |= 1 << i
+        return mascara
+
+    def campo(self, destino, forcar=False, solicitante=None):
+        raise NotImplementedError("O mundo esparso não calcula campos de distância.")
+
+    def definir_obstaculo(self, pos, bloqueado=True):
+        pass  # as estruturas do mundo esparso já são os obstáculos
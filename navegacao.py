@@ -0,0 +1,263 @@
+import math
+from collections import OrderedDict, deque
+
+import numpy as np
+
+# Deslocamentos da vizinhança de Moore, na ordem usada pelos arrays de próximo passo
+DESLOCAMENTOS = np.array([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)], dtype=np.int64)
+_DESLOCAMENTOS = [tuple(d) for d in DESLOCAMENTOS.tolist()]
+INF = np.iinfo(np.int32).max
+
+# Máscara de vizinhos: o bit i indica o vizinho DESLOCAMENTOS[i]; o oposto de i é 7 - i
+VIZINHOS_POR_MASCARA = [tuple(d for i, d in enumerate(_DESLOCAMENTOS) if mascara >> i & 1) for mascara in range(256)]
+
+
+class CampoDistancias:
+    """Distâncias (em passos, vizinhança de Moore) de cada célula até um destino, contornando obstáculos.
+
+    `proximo[x, y]` guarda o índice em DESLOCAMENTOS do vizinho que mais se
+    aproxima do destino, ou -1 se a célula é o destino ou não o alcança.
+    """
+
+    __slots__ = ("destino", "distancia", "proximo")
+
+    def __init__(self, destino, distancia, proximo):
+        self.destino = destino
+        self.distancia = distancia
+        self.proximo = proximo
+
+
+class Navegacao:
+    """Campos de distância compartilhados por todos os agentes para andar até a base e até alvos frequentes.
+
+    O campo da base é mantido sempre; campos de outros destinos são calculados
+    quando `limiar_popularidade` agentes diferentes pedem o mesmo destino e
+    ficam num cache LRU de `capacidade` campos. Destinos sem campo usam o passo guloso
+    (vizinho livre mais próximo em linha reta).
+    """
+
+    def __init__(self, width, height, base_pos, capacidade=32, limiar_popularidade=3):
+        self.width = width
+        self.height = height
+        self.base_pos = base_pos
+        self.capacidade = capacidade
+        self.limiar_popularidade = limiar_popularidade
+        self.obstaculos = np.zeros((width, height), dtype=bool)
+        # Vizinhos passáveis de cada célula (dentro do grid e sem obstáculo), como máscara de 8 bits
+        self.passaveis = self._calcular_passaveis()
+        self.campos = OrderedDict()  # destino -> CampoDistancias
+        self.pedidos = {}  # destino -> agentes que o pediram enquanto não tinha campo
+        self.campos_calculados = 0
+
+    # ------------------------------------------------------------------
+    # Consulta
+
+    def proximo_passo(self, pos, destino, agente=None):
+        """Retorna a célula para onde um agente em `pos` deve ir para se aproximar de `destino`, ou None."""
+        if pos == destino:
+            return None
+        campo = self.campo(destino, solicitante=agente)
+        if campo is not None:
+            indice = campo.proximo[pos]
+            if indice >= 0:
+                dx, dy = _DESLOCAMENTOS[indice]
+                return (pos[0] + dx, pos[1] + dy)
+        return self.passo_guloso(pos, destino)
+
+    def distancia(self, pos, destino):
+        """Distância em passos pelo campo do destino (calculando-o se preciso); None se inalcançável."""
+        campo = self.campo(destino, forcar=True)
+        valor = int(campo.distancia[pos])
+        return None if valor == INF else valor
+
+    def passo_guloso(self, pos, destino):
+        melhor, melhor_dist = None, math.inf
+        for x, y in self.vizinhos_livres(pos):
+            dist = math.hypot(destino[0] - x, destino[1] - y)
+            if dist < melhor_dist:
+                melhor, melhor_dist = (x, y), dist
+        return melhor
+
+    def mascara(self, pos):
+        """Máscara dos vizinhos passáveis de `pos` (ver VIZINHOS_POR_MASCARA)."""
+        return int(self.passaveis[pos])
+
+    def vizinhos_livres(self, pos):
+        """Vizinhos de Moore de `pos` dentro do grid e sem obstáculo, na ordem de DESLOCAMENTOS."""
+        x, y = pos
+        return [(x + dx, y + dy) for dx, dy in VIZINHOS_POR_MASCARA[self.mascara(pos)]]
+
+    def vizinhos_bloqueados(self, pos):
+        """Vizinhos de Moore de `pos` dentro do grid ocupados por obstáculos."""
+        x, y = pos
+        return [(x + dx, y + dy) for dx, dy in VIZINHOS_POR_MASCARA[self.mascara(pos) ^ self._dentro(pos)]]
+
+    def _dentro(self, pos):
+        """Máscara dos vizinhos de `pos` que estão dentro do grid."""
+        x, y = pos
+        if 0 < x < self.width - 1 and 0 < y < self.height - 1:
+            return 255
+        mascara = 0
+        for i, (dx, dy) in enumerate(_DESLOCAMENTOS):
+            if 0 <= x + dx < self.width and 0 <= y + dy < self.height:
+                mascara |= 1 << i
+        return mascara
+
+    def _calcular_passaveis(self):
+        # Fora do grid conta como obstáculo: a moldura do array preenchido é toda bloqueada
+        livres = np.zeros((self.width + 2, self.height + 2), dtype=bool)
+        livres[1:-1, 1:-1] = ~self.obstaculos
+        passaveis = np.zeros((self.width, self.height), dtype=np.uint8)
+        for i, (dx, dy) in enumerate(_DESLOCAMENTOS):
+            passaveis |= livres[1 + dx:1 + dx + self.width, 1 + dy:1 + dy + self.height].astype(np.uint8) << i
+        return passaveis
+
+    def campo(self, destino, forcar=False, solicitante=None):
+        """Retorna o campo do destino, calculando-o se for a base, se já for popular ou se `forcar`."""
+        campo = self.campos.get(destino)
+        if campo is not None:
+            self.campos.move_to_end(destino)
+            return campo
+
+        if destino != self.base_pos and not forcar:
+            pedidos = self.pedidos.setdefault(destino, set())
+            pedidos.add(solicitante)
+            if len(pedidos) < self.limiar_popularidade:
+                return None
+        self.pedidos.pop(destino, None)
+
+        campo = self._calcular(destino)
+        self.campos[destino] = campo
+        while len(self.campos) > self.capacidade:
+            antigo = next(iter(self.campos))
+            if antigo == self.base_pos:
+                self.campos.move_to_end(antigo)
+                antigo = next(iter(self.campos))
+            del self.campos[antigo]
+        return campo
+
+    # ------------------------------------------------------------------
+    # Cálculo
+
+    def _calcular(self, destino):
+        """BFS vetorizada: expande a frente de onda inteira a cada iteração, limitada à sua caixa envolvente."""
+        self.campos_calculados += 1
+        distancia = np.full((self.width, self.height), INF, dtype=np.int32)
+        livre = ~self.obstaculos
+        livre[destino] = True
+        distancia[destino] = 0
+
+        frente = np.zeros((self.width, self.height), dtype=bool)
+        frente[destino] = True
+        x0 = x1 = destino[0]
+        y0 = y1 = destino[1]
+        passo = 0
+        while True:
+            passo += 1
+            # Janela da frente atual expandida em uma célula
+            a0, a1 = max(x0 - 1, 0), min(x1 + 2, self.width)
+            b0, b1 = max(y0 - 1, 0), min(y1 + 2, self.height)
+            janela = frente[a0:a1, b0:b1]
+            vizinhos = janela.copy()
+            vizinhos[1:, :] |= janela[:-1, :]
+            vizinhos[:-1, :] |= janela[1:, :]
+            horizontal = vizinhos.copy()
+            vizinhos[:, 1:] |= horizontal[:, :-1]
+            vizinhos[:, :-1] |= horizontal[:, 1:]
+
+            nova = vizinhos & livre[a0:a1, b0:b1] & (distancia[a0:a1, b0:b1] == INF)
+            if not nova.any():
+                break
+            distancia[a0:a1, b0:b1][nova] = passo
+            frente[a0:a1, b0:b1] = nova
+
+            xs = np.flatnonzero(nova.any(axis=1))
+            ys = np.flatnonzero(nova.any(axis=0))
+            x0, x1 = a0 + xs[0], a0 + xs[-1]
+            y0, y1 = b0 + ys[0], b0 + ys[-1]
+
+        return CampoDistancias(destino, distancia, self._proximos(distancia, destino))
+
+    def _proximos(self, distancia, destino):
+        """Para cada célula, o índice do vizinho de menor distância (todas as células de uma vez)."""
+        preenchido = np.full((self.width + 2, self.height + 2), INF, dtype=np.int32)
+        preenchido[1:-1, 1:-1] = distancia
+        vizinhos = np.stack([
+            preenchido[1 + dx:1 + dx + self.width, 1 + dy:1 + dy + self.height]
+            for dx, dy in DESLOCAMENTOS.tolist()
+        ])
+        proximo = vizinhos.argmin(axis=0).astype(np.int8)
+        sem_saida = vizinhos.min(axis=0) == INF
+        proximo[sem_saida] = -1
+        proximo[destino] = -1
+        return proximo
+
+    def _atualizar_proximos(self, campo, celulas):
+        for x, y in celulas:
+            if (x, y) == campo.destino:
+                continue
+            melhor, melhor_dist = -1, INF
+            for indice, (dx, dy) in enumerate(_DESLOCAMENTOS):
+                vx, vy = x + dx, y + dy
+                if 0 <= vx < self.width and 0 <= vy < self.height and campo.distancia[vx, vy] < melhor_dist:
+                    melhor, melhor_dist = indice, campo.distancia[vx, vy]
+            campo.proximo[x, y] = melhor
+
+    def _vizinhanca(self, pos):
+        for dx, dy in _DESLOCAMENTOS:
+            x, y = pos[0] + dx, pos[1] + dy
+            if 0 <= x < self.width and 0 <= y < self.height:
+                yield (x, y)
+
+    # ------------------------------------------------------------------
+    # Atualização incremental
+
+    def definir_obstaculo(self, pos, bloqueado=True):
+        """Marca ou libera uma célula e atualiza os campos em cache afetados."""
+        if self.obstaculos[pos] == bloqueado:
+            return
+        self.obstaculos[pos] = bloqueado
+        for i, (dx, dy) in enumerate(_DESLOCAMENTOS):
+            x, y = pos[0] + dx, pos[1] + dy
+            if 0 <= x < self.width and 0 <= y < self.height:
+                bit = 1 << (7 - i)  # `pos` visto a partir do vizinho
+                self.passaveis[x, y] = self.passaveis[x, y] & (255 ^ bit) if bloqueado else self.passaveis[x, y] | bit
+        for destino, campo in list(self.campos.items()):
+            if destino == pos:
+                del self.campos[destino]
+            elif bloqueado:
+                self._bloquear(campo, pos)
+            else:
+                self._liberar(campo, pos)
+
+    def _bloquear(self, campo, pos):
+        if campo.distancia[pos] == INF:
+            return
+        # Se nenhum vizinho passa pela célula, nenhuma distância muda
+        for x, y in self._vizinhanca(pos):
+            indice = campo.proximo[x, y]
+            if indice >= 0 and (x + _DESLOCAMENTOS[indice][0], y + _DESLOCAMENTOS[indice][1]) == pos:
+                del self.campos[campo.destino]
+                return
+        campo.distancia[pos] = INF
+
+    def _liberar(self, campo, pos):
+        melhor = min((campo.distancia[v] for v in self._vizinhanca(pos)), default=INF)
+        if melhor == INF:
+            return
+        # Propaga as distâncias que diminuíram a partir da célula liberada
+        campo.distancia[pos] = melhor + 1
+        alteradas = {pos}
+        fila = deque([pos])
+        while fila:
+            atual = fila.popleft()
+            proxima = campo.distancia[atual] + 1
+            for vizinho in self._vizinhanca(atual):
+                if not self.obstaculos[vizinho] and campo.distancia[vizinho] > proxima:
+                    campo.distancia[vizinho] = proxima
+                    alteradas.add(vizinho)
+                    fila.append(vizinho)
+        afetadas = set(alteradas)
+        for celula in alteradas:
+            afetadas.update(self._vizinhanca(celula))
+        self._atualizar_proximos(campo, afetadas)
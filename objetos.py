@@ -1,5 +1,7 @@
 from mesa import Agent
 
+from entregas import RegistroEntregas
+
 class Recurso(Agent):
     """Representa um recurso disponível no ambiente."""
     def __init__(self, unique_id, model, tipo, utilidade, pos):
@@ -21,24 +23,25 @@ class Estrutura(Agent):
 
     def adicionar_agente_transportador(self, agente):
         self.agentes_transportando.add(agente)
-        if len(self.agentes_transportando) >= 2:
+        if len(self.agentes_transportando) >= 2 and not self.sendo_transportada:
             self.sendo_transportada = True
+            self.model.estrutura_transportada(self)
 
 class BaseInicial(Agent):
     """Representa a base onde os recursos são entregues."""
-    def __init__(self, unique_id, model):
+    def __init__(self, unique_id, model, classes=()):
         super().__init__(unique_id, model)
-        self.recursos_entregues = []
+        self.entregas = RegistroEntregas(classes)
 
-    def registrar_recurso(self, recurso):
+    def registrar_recurso(self, recurso, agente=None, classe=None):
+        """Registra a entrega de `recurso` por `agente` (o agente ou, com `classe`, só seu unique_id)."""
+        # O recurso normalmente já saiu do grid quando foi coletado (transportado)
         if not recurso.transportado:
-            self.recursos_entregues.append({
-                "tipo": recurso.tipo,
-                "utilidade": recurso.utilidade,
-                "pos": recurso.pos
-            })
-            self.model.grid.remove_agent(recurso)
-            recurso.transportado = True
+            self.model.retirar_recurso(recurso)
+        if agente is not None and classe is None:
+            agente, classe = agente.unique_id, type(agente).__name__
+        self.entregas.registrar(self.model.passos, agente, classe, recurso.tipo, recurso.utilidade, recurso.pos)
+        self.model.contabilizar_entrega()
 
     def utilidade_total(self):
-        return sum(r["utilidade"] for r in self.recursos_entregues)
+        return self.entregas.utilidade_total
@@ -0,0 +1,226 @@
+"""Instrumentação do PlanetaModelo.step: tempo por fase e por classe de agente.
+
+Com o perfil desligado o modelo usa PERFIL_NULO, cujos métodos não medem nada
+(só executam os passos dos agentes), então o custo é de algumas chamadas por
+passo. Ligado, usa o relógio monotônico em nanossegundos, amostra chamadas
+individuais de `step()` e conta as consultas ao grid.
+"""
+from time import perf_counter_ns
+
+CONSULTAS_GRID = ("get_neighborhood", "get_cell_list_contents", "move_agent")
+
+
+class _Acumulador:
+    """Total, quantidade e máximo de uma série de durações em nanossegundos."""
+
+    __slots__ = ("total", "chamadas", "maximo")
+
+    def __init__(self):
+        self.total = 0
+        self.chamadas = 0
+        self.maximo = 0
+
+    def adicionar(self, duracao):
+        self.total += duracao
+        self.chamadas += 1
+        if duracao > self.maximo:
+            self.maximo = duracao
+
+    def resumo(self):
+        media = self.total / self.chamadas if self.chamadas else 0.0
+        return {"total_ms": self.total / 1e6, "chamadas": self.chamadas,
+                "media_us": media / 1e3, "maximo_us": self.maximo / 1e3}
+
+
+class _Cronometro:
+    __slots__ = ("acumulador", "inicio")
+
+    def __init__(self, acumulador):
+        self.acumulador = acumulador
+        self.inicio = 0
+
+    def __enter__(self):
+        self.inicio = perf_counter_ns()
+        return self
+
+    def __exit__(self, *_):
+        self.acumulador.adicionar(perf_counter_ns() - self.inicio)
+        return False
+
+
+class _CronometroNulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+
+_CRONOMETRO_NULO = _CronometroNulo()
+
+
+class PerfilNulo:
+    """Perfil desligado: mesma interface do Perfilador, sem medir nada."""
+
+    ativo = False
+
+    def fase(self, nome):
+        return _CRONOMETRO_NULO
+
+    def executar_passos(self, classe, agentes):
+        for agente in agentes:
+            agente.step()
+
+    def executar_avancos(self, classe, agentes):
+        for agente in agentes:
+            agente.advance()
+
+    def executar_intercalados(self, ordem):
+        for _, agente in ordem:
+            agente.step()
+
+    def fim_do_passo(self):
+        pass
+
+    def resumo(self):
+        return {}
+
+    def __reduce__(self):
+        return "PERFIL_NULO"
+
+
+PERFIL_NULO = PerfilNulo()
+
+
+class Perfilador:
+    """Perfil ligado de um modelo.
+
+    `amostragem` mede individualmente uma a cada N chamadas de `step()` de
+    agentes (0 desliga); `periodo_resumo` emite o resumo como evento "perfil"
+    a cada N passos do modelo (0 desliga).
+    """
+
+    ativo = True
+
+    def __init__(self, modelo, amostragem=0, periodo_resumo=0):
+        self.modelo = modelo
+        self.amostragem = amostragem
+        self.periodo_resumo = periodo_resumo
+        self.fases = {}
+        self.classes = {}
+        self.amostras = {}
+        self.consultas = dict.fromkeys(CONSULTAS_GRID, 0)
+        self.passos = 0
+        self._contador_amostras = 0
+        self._instalar_contadores()
+
+    # ------------------------------------------------------------------
+    # Medição
+
+    def fase(self, nome):
+        acumulador = self.fases.get(nome)
+        if acumulador is None:
+            acumulador = self.fases[nome] = _Acumulador()
+        return _Cronometro(acumulador)
+
+    @staticmethod
+    def _acumulador(tabela, nome):
+        acumulador = tabela.get(nome)
+        if acumulador is None:
+            acumulador = tabela[nome] = _Acumulador()
+        return acumulador
+
+    def executar_passos(self, classe, agentes):
+        """Executa `step()` de cada agente medindo o total da classe e amostrando chamadas individuais."""
+        acumulador = self._acumulador(self.classes, classe)
+        inicio = perf_counter_ns()
+        if self.amostragem:
+            amostras = self._acumulador(self.amostras, classe)
+            for agente in agentes:
+                self._contador_amostras += 1
+                if self._contador_amostras % self.amostragem:
+                    agente.step()
+                else:
+                    t0 = perf_counter_ns()
+                    agente.step()
+                    amostras.adicionar(perf_counter_ns() - t0)
+        else:
+            for agente in agentes:
+                agente.step()
+        acumulador.adicionar(perf_counter_ns() - inicio)
+
+    def executar_avancos(self, classe, agentes):
+        """Executa `advance()` de cada agente (ativação simultânea), medido à parte como "<classe>/advance"."""
+        acumulador = self._acumulador(self.classes, f"{classe}/advance")
+        inicio = perf_counter_ns()
+        for agente in agentes:
+            agente.advance()
+        acumulador.adicionar(perf_counter_ns() - inicio)
+
+    def executar_intercalados(self, ordem):
+        """Executa `step()` de pares (classe, agente) com as classes misturadas (ativação aleatória).
+
+        Cada chamada é cronometrada e somada à sua classe; cada classe recebe um
+        total por passo, como em `executar_passos`.
+        """
+        totais = {}
+        amostragem = self.amostragem
+        for classe, agente in ordem:
+            inicio = perf_counter_ns()
+            agente.step()
+            duracao = perf_counter_ns() - inicio
+            totais[classe] = totais.get(classe, 0) + duracao
+            if amostragem:
+                self._contador_amostras += 1
+                if not self._contador_amostras % amostragem:
+                    self._acumulador(self.amostras, classe).adicionar(duracao)
+        for classe, total in totais.items():
+            self._acumulador(self.classes, classe).adicionar(total)
+
+    def fim_do_passo(self):
+        self.passos += 1
+        if self.periodo_resumo and self.passos % self.periodo_resumo == 0:
+            self.modelo.eventos.info("perfil", **self.resumo())
+
+    # ------------------------------------------------------------------
+    # Contadores de consultas ao grid
+
+    def _instalar_contadores(self):
+        """Substitui, só nesta instância do grid, os métodos consultados por versões que contam as chamadas."""
+        grid = self.modelo.grid
+        for nome in CONSULTAS_GRID:
+            setattr(grid, nome, self._contar(nome, getattr(grid, nome)))
+
+    def _contar(self, nome, metodo):
+        consultas = self.consultas
+
+        def contado(*args, **kwargs):
+            consultas[nome] += 1
+            return metodo(*args, **kwargs)
+        return contado
+
+    def remover_contadores(self):
+        grid = self.modelo.grid
+        for nome in CONSULTAS_GRID:
+            grid.__dict__.pop(nome, None)
+
+    # ------------------------------------------------------------------
+
+    def resumo(self):
+        """Tempos acumulados por fase, por classe e das chamadas amostradas, e contagem de consultas ao grid."""
+        return {
+            "passos": self.passos,
+            "fases": {nome: a.resumo() for nome, a in self.fases.items()},
+            "classes": {nome: a.resumo() for nome, a in self.classes.items()},
+            "amostras": {nome: a.resumo() for nome, a in self.amostras.items()},
+            "consultas_grid": dict(self.consultas),
+        }
+
+    def zerar(self):
+        self.fases.clear()
+        self.classes.clear()
+        self.amostras.clear()
+        self.consultas.update(dict.fromkeys(CONSULTAS_GRID, 0))
+        self.passos = 0
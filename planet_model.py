@@ -1,76 +1,202 @@
 from mesa import Model
 from mesa.space import MultiGrid
-import random
+import numpy as np
+import gc
+import math
 from objetos import Recurso, BaseInicial, Estrutura
+from indice_espacial import IndiceRecursos
+from camada_recursos import CamadaRecursos
+from navegacao import Navegacao
+from motor_reativo import MotorReativo
+from viagens import AgendaViagens
+from escalonador import Escalonador
+from mundo_esparso import GradeEsparsa, MundoEsparso, NavegacaoEsparsa
+from registro_eventos import RegistroEventos, DestinoJSONL, DestinoConsole, DEBUG
 from agentes import AgenteReativoSimples, AgenteBaseadoEmEstado, AgenteBaseadoEmObjetivos, AgenteCooperativo, AgenteBDI
-from mesa.datacollection import DataCollector
+from coleta_colunar import ColetorColunar
+from perfilamento import Perfilador, PERFIL_NULO, CONSULTAS_GRID
+from functools import partial, wraps
+
+
+CLASSES_COLETORAS = ("AgenteReativoSimples", "AgenteBaseadoEmEstado", "AgenteBaseadoEmObjetivos", "AgenteCooperativo")
+
+
+def _pontuacao(modelo, tipo):
+    return modelo.pontuacoes.get(tipo, 0)
+
+# Os reporters por tipo recebem uma lista de agentes ou um objeto que já fornece
+# os agregados prontos (o MotorReativo, ou os totais das faixas no modo distribuído)
+
+def _entregas_da_classe(modelo, classe):
+    return modelo.base.entregas.entregas_por_classe.get(classe, 0)
+
+def _entregas_do_tipo(modelo, tipo):
+    return modelo.base.entregas.entregas_por_tipo.get(tipo, 0)
+
+def _carregando(agentes):
+    """Quantidade de agentes transportando um recurso."""
+    if hasattr(agentes, "total_carregando"):
+        return agentes.total_carregando()
+    return sum(1 for ag in agentes if ag.recurso_atual)
+
+def _utilizacao(agentes):
+    """Fração dos agentes ocupados (transportando ou a caminho de um destino)."""
+    if not len(agentes):
+        return 0.0
+    if hasattr(agentes, "total_ocupados"):
+        return agentes.total_ocupados() / len(agentes)
+    ocupados = sum(1 for ag in agentes
+                   if ag.recurso_atual or getattr(ag, "destino_recurso", None) or getattr(ag, "destino_atual", None))
+    return ocupados / len(agentes)
+
+
+# Condições de parada para run_until: funções do modelo que retornam True para parar
+
+def todos_entregues(modelo):
+    return modelo.concluido()
+
+def utilidade_atingida(limite):
+    """Para quando a utilidade entregue na base chega a `limite`."""
+    def atingida(modelo):
+        return modelo.utilidade_entregue >= limite
+    return atingida
+
+def sem_progresso(passos):
+    """Para depois de `passos` passos sem nenhuma coleta ou entrega."""
+    def parado(modelo):
+        return modelo.passos - modelo.passo_ultimo_progresso >= passos
+    return parado
+
+def condicao_de_parada(condicao):
+    """Normaliza `condicao` (None, uma função ou uma lista de funções) numa única função do modelo."""
+    if condicao is None:
+        return lambda modelo: False
+    if callable(condicao):
+        return condicao
+    condicoes = list(condicao)
+    return lambda modelo: any(c(modelo) for c in condicoes)
+
+
+def _sem_coleta_de_lixo(metodo):
+    """Pausa o coletor de lixo durante o método.
+
+    A montagem do mundo cria uma lista por célula e um objeto por recurso de uma
+    vez; em grids grandes, as coletas disparadas no meio disso dominam o tempo.
+    """
+    @wraps(metodo)
+    def envolvido(*args, **kwargs):
+        coletor_ativo = gc.isenabled()
+        gc.disable()
+        try:
+            return metodo(*args, **kwargs)
+        finally:
+            if coletor_ativo:
+                gc.enable()
+    return envolvido
+
+
+class GradePlaneta(MultiGrid):
+    """MultiGrid que cria as listas das células direto com `list`, sem uma chamada Python por célula."""
+    default_val = list
+
+    def __getstate__(self):
+        # Fora do instantâneo: o cache de vizinhanças (refeito sob demanda) e
+        # os contadores instalados pelo perfil (reinstalados pelo modelo)
+        estado = {nome: valor for nome, valor in self.__dict__.items() if nome not in CONSULTAS_GRID}
+        estado["_neighborhood_cache"] = {}
+        return estado
+
 
 class PlanetaModelo(Model):
+    @_sem_coleta_de_lixo
     def __init__(self, width, height, num_crystals, num_metals, num_structures,
-                 num_agentes_reativos, num_agentes_estado, num_agentes_objetivos, num_agentes_cooperativos):
+                 num_agentes_reativos, num_agentes_estado, num_agentes_objetivos, num_agentes_cooperativos,
+                 seed=None, nivel_eventos="info", arquivo_eventos=None, eco_console=False, arquivo_coleta=None,
+                 modo_alocacao="fifo", disposicao_recursos="aleatoria",
+                 motor_reativo=False, perfil=False, recursos_compactos=False, modo_exploracao="aleatoria",
+                 avanco_rapido=False, ativacao="fixa", frequencias=None, mundo_esparso=False,
+                 idade_maxima_crenca=None):
+        # O Mesa cria self.random a partir de `seed`; todo sorteio do modelo e dos
+        # agentes passa por ele para que execuções em lote sejam reprodutíveis.
         super().__init__()
-        self.grid = MultiGrid(width, height, False)
+        self.grid = GradeEsparsa(width, height) if mundo_esparso else GradePlaneta(width, height, False)
+        self.mundo = None
         self.width = width
         self.height = height
+        self.passos = 0
+
+        # Eventos da simulação (entregas, pontuações...) vão para um buffer em memória;
+        # arquivo JSONL e eco no console são opcionais
+        self.eventos = RegistroEventos(nivel_eventos)
+        if arquivo_eventos:
+            self.eventos.adicionar_destino(DestinoJSONL(arquivo_eventos))
+        if eco_console:
+            self.eventos.adicionar_destino(DestinoConsole())
 
         # Dicionário para acesso rápido aos objetos e agentes pelo ID
         self.agents_by_id = {}
 
         # Base Inicial
         self.base_pos = (width // 2, height // 2)
-        self.base = BaseInicial("BASE", self)
+        self.base = BaseInicial("BASE", self, classes=CLASSES_COLETORAS)
         self.grid.place_agent(self.base, self.base_pos)
         self.agents_by_id[self.base.unique_id] = self.base
 
         # Adiciona o Agente BDI na base
-        self.agente_bdi = AgenteBDI("BDI", self)
+        self.agente_bdi = AgenteBDI("BDI", self, idade_maxima_crenca=idade_maxima_crenca,
+                                    modo_alocacao=modo_alocacao, exploracao=modo_exploracao)
         self.grid.place_agent(self.agente_bdi, self.base_pos)
         self.agents_by_id[self.agente_bdi.unique_id] = self.agente_bdi
 
-        self.pontuacoes = {
-            "AgenteReativoSimples": 0,
-            "AgenteBaseadoEmEstado": 0,
-            "AgenteBaseadoEmObjetivos": 0,
-            "AgenteCooperativo": 0
-        }
+        # Utilidade entregue por classe de agente: o total mantido pelo registro de entregas da base
+        self.pontuacoes = self.base.entregas.utilidade_por_classe
 
-        self.datacollector = DataCollector(
+        # Andamento da coleta, atualizado a cada coleta e entrega (ver concluido e run_until)
+        self.recursos_em_transito = 0
+        self.passo_ultimo_progresso = 0
+        self.recursos_retirados = []  # unique_id dos recursos coletados, em ordem (lido pelo GridDelta)
+
+        # Séries em colunas NumPy; com `arquivo_coleta` (.csv ou .parquet) os blocos
+        # são gravados durante a execução e a memória fica limitada
+        self.datacollector = ColetorColunar(
+            # Pontuações e entregas vêm dos totais do registro de entregas, sem percorrer os agentes
             model_reporters={
-                "AgenteReativoSimples": lambda m: m.pontuacoes["AgenteReativoSimples"] if "AgenteReativoSimples" in m.pontuacoes else 0,
-                "AgenteBaseadoEmEstado": lambda m: m.pontuacoes["AgenteBaseadoEmEstado"] if "AgenteBaseadoEmEstado" in m.pontuacoes else 0,
-                "AgenteBaseadoEmObjetivos": lambda m: m.pontuacoes["AgenteBaseadoEmObjetivos"] if "AgenteBaseadoEmObjetivos" in m.pontuacoes else 0,
-                "AgenteCooperativo": lambda m: m.pontuacoes["AgenteCooperativo"] if "AgenteCooperativo" in m.pontuacoes else 0,
-            }
+                **{tipo: partial(_pontuacao, tipo=tipo) for tipo in CLASSES_COLETORAS},
+                **{f"{tipo}_entregas": partial(_entregas_da_classe, classe=tipo) for tipo in CLASSES_COLETORAS},
+                **{f"{tipo}_entregues": partial(_entregas_do_tipo, tipo=tipo) for tipo in ("Cristal", "Metal")},
+            },
+            reporters_por_tipo={
+                "carregando": _carregando,
+                "utilizacao": _utilizacao,
+            },
+            arquivo=arquivo_coleta,
         )
 
+        # Sorteia de uma vez as posições de recursos, estruturas e agentes entre as células livres
+        self.rng = np.random.default_rng(self.random.getrandbits(64))
+        num_agentes = num_agentes_reativos + num_agentes_estado + num_agentes_objetivos + num_agentes_cooperativos
+        if mundo_esparso:
+            # Mundo em blocos gerados sob demanda (ver mundo_esparso.py); nada do tamanho do mapa é alocado
+            conflitos = [nome for nome, ligado in (("motor_reativo", motor_reativo), ("recursos_compactos", recursos_compactos),
+                                                   ("avanco_rapido", avanco_rapido),
+                                                   ("modo_exploracao='fronteira'", modo_exploracao == "fronteira"),
+                                                   ("disposicao_recursos='agrupada'", disposicao_recursos == "agrupada"))
+                         if ligado]
+            if conflitos:
+                raise ValueError(f"mundo_esparso não pode ser combinado com {', '.join(conflitos)}.")
+            pos_agentes = self._montar_mundo_esparso(num_crystals, num_metals, num_structures, num_agentes)
+        else:
+            pos_agentes = self._montar_mundo(num_crystals, num_metals, num_structures, num_agentes,
+                                             disposicao_recursos, recursos_compactos)
+        pos_agentes = iter(pos_agentes)
 
-
-        # Recursos leves (Cristal e Metal)
-        for i in range(num_crystals):
-            pos = self.gerar_posicao_valida()
-            recurso = Recurso(f"R_{i}", self, "Cristal", 10, pos)
-            self.grid.place_agent(recurso, pos)
-            self.agents_by_id[recurso.unique_id] = recurso
-
-        for i in range(num_metals):
-            pos = self.gerar_posicao_valida()
-            recurso = Recurso(f"M_{i}", self, "Metal", 20, pos)
-            self.grid.place_agent(recurso, pos)
-            self.agents_by_id[recurso.unique_id] = recurso
-
-        # Estruturas
-        self.estruturas = []
-        for i in range(num_structures):
-            pos = self.gerar_posicao_valida()
-            estrutura = Estrutura(f"E_{i}", self, pos)
-            self.estruturas.append(estrutura)
-            self.grid.place_agent(estrutura, pos)
-            self.agents_by_id[estrutura.unique_id] = estrutura
-
-        # Agentes reativos simples
+        # Agentes reativos simples: objetos Mesa ou, com `motor_reativo`, arrays do MotorReativo
         self.agentes_reativos = []
-        for i in range(num_agentes_reativos):
-            pos = self.gerar_posicao_valida()
+        self.motor_reativo = None
+        if motor_reativo:
+            self.motor_reativo = MotorReativo(self, [next(pos_agentes) for _ in range(num_agentes_reativos)])
+        for i in range(0 if motor_reativo else num_agentes_reativos):
+            pos = next(pos_agentes)
             agente = AgenteReativoSimples(f"A_{i}", self, self.base_pos)
             self.agentes_reativos.append(agente)
             self.grid.place_agent(agente, pos)
@@ -79,7 +205,7 @@ class PlanetaModelo(Model):
         # Agentes baseados em estado
         self.agentes_baseados_estado = []
         for i in range(num_agentes_estado):
-            pos = self.gerar_posicao_valida()
+            pos = next(pos_agentes)
             agente = AgenteBaseadoEmEstado(f"AE_{i}", self, self.base_pos)
             self.agentes_baseados_estado.append(agente)
             self.grid.place_agent(agente, pos)
@@ -88,7 +214,7 @@ class PlanetaModelo(Model):
         # Agentes baseados em objetivos
         self.agentes_baseados_objetivos = []
         for i in range(num_agentes_objetivos):
-            pos = self.gerar_posicao_valida()
+            pos = next(pos_agentes)
             agente = AgenteBaseadoEmObjetivos(f"ABO_{i}", self, self.base_pos)
             self.agentes_baseados_objetivos.append(agente)
             self.grid.place_agent(agente, pos)
@@ -97,56 +223,396 @@ class PlanetaModelo(Model):
         # Agentes cooperativos
         self.agentes_cooperativos = []
         for i in range(num_agentes_cooperativos):
-            pos = self.gerar_posicao_valida()
+            pos = next(pos_agentes)
             agente = AgenteCooperativo(f"AC_{i}", self, self.base_pos)
             self.agentes_cooperativos.append(agente)
             self.grid.place_agent(agente, pos)
             self.agents_by_id[agente.unique_id] = agente
 
+        # Registro dos agentes por tipo e ordem de ativação (ver escalonador.py); `frequencias`
+        # ({tipo: k}) ativa um tipo, inclusive o "AgenteBDI", só a cada k passos
+        self.schedule = Escalonador(self, ativacao=ativacao, frequencias=frequencias)
+        # Ativação simultânea: movimentos e coletas decididos no step() dos agentes, efetivados no advance()
+        self.movimentos_pendentes = {}  # agente -> posição no início do passo
+        self.coletas_pendentes = {}  # posição -> lista dos agentes que a disputam; resolvida, tupla com o vencedor à frente
+        self.schedule.registrar("AgenteReativoSimples", self.agentes_reativos,
+                                None if self.motor_reativo is None else [self.motor_reativo])
+        self.schedule.registrar("AgenteBaseadoEmEstado", self.agentes_baseados_estado)
+        self.schedule.registrar("AgenteBaseadoEmObjetivos", self.agentes_baseados_objetivos)
+        self.schedule.registrar("AgenteCooperativo", self.agentes_cooperativos)
+
+        # Com `avanco_rapido`, as voltas à base com carga são agendadas em vez de andadas passo a passo
+        self.agenda_viagens = AgendaViagens(self) if avanco_rapido else None
+
+        # Instrumentação do step (ver ativar_perfil); desligada, não mede nada
+        self.perfil = PERFIL_NULO
+        if perfil:
+            self.ativar_perfil(**(perfil if isinstance(perfil, dict) else {}))
+
+    def __setstate__(self, estado):
+        # Restaurado de um instantâneo (checkpoint.py)
+        self.__dict__.update(estado)
+        if self.perfil.ativo:
+            self.perfil._instalar_contadores()
+
+    def _montar_mundo(self, num_crystals, num_metals, num_structures, num_agentes, disposicao_recursos, recursos_compactos):
+        """Sorteia recursos e estruturas no mapa inteiro e retorna as posições iniciais dos agentes."""
+        width, height = self.width, self.height
+        self.ocupadas = np.zeros((width, height), dtype=bool)  # ocupação durante a montagem do mundo
+        self.ocupadas[self.base_pos] = True
+        num_recursos = num_crystals + num_metals
+        self.verificar_capacidade(num_recursos + num_structures + num_agentes)
+        celulas_recursos = self._sortear_celulas(num_recursos, disposicao_recursos)
+        pos_demais = self.gerar_posicoes_validas(num_structures + num_agentes)
+        pos_estruturas, pos_agentes = pos_demais[:num_structures], pos_demais[num_structures:]
+        del self.ocupadas  # só serve aos sorteios acima; não fica no modelo nem nos instantâneos
+
+        # Recursos leves (Cristal e Metal): agentes Mesa indexados espacialmente enquanto
+        # disponíveis ou, com `recursos_compactos`, só células das grades da CamadaRecursos.
+        # Nos dois casos o modelo consulta e retira recursos por `indice_recursos`.
+        if recursos_compactos:
+            self.indice_recursos = CamadaRecursos(width, height)
+            self.indice_recursos.preencher(celulas_recursos[:num_crystals], "Cristal", 10)
+            self.indice_recursos.preencher(celulas_recursos[num_crystals:], "Metal", 20)
+        else:
+            pos_recursos = self._posicoes(celulas_recursos)
+            pos_cristais, pos_metais = pos_recursos[:num_crystals], pos_recursos[num_crystals:]
+            self.indice_recursos = IndiceRecursos(width, height)
+            for i, pos in enumerate(pos_cristais):
+                recurso = Recurso(f"R_{i}", self, "Cristal", 10, pos)
+                self.grid.place_agent(recurso, pos)
+                self.agents_by_id[recurso.unique_id] = recurso
+                self.indice_recursos.adicionar(recurso)
+
+            for i, pos in enumerate(pos_metais):
+                recurso = Recurso(f"M_{i}", self, "Metal", 20, pos)
+                self.grid.place_agent(recurso, pos)
+                self.agents_by_id[recurso.unique_id] = recurso
+                self.indice_recursos.adicionar(recurso)
+
+        # Estruturas
+        self.estruturas = []
+        for i, pos in enumerate(pos_estruturas):
+            estrutura = Estrutura(f"E_{i}", self, pos)
+            self.estruturas.append(estrutura)
+            self.grid.place_agent(estrutura, pos)
+            self.agents_by_id[estrutura.unique_id] = estrutura
+
+        # Campos de distância compartilhados (base e alvos frequentes), com as estruturas como obstáculos.
+        # O campo da base é calculado no primeiro retorno de um agente.
+        self.navegacao = Navegacao(width, height, self.base_pos)
+        for estrutura in self.estruturas:
+            self.navegacao.definir_obstaculo(estrutura.pos)
+        return pos_agentes
+
+    def _montar_mundo_esparso(self, num_crystals, num_metals, num_structures, num_agentes):
+        """Cria o mundo esparso (as quantidades viram densidades) e sorteia os agentes perto da base."""
+        area = self.width * self.height
+        self.mundo = MundoEsparso(self, int(self.rng.integers(2 ** 63)),
+                                  {"Cristal": num_crystals / area, "Metal": num_metals / area},
+                                  num_structures / area)
+        self.grid.mundo = self.mundo
+        self.indice_recursos = self.mundo
+        self.estruturas = []  # as estruturas vivem nos blocos do mundo
+        self.navegacao = NavegacaoEsparsa(self.mundo, self.width, self.height, self.base_pos)
+
+        # Só a janela em torno da base é gerada; os agentes começam nela, fora das estruturas
+        lado = min(max(9, math.ceil(math.sqrt(num_agentes * 4))), self.width, self.height)
+        x0 = min(max(self.base_pos[0] - lado // 2, 0), self.width - lado)
+        y0 = min(max(self.base_pos[1] - lado // 2, 0), self.height - lado)
+        livres = [(x, y) for x in range(x0, x0 + lado) for y in range(y0, y0 + lado)
+                  if (x, y) != self.base_pos and not self.mundo.obstaculo((x, y))]
+        if num_agentes > len(livres):
+            raise ValueError(f"Não há células livres suficientes perto da base para {num_agentes} agentes.")
+        return [livres[i] for i in self.rng.choice(len(livres), size=num_agentes, replace=False).tolist()]
+
+    def verificar_capacidade(self, quantidade):
+        """Garante que há células livres suficientes para `quantidade` objetos, ou lança ValueError."""
+        livres = int(self.ocupadas.size - self.ocupadas.sum())
+        if quantidade > livres:
+            raise ValueError(
+                f"O grid {self.width}x{self.height} tem {livres} células livres, "
+                f"mas foram pedidas {quantidade} posições (recursos, estruturas e agentes)."
+            )
+
+    def gerar_posicoes_validas(self, quantidade, disposicao="aleatoria"):
+        """Sorteia `quantidade` células livres distintas e as marca como ocupadas.
+
+        `disposicao` pode ser "aleatoria" (uniforme) ou "agrupada" (jazidas em
+        torno de centros sorteados, completadas com células uniformes se preciso).
+        """
+        return self._posicoes(self._sortear_celulas(quantidade, disposicao))
+
+    def _sortear_celulas(self, quantidade, disposicao="aleatoria"):
+        """Como gerar_posicoes_validas, mas devolve os índices lineares (x * height + y) em um array."""
+        self.verificar_capacidade(quantidade)
+        if quantidade == 0:
+            return np.zeros(0, dtype=np.int64)
+        livres = np.flatnonzero(~self.ocupadas.ravel())
+
+        if disposicao == "agrupada":
+            escolhidas = self._sortear_agrupadas(livres, quantidade)
+        elif disposicao == "aleatoria":
+            escolhidas = self.rng.choice(livres, size=quantidade, replace=False)
+        else:
+            raise ValueError(f"Disposição desconhecida: {disposicao!r} (use 'aleatoria' ou 'agrupada').")
+
+        self.ocupadas.ravel()[escolhidas] = True
+        return escolhidas
+
+    def _posicoes(self, celulas):
+        xs, ys = np.divmod(celulas, self.height)
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def _sortear_agrupadas(self, livres, quantidade, por_jazida=25):
+        num_jazidas = max(1, quantidade // por_jazida)
+        centros = self.rng.choice(livres, size=min(num_jazidas, len(livres)), replace=False)
+        cx, cy = np.divmod(centros, self.height)
+        espalhamento = max(1.0, np.sqrt(por_jazida) / 2)
+
+        # Candidatos em torno dos centros, na ordem sorteada; repetidos e ocupados são descartados
+        sorteio = self.rng.integers(0, len(centros), size=quantidade * 2)
+        xs = np.clip(np.rint(cx[sorteio] + self.rng.normal(0, espalhamento, sorteio.size)), 0, self.width - 1)
+        ys = np.clip(np.rint(cy[sorteio] + self.rng.normal(0, espalhamento, sorteio.size)), 0, self.height - 1)
+        candidatos = (xs * self.height + ys).astype(np.int64)
+        candidatos = candidatos[~self.ocupadas.ravel()[candidatos]]
+        _, primeiros = np.unique(candidatos, return_index=True)
+        escolhidas = candidatos[np.sort(primeiros)][:quantidade]
+
+        faltam = quantidade - len(escolhidas)
+        if faltam:
+            restantes = np.setdiff1d(livres, escolhidas, assume_unique=True)
+            escolhidas = np.concatenate([escolhidas, self.rng.choice(restantes, size=faltam, replace=False)])
+        return escolhidas
+
     def gerar_posicao_valida(self):
-        """Retorna uma posição aleatória disponível no grid."""
-        while True:
-            x = random.randint(0, self.width - 1)
-            y = random.randint(0, self.height - 1)
-            if (x, y) != self.base_pos and not self.grid.get_cell_list_contents((x, y)):
+        """Retorna uma posição aleatória disponível no grid, ou lança ValueError se não houver nenhuma."""
+        self.materializar()
+        for _ in range(100):
+            x = self.random.randint(0, self.width - 1)
+            y = self.random.randint(0, self.height - 1)
+            if (x, y) != self.base_pos and not self.grid.get_cell_list_contents((x, y)) \
+                    and self.indice_recursos.em((x, y)) is None:
                 return (x, y)
+        # Grid quase cheio: escolhe entre as células realmente vazias
+        vazias = [pos for pos in self.grid.empties
+                  if pos != self.base_pos and self.indice_recursos.em(pos) is None]
+        if not vazias:
+            raise ValueError(f"Não há células livres no grid {self.width}x{self.height}.")
+        return self.random.choice(sorted(vazias))
+
+    def recurso_em(self, pos):
+        """Retorna o recurso disponível em `pos` (Recurso ou RecursoLeve), ou None."""
+        return self.indice_recursos.em(pos)
+
+    def recursos_vizinhos(self, pos):
+        """Recursos em `pos` e nas 8 células vizinhas: o que um agente enxerga de onde está."""
+        return self.indice_recursos.no_raio(pos, 1.5)
+
+    def retirar_recurso(self, recurso):
+        """Marca o recurso como coletado e o retira do grid, do índice de recursos e das crenças do BDI."""
+        self.indice_recursos.remover(recurso)
+        self.agente_bdi.beliefs.consumir(recurso.pos)
+        if self.motor_reativo is not None:
+            self.motor_reativo.recurso_retirado(recurso.pos)
+        recurso.transportado = True
+        if isinstance(recurso, Recurso):
+            origem = recurso.pos
+            self.grid.remove_agent(recurso)
+            recurso.pos = origem  # fora do grid, guarda a posição de origem para o registro de entregas
+        self.recursos_em_transito += 1
+        self.passo_ultimo_progresso = self.passos
+        self.recursos_retirados.append(recurso.unique_id)
+
+    def mover(self, agente, pos):
+        """Move o agente; na fase de decisão da ativação simultânea, só anota o movimento (ver efetivar)."""
+        if self.schedule.decidindo:
+            self.movimentos_pendentes.setdefault(agente, agente.pos)
+            agente.pos = pos
+        else:
+            self.grid.move_agent(agente, pos)
+
+    def coletar(self, agente, recurso):
+        """Retira o recurso que `agente` acabou de pegar; na fase de decisão, só registra a disputa por ele."""
+        if self.schedule.decidindo:
+            self.coletas_pendentes.setdefault(recurso.pos, []).append(agente)
+        else:
+            self.retirar_recurso(recurso)
+
+    def efetivar(self, agente):
+        """Aplica o movimento e a coleta que `agente` decidiu no step(); False se outro agente ficou com o recurso.
+
+        Entre vários agentes que pegaram o mesmo recurso no passo, o vencedor é sorteado.
+        """
+        origem = self.movimentos_pendentes.pop(agente, None)
+        if origem is not None:
+            destino, agente.pos = agente.pos, origem
+            self.grid.move_agent(agente, destino)
+        recurso = agente.recurso_atual
+        disputa = self.coletas_pendentes.get(recurso.pos) if recurso is not None else None
+        if disputa is None or agente not in disputa:
+            return True  # nada coletado neste passo
+        if isinstance(disputa, list):
+            vencedor = disputa[0] if len(disputa) == 1 else self.random.choice(disputa)
+            self.retirar_recurso(vencedor.recurso_atual)
+            disputa = self.coletas_pendentes[recurso.pos] = (vencedor, *disputa)
+        return disputa[0] is agente
+
+    def contabilizar_entrega(self, quantidade=1):
+        """Desconta dos recursos em trânsito os `quantidade` que acabaram de ser entregues."""
+        self.recursos_em_transito -= quantidade
+        self.passo_ultimo_progresso = self.passos
+
+    @property
+    def entregas_totais(self):
+        return len(self.base.entregas)
+
+    @property
+    def utilidade_entregue(self):
+        return self.base.entregas.utilidade_total
+
+    @property
+    def recursos_no_grid(self):
+        """Recursos ainda não coletados (no mundo esparso, só os dos blocos já gerados)."""
+        return len(self.indice_recursos)
+
+    def concluido(self):
+        """Se todos os recursos do mapa já foram entregues na base (nunca, no mundo esparso)."""
+        return self.mundo is None and not self.recursos_em_transito and not len(self.indice_recursos)
+
+    def mover_estrutura(self, estrutura, nova_pos):
+        """Move uma estrutura no grid e atualiza os obstáculos e campos de distância afetados."""
+        if self.agenda_viagens is not None:
+            self.agenda_viagens.acordar_todos()  # os caminhos agendados deixam de valer
+        pos_antiga = estrutura.pos
+        self.grid.move_agent(estrutura, nova_pos)
+        self.navegacao.definir_obstaculo(pos_antiga, self._celula_bloqueada(pos_antiga))
+        self.navegacao.definir_obstaculo(nova_pos, self._celula_bloqueada(nova_pos))
+
+    def estrutura_transportada(self, estrutura):
+        """Chamado quando uma estrutura passa a ser carregada: ela deixa de bloquear a célula."""
+        if self.agenda_viagens is not None:
+            self.agenda_viagens.acordar_todos()
+        self.navegacao.definir_obstaculo(estrutura.pos, self._celula_bloqueada(estrutura.pos))
+
+    def _celula_bloqueada(self, pos):
+        # Estruturas sendo carregadas acompanham os transportadores e não bloqueiam a passagem
+        return any(isinstance(obj, Estrutura) and not obj.sendo_transportada
+                   for obj in self.grid.get_cell_list_contents(pos))
+
+    def viajar_para_base(self, agente):
+        """Agenda a volta do agente à base (avanço rápido); retorna False se ele deve andar passo a passo."""
+        return self.agenda_viagens is not None and self.agenda_viagens.viajar(agente)
+
+    def materializar(self):
+        """Atualiza no grid a posição dos agentes em viagem agendada; chame antes de observar o grid."""
+        if self.agenda_viagens is not None:
+            self.agenda_viagens.materializar()
+
+    def agentes_por_tipo(self):
+        """Retorna os agentes coletores agrupados pelo nome da classe."""
+        return {
+            "AgenteReativoSimples": self.motor_reativo if self.motor_reativo is not None else self.agentes_reativos,
+            "AgenteBaseadoEmEstado": self.agentes_baseados_estado,
+            "AgenteBaseadoEmObjetivos": self.agentes_baseados_objetivos,
+            "AgenteCooperativo": self.agentes_cooperativos,
+        }
+
+    def ativar_perfil(self, amostragem=0, periodo_resumo=0):
+        """Liga a medição por fase e por classe; o resultado fica em `self.perfil.resumo()`.
+
+        `amostragem` mede uma a cada N chamadas de step() dos agentes e
+        `periodo_resumo` emite o resumo como evento "perfil" a cada N passos.
+        """
+        self.desativar_perfil()
+        self.perfil = Perfilador(self, amostragem=amostragem, periodo_resumo=periodo_resumo)
+        return self.perfil
+
+    def desativar_perfil(self):
+        if self.perfil.ativo:
+            self.perfil.remover_contadores()
+        self.perfil = PERFIL_NULO
 
     def get_agent_by_id(self, unique_id):
         """Retorna um agente ou objeto pelo seu ID."""
         return self.agents_by_id.get(unique_id, None)
     
+    def encerrar(self):
+        """Grava o que ainda estiver pendente nos arquivos de eventos e de coleta."""
+        self.datacollector.fechar()
+        self.eventos.fechar()
+
     def exibir_pontuacoes(self):
-        print("\nPontuação final por tipo de agente:")
-        for tipo, pontos in self.pontuacoes.items():
-            print(f"{tipo}: {pontos} pontos")
+        self.eventos.info("pontuacao_final", **self.pontuacoes)
+
+
+    def resumo(self):
+        """Andamento e resultados da execução, em tipos simples (prontos para JSON)."""
+        return {
+            "passos": self.passos,
+            "concluido": self.concluido(),
+            "entregas": self.entregas_totais,
+            "utilidade_total": self.utilidade_entregue,
+            "pontuacoes": dict(self.pontuacoes),
+            "entregas_por_tipo": dict(self.base.entregas.entregas_por_tipo),
+        }
 
+    def run_until(self, condicao=None, max_passos=None):
+        """Executa passos até a coleta terminar, `condicao` ser satisfeita ou `max_passos`; retorna quantos passos rodou.
+
+        `condicao` é uma função do modelo (ver todos_entregues, utilidade_atingida
+        e sem_progresso) ou uma lista delas, satisfeita quando qualquer uma for.
+        """
+        parar = condicao_de_parada(condicao)
+        executados = 0
+        while self.running and (max_passos is None or executados < max_passos) and not parar(self):
+            self.step()
+            executados += 1
+        return executados
 
     def step(self):
         """Executa um ciclo de simulação, processando informações dos agentes."""
-        for agente in self.agentes_reativos + self.agentes_baseados_estado + \
-                    self.agentes_baseados_objetivos + self.agentes_cooperativos:
-            if agente.pos == self.base_pos:
-                # Apenas agentes na base enviam informações para o BDI
-                self.agente_bdi.receber_informacoes(agente)
-                
-                if hasattr(agente, "pontuacao"):
-                    tipo = type(agente).__name__
-                    self.pontuacoes[tipo] += agente.pontuacao
-                    print(f"Pontuação do {tipo} atualizada: {self.pontuacoes[tipo]}")
+        self.passos += 1
+        self.eventos.passo = self.passos
+        perfil = self.perfil
+        agenda = self.agenda_viagens
+        if agenda is not None:
+            agenda.acordar(self.passos)
+
+        with perfil.fase("compartilhamento"):
+            for agente in self.schedule.agentes():
+                if agente.pos == self.base_pos:
+                    # Apenas agentes na base enviam informações para o BDI; as pontuações
+                    # já foram contadas uma única vez, na entrega (ver BaseInicial.registrar_recurso)
+                    self.agente_bdi.receber_informacoes(agente)
 
 
         # Coleta dados para visualização
-        self.datacollector.collect(self)
-        print(f"Dados coletados: {self.datacollector.model_vars}")
+        with perfil.fase("coleta"):
+            self.datacollector.collect(self)
+            if self.eventos.ativo(DEBUG):
+                self.eventos.debug("dados_coletados", **{nome: valores[-1] for nome, valores in self.datacollector.model_vars.items()})
 
 
-        # Executa o passo dos agentes
-        for agente in self.agentes_reativos + self.agentes_baseados_estado + \
-                    self.agentes_baseados_objetivos + self.agentes_cooperativos:
-            agente.step()
-
-        # BDI processa informações e direciona agentes estratégicos
-        self.agente_bdi.step()
-        print(f"Pontuações acumuladas: {self.pontuacoes}")
+        # Executa o passo dos agentes conforme a ativação do escalonador; os que estão
+        # em viagem agendada ficam adormecidos nele até chegarem à base
+        with perfil.fase("agentes"):
+            self.coletas_pendentes.clear()
+            self.schedule.step(perfil)
+            if agenda is not None:
+                agenda.concluido = self.passos
 
+        # Mundo esparso: descarta os blocos intactos longe de todos os agentes
+        if self.mundo is not None and self.passos % self.mundo.periodo_despejo == 0:
+            self.mundo.despejar([self.base_pos] + [agente.pos for agente in self.schedule.agentes()])
 
+        # BDI processa informações e direciona agentes estratégicos
+        if self.schedule.deve_ativar("AgenteBDI"):
+            with perfil.fase("bdi"):
+                self.agente_bdi.step()
+        if self.eventos.ativo(DEBUG):
+            self.eventos.debug("pontuacoes_acumuladas", **self.pontuacoes)
+        if self.concluido():
+            self.running = False  # a interface e run_until param de avançar o mundo
+            self.eventos.info("coleta_concluida", entregas=self.entregas_totais, utilidade=self.utilidade_entregue)
+        perfil.fim_do_passo()
@@ -0,0 +1,121 @@
+import json
+from collections import deque
+
+# Níveis de severidade (mesma escala do módulo logging)
+DEBUG = 10
+INFO = 20
+AVISO = 30
+ERRO = 40
+
+NOMES_NIVEIS = {DEBUG: "debug", INFO: "info", AVISO: "aviso", ERRO: "erro"}
+NIVEIS = {nome: nivel for nivel, nome in NOMES_NIVEIS.items()}
+
+
+def nivel_de(nivel):
+    """Aceita o nível como número ou nome ("debug", "info", "aviso", "erro")."""
+    if not isinstance(nivel, str):
+        return nivel
+    if nivel.lower() not in NIVEIS:
+        raise ValueError(f"Nível de eventos desconhecido: {nivel!r} (use um de {', '.join(NIVEIS)}).")
+    return NIVEIS[nivel.lower()]
+
+
+class RegistroEventos:
+    """Registro estruturado de eventos da simulação, com níveis e buffer circular em memória.
+
+    Eventos abaixo de `nivel` são descartados logo na entrada, antes de qualquer
+    formatação. Os aceitos vão para o buffer (os `capacidade` mais recentes) e
+    para cada destino registrado, que é qualquer chamável que recebe o dicionário
+    do evento.
+    """
+
+    def __init__(self, nivel=INFO, capacidade=1000):
+        self.nivel = nivel_de(nivel)
+        self.buffer = deque(maxlen=capacidade)
+        self.destinos = []
+        self.passo = 0  # atualizado pelo modelo a cada ciclo
+
+    def ativo(self, nivel):
+        """Indica se eventos do nível informado seriam registrados."""
+        return nivel >= self.nivel
+
+    def emitir(self, nivel, evento, **campos):
+        if nivel < self.nivel:
+            return
+        registro = {"passo": self.passo, "nivel": NOMES_NIVEIS.get(nivel, nivel), "evento": evento, **campos}
+        self.buffer.append(registro)
+        for destino in self.destinos:
+            destino(registro)
+
+    def debug(self, evento, **campos):
+        self.emitir(DEBUG, evento, **campos)
+
+    def info(self, evento, **campos):
+        self.emitir(INFO, evento, **campos)
+
+    def aviso(self, evento, **campos):
+        self.emitir(AVISO, evento, **campos)
+
+    def erro(self, evento, **campos):
+        self.emitir(ERRO, evento, **campos)
+
+    def adicionar_destino(self, destino):
+        self.destinos.append(destino)
+        return destino
+
+    def recentes(self, n=None, evento=None):
+        """Retorna os eventos mais recentes do buffer, opcionalmente filtrados pelo nome."""
+        registros = [r for r in self.buffer if evento is None or r["evento"] == evento]
+        return registros if n is None else registros[-n:]
+
+    def fechar(self):
+        """Descarrega e fecha os destinos que mantêm recursos abertos."""
+        for destino in self.destinos:
+            fechar = getattr(destino, "fechar", None)
+            if fechar:
+                fechar()
+
+
+class DestinoJSONL:
+    """Grava os eventos em um arquivo JSON Lines, em lotes de `tamanho_lote` linhas."""
+
+    def __init__(self, caminho, tamanho_lote=1000):
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote
+        self.pendentes = []
+        self.arquivo = None
+
+    def __call__(self, registro):
+        self.pendentes.append(json.dumps(registro, ensure_ascii=False, default=str))
+        if len(self.pendentes) >= self.tamanho_lote:
+            self.descarregar()
+
+    def descarregar(self):
+        if not self.pendentes:
+            return
+        if self.arquivo is None:
+            self.arquivo = open(self.caminho, "a", encoding="utf-8")
+        self.arquivo.write("\n".join(self.pendentes) + "\n")
+        self.arquivo.flush()
+        self.pendentes = []
+
+    def fechar(self):
+        self.descarregar()
+        if self.arquivo is not None:
+            self.arquivo.close()
+            self.arquivo = None
+
+    def __getstate__(self):
+        # O arquivo é reaberto (em modo de anexar) na próxima gravação
+        estado = self.__dict__.copy()
+        estado["arquivo"] = None
+        return estado
+
+
+class DestinoConsole:
+    """Escreve cada evento em uma linha legível na saída padrão."""
+
+    def __call__(self, registro):
+        campos = " ".join(f"{chave}={valor}" for chave, valor in registro.items()
+                          if chave not in ("passo", "nivel", "evento"))
+        print(f"[{registro['passo']}] {registro['nivel']} {registro['evento']} {campos}")
@@ -0,0 +1,457 @@
+"""Serviço HTTP/JSON local para executar simulações do PlanetaModelo sem a interface web.
+
+Um laço asyncio recebe os pedidos, põe os trabalhos numa fila limitada e os
+distribui entre processos de trabalho, cada um ligado ao laço por um Pipe.
+O progresso de cada trabalho volta a cada `periodo` passos e é transmitido
+em NDJSON numa resposta em partes (chunked).
+
+    POST   /simulacoes                 {"parametros": {...}, "seed": 1, "passos": 500, "periodo": 10}
+                                       -> 202 {"id": ...}; 503 com a fila cheia
+    GET    /simulacoes/<id>            estado e resumo do trabalho
+    GET    /simulacoes/<id>/progresso  últimos eventos e os seguintes, em NDJSON, até o fim do trabalho
+    DELETE /simulacoes/<id>            cancela (na fila ou em execução)
+    GET    /estado                     fila, trabalhadores e contadores do serviço
+
+    python servico.py --porta 8600 --trabalhadores 4 --tamanho-fila 256
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from collections import deque
+from http import HTTPStatus
+
+PASSOS_PADRAO = 500
+PERIODO_PADRAO = 10
+ESTADOS_FINAIS = ("concluida", "cancelada", "erro")
+JANELA_PROGRESSO = 32  # eventos guardados por trabalho e por cliente acompanhando o progresso
+PASSOS_ENTRE_CONSULTAS = 20  # o processo de trabalho confere se há cancelamento ao menos a cada tantos passos
+PRAZO_CANCELAMENTO = 5.0  # segundos até um processo que não atendeu ao cancelamento ser substituído
+
+
+class FilaCheia(Exception):
+    """A fila de trabalhos está no limite; o cliente deve tentar de novo mais tarde."""
+
+
+# ----------------------------------------------------------------------
+# Processo de trabalho
+
+
+def _executar(conexao, id_trabalho, pedido):
+    """Executa um trabalho, enviando o progresso; retorna False se o processo deve encerrar."""
+    from planet_model import PlanetaModelo, sem_progresso
+
+    modelo = PlanetaModelo(**pedido["parametros"], seed=pedido["seed"], nivel_eventos="aviso")
+    condicao = sem_progresso(pedido["parar_sem_progresso"]) if pedido.get("parar_sem_progresso") else None
+    passos, periodo = pedido["passos"], pedido["periodo"]
+    proximo_progresso = periodo
+    while modelo.passos < passos:
+        alvo = min(PASSOS_ENTRE_CONSULTAS, proximo_progresso - modelo.passos, passos - modelo.passos)
+        executados = modelo.run_until(condicao, alvo)
+        if executados < alvo or modelo.passos >= proximo_progresso:
+            conexao.send(("progresso", id_trabalho, modelo.resumo()))
+            proximo_progresso += periodo
+        if executados < alvo:
+            break
+        # O cancelamento chega entre blocos de no máximo PASSOS_ENTRE_CONSULTAS passos
+        if conexao.poll():
+            mensagem = conexao.recv()
+            if mensagem is None:
+                return False
+            if mensagem == ("cancelar", id_trabalho):
+                conexao.send(("cancelada", id_trabalho, modelo.resumo()))
+                return True
+    modelo.encerrar()
+    conexao.send(("concluida", id_trabalho, modelo.resumo()))
+    return True
+
+
+def _trabalhador(conexao):
+    while True:
+        mensagem = conexao.recv()
+        if mensagem is None:
+            break
+        if mensagem[0] != "executar":
+            continue  # cancelamento de um trabalho que já terminou
+        _, id_trabalho, pedido = mensagem
+        try:
+            if not _executar(conexao, id_trabalho, pedido):
+                break
+        except Exception as erro:
+            conexao.send(("erro", id_trabalho, {"erro": f"{type(erro).__name__}: {erro}"}))
+    conexao.close()
+
+
+class _Processo:
+    """Processo de trabalho visto pelo laço asyncio: mensagens recebidas caem numa fila assíncrona."""
+
+    def __init__(self, contexto, laco):
+        self.conexao, remota = contexto.Pipe()
+        self.processo = contexto.Process(target=_trabalhador, args=(remota,), daemon=True)
+        self.processo.start()
+        remota.close()
+        self.mensagens = asyncio.Queue()
+        self.trabalho = None
+        self._laco = laco
+        laco.add_reader(self.conexao.fileno(), self._ler)
+
+    def _ler(self):
+        try:
+            mensagem = self.conexao.recv()
+        except (EOFError, OSError):
+            self._laco.remove_reader(self.conexao.fileno())
+            mensagem = ("morto", None, {"erro": "processo de trabalho encerrado"})
+        self.mensagens.put_nowait(mensagem)
+
+    def enviar(self, mensagem):
+        self.conexao.send(mensagem)
+
+    def fechar(self):
+        try:
+            self._laco.remove_reader(self.conexao.fileno())
+            self.conexao.send(None)
+        except (OSError, ValueError):
+            pass
+        self.processo.join(timeout=5)
+        if self.processo.is_alive():
+            self.processo.terminate()
+        self.conexao.close()
+
+
+# ----------------------------------------------------------------------
+# Trabalhos
+
+
+class Trabalho:
+    """Um pedido de simulação e os últimos `JANELA_PROGRESSO` eventos de progresso."""
+
+    def __init__(self, id_trabalho, pedido):
+        self.id = id_trabalho
+        self.pedido = pedido
+        self.estado = "na_fila"
+        self.eventos = deque(maxlen=JANELA_PROGRESSO)
+        self.assinantes = set()  # filas asyncio (limitadas) dos clientes acompanhando o progresso
+        self.cancelamento_pedido = False
+        self.criado = time.monotonic()
+        self.iniciado = self.terminado = None
+
+    def publicar(self, evento):
+        self.eventos.append(evento)
+        for fila in self.assinantes:
+            if fila.full():
+                fila.get_nowait()  # cliente lento: descarta o evento mais antigo, como a janela do trabalho
+            fila.put_nowait(evento)
+
+    def terminar(self, estado, resumo):
+        self.estado = estado
+        self.terminado = time.monotonic()
+        self.publicar({"estado": estado, **resumo})
+
+    def descricao(self):
+        descricao = {"id": self.id, "estado": self.estado, "pedido": self.pedido}
+        if self.iniciado is not None:
+            descricao["espera_s"] = round(self.iniciado - self.criado, 4)
+        if self.terminado is not None:
+            descricao["duracao_s"] = round(self.terminado - self.criado, 4)
+        if self.eventos:
+            descricao["ultimo_evento"] = self.eventos[-1]
+        return descricao
+
+
+def validar_pedido(dados):
+    """Completa um pedido com os valores padrão; levanta ValueError se ele for inválido."""
+    from lote import PARAMETROS_PADRAO
+
+    if not isinstance(dados, dict):
+        raise ValueError("O pedido deve ser um objeto JSON.")
+    parametros = dados.get("parametros", {})
+    if not isinstance(parametros, dict):
+        raise ValueError("'parametros' deve ser um objeto JSON.")
+    proibidos = [nome for nome in ("arquivo_eventos", "arquivo_coleta", "eco_console") if nome in parametros]
+    if proibidos:
+        raise ValueError(f"Parâmetros não aceitos pelo serviço: {', '.join(proibidos)}.")
+    pedido = {
+        "parametros": {**PARAMETROS_PADRAO, **parametros},
+        "seed": dados.get("seed"),
+        "passos": dados.get("passos", PASSOS_PADRAO),
+        "periodo": dados.get("periodo", PERIODO_PADRAO),
+        "parar_sem_progresso": dados.get("parar_sem_progresso"),
+    }
+    for nome in ("passos", "periodo"):
+        if not isinstance(pedido[nome], int) or pedido[nome] < 1:
+            raise ValueError(f"'{nome}' deve ser um inteiro positivo.")
+    return pedido
+
+
+class ServicoSimulacoes:
+    """Fila limitada de trabalhos distribuídos entre `trabalhadores` processos, com servidor HTTP.
+
+    Com a fila cheia, novos pedidos são recusados com 503 (contrapressão) em
+    vez de acumular memória. Trabalhos terminados ficam consultáveis até
+    serem os mais antigos além de `retencao`.
+    """
+
+    def __init__(self, trabalhadores=None, tamanho_fila=256, retencao=1000):
+        self.trabalhadores = trabalhadores or os.cpu_count() or 1
+        self.fila = asyncio.Queue(tamanho_fila)
+        self.trabalhos = {}
+        self.retencao = retencao
+        self._terminados = deque()
+        self._ids = itertools.count(1)
+        self._processos = []
+        self._despachantes = []
+        self._servidor = None
+        self.contadores = {"recebidos": 0, "rejeitados": 0, "concluida": 0, "cancelada": 0, "erro": 0}
+
+    async def iniciar(self, host="127.0.0.1", porta=8600):
+        """Inicia os processos de trabalho e o servidor HTTP; `porta=0` escolhe uma porta livre."""
+        laco = asyncio.get_running_loop()
+        contexto = multiprocessing.get_context("spawn")
+        for _ in range(self.trabalhadores):
+            processo = _Processo(contexto, laco)
+            self._processos.append(processo)
+            self._despachantes.append(asyncio.create_task(self._despachar(processo, contexto)))
+        self._servidor = await asyncio.start_server(self._atender, host, porta)
+        return self._servidor.sockets[0].getsockname()[1]
+
+    async def fechar(self):
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        for tarefa in self._despachantes:
+            tarefa.cancel()
+        await asyncio.gather(*self._despachantes, return_exceptions=True)
+        for processo in self._processos:
+            processo.fechar()
+        self._processos, self._despachantes = [], []
+
+    # ------------------------------------------------------------------
+    # Fila e despacho
+
+    def submeter(self, pedido):
+        trabalho = Trabalho(str(next(self._ids)), pedido)
+        try:
+            self.fila.put_nowait(trabalho)
+        except asyncio.QueueFull:
+            self.contadores["rejeitados"] += 1
+            raise FilaCheia from None
+        self.contadores["recebidos"] += 1
+        self.trabalhos[trabalho.id] = trabalho
+        return trabalho
+
+    def cancelar(self, trabalho):
+        if trabalho.estado == "na_fila":
+            self._terminar(trabalho, "cancelada", {})  # o despachante o descarta ao tirá-lo da fila
+        elif trabalho.estado == "executando" and not trabalho.cancelamento_pedido:
+            for processo in self._processos:
+                if processo.trabalho is trabalho:
+                    trabalho.cancelamento_pedido = True
+                    processo.enviar(("cancelar", trabalho.id))
+                    asyncio.get_running_loop().call_later(PRAZO_CANCELAMENTO, self._forcar_cancelamento,
+                                                          processo, trabalho)
+
+    @staticmethod
+    def _forcar_cancelamento(processo, trabalho):
+        """Encerra o processo que não atendeu ao cancelamento (um passo muito longo); o despachante o substitui."""
+        if processo.trabalho is trabalho and trabalho.estado == "executando":
+            processo.processo.terminate()
+
+    def _terminar(self, trabalho, estado, resumo):
+        trabalho.terminar(estado, resumo)
+        self.contadores[estado] += 1
+        self._terminados.append(trabalho.id)
+        while len(self._terminados) > self.retencao:
+            self.trabalhos.pop(self._terminados.popleft(), None)
+
+    async def _despachar(self, processo, contexto):
+        while True:
+            trabalho = await self.fila.get()
+            if trabalho.estado != "na_fila":
+                continue
+            trabalho.estado = "executando"
+            trabalho.iniciado = time.monotonic()
+            if not processo.processo.is_alive():
+                processo = self._renovar(processo, contexto)
+            processo.trabalho = trabalho
+            processo.enviar(("executar", trabalho.id, trabalho.pedido))
+            while True:
+                tipo, id_trabalho, dados = await processo.mensagens.get()
+                if id_trabalho is not None and id_trabalho != trabalho.id:
+                    continue  # mensagem atrasada de um trabalho anterior
+                if tipo == "progresso":
+                    trabalho.publicar(dados)
+                    continue
+                if tipo == "morto":
+                    # Processo caiu (ou foi encerrado pelo cancelamento) no meio do trabalho: põe outro no lugar
+                    if trabalho.cancelamento_pedido:
+                        self._terminar(trabalho, "cancelada", {})
+                    else:
+                        self._terminar(trabalho, "erro", dados)
+                    processo = self._renovar(processo, contexto)
+                else:
+                    self._terminar(trabalho, tipo, dados)
+                break
+            processo.trabalho = None
+
+    def _renovar(self, processo, contexto):
+        """Substitui um processo de trabalho que morreu."""
+        processo.trabalho = None
+        processo.fechar()
+        novo = _Processo(contexto, asyncio.get_running_loop())
+        self._processos[self._processos.index(processo)] = novo
+        return novo
+
+    # ------------------------------------------------------------------
+    # HTTP
+
+    def estado(self):
+        return {
+            "fila": self.fila.qsize(),
+            "limite_fila": self.fila.maxsize,
+            "trabalhadores": self.trabalhadores,
+            "executando": sum(1 for processo in self._processos if processo.trabalho is not None),
+            **self.contadores,
+        }
+
+    async def _atender(self, leitor, escritor):
+        try:
+            metodo, caminho, corpo = await _ler_pedido(leitor)
+            await self._rotear(metodo, caminho, corpo, escritor)
+        except ValueError as erro:
+            await _responder(escritor, HTTPStatus.BAD_REQUEST, {"erro": str(erro)})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _rotear(self, metodo, caminho, corpo, escritor):
+        partes = [parte for parte in caminho.split("?")[0].split("/") if parte]
+        if partes == ["estado"] and metodo == "GET":
+            return await _responder(escritor, HTTPStatus.OK, self.estado())
+        if partes == ["simulacoes"] and metodo == "POST":
+            pedido = validar_pedido(json.loads(corpo or b"{}"))
+            try:
+                trabalho = self.submeter(pedido)
+            except FilaCheia:
+                return await _responder(escritor, HTTPStatus.SERVICE_UNAVAILABLE,
+                                        {"erro": "fila cheia", "fila": self.fila.qsize()},
+                                        {"Retry-After": "1"})
+            return await _responder(escritor, HTTPStatus.ACCEPTED,
+                                    {"id": trabalho.id, "estado": trabalho.estado, "fila": self.fila.qsize()})
+        if len(partes) in (2, 3) and partes[0] == "simulacoes":
+            trabalho = self.trabalhos.get(partes[1])
+            if trabalho is None:
+                return await _responder(escritor, HTTPStatus.NOT_FOUND, {"erro": "trabalho desconhecido"})
+            if len(partes) == 2 and metodo == "GET":
+                return await _responder(escritor, HTTPStatus.OK, trabalho.descricao())
+            if len(partes) == 2 and metodo == "DELETE":
+                self.cancelar(trabalho)
+                return await _responder(escritor, HTTPStatus.OK, {"id": trabalho.id, "estado": trabalho.estado})
+            if partes[2:] == ["progresso"] and metodo == "GET":
+                return await self._transmitir(trabalho, escritor)
+        await _responder(escritor, HTTPStatus.NOT_FOUND, {"erro": "rota desconhecida"})
+
+    async def _transmitir(self, trabalho, escritor):
+        """Envia os eventos ainda guardados e os seguintes, um JSON por linha, até o fim do trabalho."""
+        fila = asyncio.Queue(JANELA_PROGRESSO)
+        for evento in trabalho.eventos:
+            fila.put_nowait(evento)
+        trabalho.assinantes.add(fila)
+        try:
+            escritor.write(_cabecalho(HTTPStatus.OK, {"Content-Type": "application/x-ndjson",
+                                                      "Transfer-Encoding": "chunked"}))
+            while True:
+                evento = await fila.get()
+                linha = json.dumps(evento, ensure_ascii=False).encode() + b"\n"
+                escritor.write(b"%x\r\n%s\r\n" % (len(linha), linha))
+                await escritor.drain()
+                if evento.get("estado") in ESTADOS_FINAIS:
+                    break
+            escritor.write(b"0\r\n\r\n")
+            await escritor.drain()
+        finally:
+            trabalho.assinantes.discard(fila)
+
+
+async def _ler_pedido(leitor):
+    linha = (await leitor.readline()).decode("latin-1").strip()
+    try:
+        metodo, caminho, _ = linha.split(" ", 2)
+    except ValueError:
+        raise ValueError("Linha de pedido HTTP inválida.") from None
+    cabecalhos = {}
+    while True:
+        cabecalho = (await leitor.readline()).decode("latin-1")
+        if cabecalho in ("\r\n", "\n", ""):
+            break
+        nome, _, valor = cabecalho.partition(":")
+        cabecalhos[nome.strip().lower()] = valor.strip()
+    tamanho = int(cabecalhos.get("content-length", 0))
+    corpo = await leitor.readexactly(tamanho) if tamanho else b""
+    return metodo.upper(), caminho, corpo
+
+
+def _cabecalho(status, cabecalhos):
+    linhas = [f"HTTP/1.1 {status.value} {status.phrase}", "Connection: close",
+              *(f"{nome}: {valor}" for nome, valor in cabecalhos.items())]
+    return ("\r\n".join(linhas) + "\r\n\r\n").encode("latin-1")
+
+
+async def _responder(escritor, status, dados, cabecalhos=None):
+    corpo = json.dumps(dados, ensure_ascii=False).encode()
+    escritor.write(_cabecalho(status, {"Content-Type": "application/json", "Content-Length": len(corpo),
+                                       **(cabecalhos or {})}) + corpo)
+    await escritor.drain()
+
+
+async def requisitar(porta, metodo, caminho, dados=None, host="127.0.0.1"):
+    """Cliente mínimo do serviço: retorna (status, JSON da resposta ou lista de eventos do progresso)."""
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    corpo = json.dumps(dados).encode() if dados is not None else b""
+    escritor.write(f"{metodo} {caminho} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(corpo)}\r\n\r\n"
+                   .encode("latin-1") + corpo)
+    await escritor.drain()
+    resposta = await leitor.read()
+    escritor.close()
+    cabecalho, _, corpo = resposta.partition(b"\r\n\r\n")
+    status = int(cabecalho.split(None, 2)[1])
+    if b"chunked" not in cabecalho.lower():
+        return status, json.loads(corpo)
+    eventos = []
+    while True:
+        tamanho, _, corpo = corpo.partition(b"\r\n")
+        tamanho = int(tamanho, 16)
+        if not tamanho:
+            return status, eventos
+        eventos.append(json.loads(corpo[:tamanho]))
+        corpo = corpo[tamanho + 2:]
+
+
+async def servir(host="127.0.0.1", porta=8600, trabalhadores=None, tamanho_fila=256):
+    servico = ServicoSimulacoes(trabalhadores, tamanho_fila)
+    porta = await servico.iniciar(host, porta)
+    print(f"Serviço de simulações em http://{host}:{porta} ({servico.trabalhadores} trabalhadores)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await servico.fechar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP/JSON local de simulações do PlanetaModelo.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8600)
+    parser.add_argument("--trabalhadores", type=int, default=None, help="padrão: todos os núcleos")
+    parser.add_argument("--tamanho-fila", type=int, default=256, help="trabalhos aguardando além disso recebem 503")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(servir(args.host, args.porta, args.trabalhadores, args.tamanho_fila))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+// Desenho do GridDelta (visualizacao_delta.py).
+//
+// Dois canvases sobrepostos: o de fundo guarda a camada estática (base,
+// estruturas e recursos) e só é alterado nas células que mudam; o da frente
+// é redesenhado a cada quadro com os agentes. No modo densidade, cada bloco
+// do grid vira um retângulo com opacidade proporcional à contagem da camada.
+const GridDelta = function (canvas_width, canvas_height) {
+  const parent = document.createElement("div");
+  parent.style.position = "relative";
+  parent.style.height = `${canvas_height}px`;
+  const criarCanvas = () => {
+    const canvas = document.createElement("canvas");
+    canvas.width = canvas_width;
+    canvas.height = canvas_height;
+    canvas.style.position = "absolute";
+    canvas.style.left = "0";
+    canvas.style.top = "0";
+    parent.appendChild(canvas);
+    return canvas.getContext("2d");
+  };
+  const fundo = criarCanvas();
+  const frente = criarCanvas();
+  document.getElementById("elements").appendChild(parent);
+
+  let largura = 1;
+  let altura = 1;
+  let celula = 1;
+  let estilos = [];
+  let estaticos = new Map(); // id -> [x, y, estilo]
+  let porCelula = new Map(); // "x,y" -> Set dos ids estáticos na célula
+  let agentes = new Map();
+  let motor = { estilo: null, pos: [] };
+  let densidade = null;
+
+  // O y do grid cresce para cima, como no CanvasGrid do Mesa
+  const px = (x) => x * celula;
+  const py = (y) => (altura - 1 - y) * celula;
+
+  const desenhar = (ctx, x, y, estilo) => {
+    const e = estilos[estilo];
+    if (!e) return;
+    ctx.fillStyle = e.Color;
+    ctx.strokeStyle = e.Color;
+    const cx = px(x) + celula / 2;
+    const cy = py(y) + celula / 2;
+    if (e.Shape === "rect") {
+      const w = (e.w || 1) * celula;
+      const h = (e.h || 1) * celula;
+      if (e.Filled === "true") ctx.fillRect(cx - w / 2, cy - h / 2, w, h);
+      else ctx.strokeRect(cx - w / 2, cy - h / 2, w, h);
+    } else {
+      ctx.beginPath();
+      ctx.arc(cx, cy, Math.max(0.5, ((e.r || 1) * celula) / 2), 0, 2 * Math.PI);
+      if (e.Filled === "true") ctx.fill();
+      else ctx.stroke();
+    }
+  };
+
+  const celulaDe = (x, y) => `${x},${y}`;
+
+  const porNaCelula = (id, x, y) => {
+    const chave = celulaDe(x, y);
+    let ids = porCelula.get(chave);
+    if (!ids) porCelula.set(chave, (ids = new Set()));
+    ids.add(id);
+  };
+
+  const tirarDaCelula = (id, x, y) => {
+    const chave = celulaDe(x, y);
+    const ids = porCelula.get(chave);
+    if (!ids) return;
+    ids.delete(id);
+    if (!ids.size) porCelula.delete(chave);
+  };
+
+  // Redesenha uma célula do fundo com os objetos estáticos que ainda estão nela
+  const redesenharCelula = (x, y) => {
+    fundo.clearRect(px(x), py(y), celula, celula);
+    const nela = [...(porCelula.get(celulaDe(x, y)) || [])].map((id) => estaticos.get(id));
+    nela.sort((a, b) => (estilos[a[2]].Layer || 0) - (estilos[b[2]].Layer || 0));
+    nela.forEach((o) => desenhar(fundo, o[0], o[1], o[2]));
+  };
+
+  const desenharFundo = () => {
+    fundo.clearRect(0, 0, canvas_width, canvas_height);
+    const ordenados = [...estaticos.values()].sort(
+      (a, b) => (estilos[a[2]].Layer || 0) - (estilos[b[2]].Layer || 0)
+    );
+    ordenados.forEach((o) => desenhar(fundo, o[0], o[1], o[2]));
+  };
+
+  const desenharFrente = () => {
+    frente.clearRect(0, 0, canvas_width, canvas_height);
+    for (const [x, y, estilo] of agentes.values()) desenhar(frente, x, y, estilo);
+    for (let i = 0; i < motor.pos.length; i += 2) desenhar(frente, motor.pos[i], motor.pos[i + 1], motor.estilo);
+  };
+
+  const completo = (data) => {
+    densidade = null;
+    largura = data.largura;
+    altura = data.altura;
+    celula = Math.min(canvas_width / largura, canvas_height / altura);
+    estilos = data.estilos;
+    estaticos = new Map(data.estaticos.map(([id, x, y, e]) => [id, [x, y, e]]));
+    porCelula = new Map();
+    for (const [id, [x, y]] of estaticos) porNaCelula(id, x, y);
+    agentes = new Map(data.agentes.map(([id, x, y, e]) => [id, [x, y, e]]));
+    motor = data.motor;
+    desenharFundo();
+    desenharFrente();
+  };
+
+  const delta = (data) => {
+    if (data.estilos) estilos = estilos.concat(data.estilos);
+    for (const id of data.removidos) {
+      const estatico = estaticos.get(id);
+      if (estatico) {
+        estaticos.delete(id);
+        tirarDaCelula(id, estatico[0], estatico[1]);
+        redesenharCelula(estatico[0], estatico[1]);
+      } else {
+        agentes.delete(id);
+      }
+    }
+    for (const [id, x, y] of data.movidos) {
+      const estatico = estaticos.get(id);
+      if (estatico) {
+        const [xa, ya] = estatico;
+        estatico[0] = x;
+        estatico[1] = y;
+        tirarDaCelula(id, xa, ya);
+        porNaCelula(id, x, y);
+        redesenharCelula(xa, ya);
+        redesenharCelula(x, y);
+      } else if (agentes.has(id)) {
+        const agente = agentes.get(id);
+        agente[0] = x;
+        agente[1] = y;
+      }
+    }
+    for (const [id, x, y, e] of data.adicionados) agentes.set(id, [x, y, e]);
+    if (data.motor) {
+      data.motor.indices.forEach((i, k) => {
+        motor.pos[2 * i] = data.motor.pos[2 * k];
+        motor.pos[2 * i + 1] = data.motor.pos[2 * k + 1];
+      });
+    }
+    desenharFrente();
+  };
+
+  // ------------------------------------------------------------------
+  // Modo densidade
+
+  const desenharDensidade = () => {
+    const [bx, by] = densidade.blocos;
+    const lado = Math.min(canvas_width / bx, canvas_height / by);
+    frente.clearRect(0, 0, canvas_width, canvas_height);
+    fundo.fillStyle = "white";
+    fundo.fillRect(0, 0, canvas_width, canvas_height);
+    for (const [nome, valores] of Object.entries(densidade.camadas)) {
+      const maximo = Math.max(1, ...valores);
+      const ctx = nome === "agentes" ? frente : fundo;
+      ctx.fillStyle = densidade.cores[nome];
+      valores.forEach((v, i) => {
+        if (!v) return;
+        ctx.globalAlpha = 0.15 + (0.85 * v) / maximo;
+        const x = Math.floor(i / by);
+        const y = i % by;
+        ctx.fillRect(x * lado, (by - 1 - y) * lado, lado, lado);
+      });
+      ctx.globalAlpha = 1;
+    }
+    const [xb, yb] = densidade.base;
+    const escala = lado * bx / largura;
+    frente.fillStyle = "black";
+    frente.fillRect(xb * escala - 2, (altura - 1 - yb) * escala - 2, 5, 5);
+  };
+
+  const completoDensidade = (data) => {
+    largura = data.largura;
+    altura = data.altura;
+    densidade = data;
+    desenharDensidade();
+  };
+
+  const deltaDensidade = (data) => {
+    for (const [nome, [indices, valores]] of Object.entries(data.camadas)) {
+      const camada = densidade.camadas[nome];
+      indices.forEach((i, k) => (camada[i] = valores[k]));
+    }
+    desenharDensidade();
+  };
+
+  this.render = (data) => {
+    switch (data.tipo) {
+      case "completo":
+        return completo(data);
+      case "delta":
+        return delta(data);
+      case "densidade":
+        return completoDensidade(data);
+      case "densidade_delta":
+        return deltaDensidade(data);
+      default:
+        return undefined; // "nada": quadro pulado
+    }
+  };
+
+  this.reset = () => {
+    fundo.clearRect(0, 0, canvas_width, canvas_height);
+    frente.clearRect(0, 0, canvas_width, canvas_height);
+  };
+};
@@ -0,0 +1,97 @@
+import heapq
+
+from navegacao import _DESLOCAMENTOS, INF
+
+
+class Viagem:
+    """Trecho de volta à base de um agente adormecido: de `origem`, partindo no passo `partida`, em `distancia` passos."""
+
+    __slots__ = ("agente", "origem", "partida", "distancia", "pos", "andados")
+
+    def __init__(self, agente, origem, partida, distancia):
+        self.agente = agente
+        self.origem = origem
+        self.partida = partida
+        self.distancia = distancia
+        self.pos = origem  # última posição materializada no grid
+        self.andados = 0  # passos do trecho já refletidos em `pos`
+
+
+class AgendaViagens:
+    """Avanço rápido das viagens de volta à base de agentes carregando recursos.
+
+    Seguindo o campo de distâncias da base, cada passo da viagem é
+    previsível: em vez de executar o step() do agente a cada passo, a agenda
+    calcula o passo de chegada e o põe para dormir numa fila de prioridade
+    (e no escalonador). O agente não é movido no grid durante a viagem; quem
+    precisa da posição (visualização, verificação de célula livre) chama
+    `materializar()`. Se um obstáculo muda, todas as viagens são interrompidas
+    e os agentes voltam a andar passo a passo.
+    """
+
+    def __init__(self, modelo):
+        self.modelo = modelo
+        self.fila = []  # heap de (passo de chegada, ordem, unique_id)
+        self.viagens = {}  # unique_id -> Viagem
+        self.concluido = 0  # último passo cuja fase dos agentes já terminou
+        self._ordem = 0
+        self.passos_poupados = 0
+
+    def __len__(self):
+        return len(self.viagens)
+
+    def dormindo(self, agente):
+        return agente.unique_id in self.viagens
+
+    def viajar(self, agente):
+        """Põe o agente para dormir até chegar à base; retorna False se o trecho não é previsível.
+
+        Chamado no step() do agente no lugar do primeiro passo da viagem, que
+        passa a contar como andado ao fim da fase dos agentes.
+        """
+        modelo = self.modelo
+        campo = modelo.navegacao.campo(modelo.base_pos)
+        distancia = int(campo.distancia[agente.pos])
+        if distancia < 2 or distancia == INF or campo.proximo[agente.pos] < 0:
+            return False
+        passo = modelo.passos
+        self.viagens[agente.unique_id] = Viagem(agente, agente.pos, passo, distancia)
+        # Chega à base no passo `passo + distancia - 1` e volta a agir no seguinte
+        heapq.heappush(self.fila, (passo + distancia, self._ordem, agente.unique_id))
+        self._ordem += 1
+        self.passos_poupados += distancia - 1
+        modelo.schedule.adormecer(agente)
+        return True
+
+    def acordar(self, passo):
+        """Acorda (já na base) os agentes cuja viagem termina até `passo`."""
+        while self.fila and self.fila[0][0] <= passo:
+            _, _, unique_id = heapq.heappop(self.fila)
+            viagem = self.viagens.pop(unique_id, None)
+            if viagem is not None:
+                self.modelo.grid.move_agent(viagem.agente, self.modelo.base_pos)
+                self.modelo.schedule.acordar(viagem.agente)
+
+    def acordar_todos(self):
+        """Interrompe todas as viagens, deixando cada agente onde estaria agora."""
+        self.materializar()
+        for viagem in self.viagens.values():
+            self.modelo.schedule.acordar(viagem.agente)
+        self.viagens.clear()
+        self.fila.clear()
+
+    def materializar(self):
+        """Move no grid os agentes adormecidos para a posição atual de suas viagens."""
+        if not self.viagens:
+            return
+        proximo = self.modelo.navegacao.campo(self.modelo.base_pos).proximo
+        for viagem in self.viagens.values():
+            andados = min(self.concluido - viagem.partida + 1, viagem.distancia)
+            if andados <= viagem.andados:
+                continue
+            x, y = viagem.pos
+            for _ in range(andados - viagem.andados):
+                dx, dy = _DESLOCAMENTOS[proximo[x, y]]
+                x, y = x + dx, y + dy
+            viagem.pos, viagem.andados = (x, y), andados
+            self.modelo.grid.move_agent(viagem.agente, viagem.pos)
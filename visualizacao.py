@@ -2,8 +2,10 @@ from mesa.visualization.modules import CanvasGrid
 from mesa.visualization.ModularVisualization import ModularServer
 from mesa.visualization import Slider
 from planet_model import PlanetaModelo
+from visualizacao_delta import GridDelta
 from mesa.visualization.modules import ChartModule
 from objetos import Recurso, BaseInicial, Estrutura
+from camada_recursos import RecursoLeve
 from agentes import (
     AgenteReativoSimples,
     AgenteBaseadoEmEstado,
@@ -16,7 +18,7 @@ def agent_portrayal(agent):
     """Define a aparência dos objetos e agentes no grid."""
     if isinstance(agent, BaseInicial):
         return {"Shape": "circle", "Filled": "true", "Color": "black", "Layer": 1, "r": 0.9}
-    elif isinstance(agent, Recurso):
+    elif isinstance(agent, (Recurso, RecursoLeve)):
         color_map = {"Cristal": "lightblue", "Metal": "grey", "Estrutura": "orange"}
         size_map = {"Cristal": 0.3, "Metal": 0.6, "Estrutura": 0.8}
         if agent.tipo in color_map and agent.tipo in size_map:
@@ -51,7 +53,20 @@ def agent_portrayal(agent):
         return {"Shape": "circle", "Filled": "true", "Color": "yellow", "Layer": 8, "r": 0.9}
     return {"Shape": "circle", "Filled": "true", "Color": "gray", "Layer": 2, "r": 0.3}
 
-def create_server():
+class GradeMaterializada(CanvasGrid):
+    """CanvasGrid que atualiza antes as posições dos agentes em viagem agendada (avanco_rapido)."""
+
+    def render(self, model):
+        model.materializar()
+        return super().render(model)
+
+def create_server(delta=False, pular_quadros=1):
+    """Monta o servidor web.
+
+    Com `delta`, usa o GridDelta (envio incremental e mapas de densidade),
+    que permite grids de até 500x500 nos sliders.
+    """
+    lado_maximo = 500 if delta else 20
 
     chart = ChartModule([
         {"Label": "AgenteReativoSimples", "Color": "red"},
@@ -62,8 +77,8 @@ def create_server():
 
     # Parâmetros configuráveis com sliders
     model_params = {
-        "width": Slider("Largura do Grid", 20, 10, 20, 1),
-        "height": Slider("Altura do Grid", 20, 10, 20, 1),
+        "width": Slider("Largura do Grid", 20, 10, lado_maximo, 1),
+        "height": Slider("Altura do Grid", 20, 10, lado_maximo, 1),
         "num_crystals": Slider("Número de Cristais", 30, 5, 50, 1),
         "num_metals": Slider("Número de Blocos de Metal", 15, 5, 30, 1),
         "num_structures": Slider("Número de Estruturas Antigas", 2, 1, 10, 1),
@@ -73,8 +88,11 @@ def create_server():
         "num_agentes_cooperativos": Slider("Agentes Cooperativos", 1, 0, 10, 1),
     }
 
-    # Tamanho padrão do grid na visualização (não depende do slider)
-    grid = CanvasGrid(agent_portrayal, 20, 20, 500, 500)
+    if delta:
+        grid = GridDelta(agent_portrayal, 500, 500, pular_quadros=pular_quadros)
+    else:
+        # Tamanho padrão do grid na visualização (não depende do slider)
+        grid = GradeMaterializada(agent_portrayal, 20, 20, 500, 500)
 
     server = ModularServer(
         PlanetaModelo,
@@ -85,7 +103,17 @@ def create_server():
     server.port = 8521
     return server
 
-server = create_server()
+_servidor = None
+
+
+def __getattr__(nome):
+    # `server` só é montado no primeiro acesso: importar o módulo não cria o servidor
+    global _servidor
+    if nome == "server":
+        if _servidor is None:
+            _servidor = create_server()
+        return _servidor
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
 
 if __name__ == "__main__":
-    server.launch()
+    create_server().launch()
@@ -0,0 +1,229 @@
+"""Grid da visualização web com envio incremental, para acompanhar grids grandes ao vivo.
+
+O CanvasGrid do Mesa gera o portrayal de todos os objetos a cada passo e manda
+a lista inteira ao navegador. O GridDelta manda as camadas estáticas (base,
+estruturas, recursos) uma única vez e, depois, só o que mudou: recursos
+retirados, estruturas movidas e posições dos agentes que andaram. O portrayal
+é calculado uma vez por classe (e tipo de recurso) e enviado como índice numa
+tabela de estilos.
+
+Quando o grid tem mais células do que cabem no canvas (menos de
+`pixels_minimos` por célula), o servidor agrega o grid em blocos e envia mapas
+de densidade por camada, também só com os blocos que mudaram.
+"""
+import os
+
+import numpy as np
+from mesa.visualization.ModularVisualization import VisualizationElement
+
+# Camadas do mapa de densidade e a cor usada para cada uma no navegador
+CAMADAS_DENSIDADE = {"recursos": "#4aa3df", "estruturas": "orange", "agentes": "red"}
+
+
+class GridDelta(VisualizationElement):
+    """Substituto do CanvasGrid que envia quadros completos só quando necessário e deltas no resto.
+
+    `pular_quadros` envia um quadro a cada N passos do modelo (nos demais o
+    navegador não redesenha nada). O tamanho do grid vem do modelo, então o
+    mesmo elemento serve para qualquer valor dos sliders de largura e altura.
+    """
+
+    local_includes = ["grid_delta.js"]
+    local_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+    def __init__(self, portrayal_method, canvas_width=500, canvas_height=500, pular_quadros=1, pixels_minimos=3):
+        self.portrayal_method = portrayal_method
+        self.canvas_width = canvas_width
+        self.canvas_height = canvas_height
+        self.pular_quadros = max(1, pular_quadros)
+        self.pixels_minimos = pixels_minimos
+        self.js_code = f"elements.push(new GridDelta({canvas_width}, {canvas_height}));"
+        self._modelo = None
+
+    # ------------------------------------------------------------------
+    # Estilos
+
+    def _estilo(self, obj):
+        """Índice do portrayal do objeto na tabela de estilos (um portrayal por classe e tipo)."""
+        chave = (type(obj), getattr(obj, "tipo", None))
+        indice = self._indices_estilo.get(chave)
+        if indice is None:
+            portrayal = dict(self.portrayal_method(obj) or {})
+            portrayal.pop("x", None)
+            portrayal.pop("y", None)
+            indice = self._indices_estilo[chave] = len(self._estilos)
+            self._estilos.append(portrayal)
+            self._estilos_novos.append(portrayal)
+        return indice
+
+    # ------------------------------------------------------------------
+    # Estado observado
+
+    def _agentes(self, model):
+        """Posições atuais dos agentes coletores: {id: (x, y)}."""
+        posicoes = {}
+        for agentes in (model.agentes_reativos, model.agentes_baseados_estado,
+                        model.agentes_baseados_objetivos, model.agentes_cooperativos):
+            for agente in agentes:
+                posicoes[agente.unique_id] = agente.pos
+        return posicoes
+
+    def _posicoes_motor(self, model):
+        motor = model.motor_reativo
+        return motor.pos.copy() if motor is not None else np.zeros((0, 2), dtype=np.int64)
+
+    # ------------------------------------------------------------------
+
+    def render(self, model):
+        if model is not self._modelo:
+            return self._quadro_completo(model)
+        if model.passos - self._passo_enviado < self.pular_quadros:
+            return {"tipo": "nada"}
+        self._passo_enviado = model.passos
+        model.materializar()
+        if self._densidade:
+            return self._quadro_densidade(model, completo=False)
+        return self._quadro_delta(model)
+
+    def _quadro_completo(self, model):
+        model.materializar()
+        self._modelo = model
+        self._passo_enviado = model.passos
+        self._indices_estilo = {}
+        self._estilos = []
+        self._estilos_novos = []
+
+        largura, altura = model.grid.width, model.grid.height
+        tamanho_celula = min(self.canvas_width / largura, self.canvas_height / altura)
+        self._densidade = tamanho_celula < self.pixels_minimos
+        if self._densidade:
+            return self._quadro_densidade(model, completo=True)
+
+        # Camada estática: base, BDI, estruturas e recursos disponíveis
+        self._recursos = {}
+        for recurso in model.indice_recursos:
+            self._recursos[recurso.unique_id] = recurso
+        self._retirados_lidos = len(model.recursos_retirados)
+        self._estruturas = {e.unique_id: e.pos for e in model.estruturas}
+        estaticos = [[model.base.unique_id, *model.base_pos, self._estilo(model.base)],
+                     [model.agente_bdi.unique_id, *model.base_pos, self._estilo(model.agente_bdi)]]
+        estaticos += [[e.unique_id, *e.pos, self._estilo(e)] for e in model.estruturas]
+        estaticos += [[uid, *r.pos, self._estilo(r)] for uid, r in self._recursos.items()]
+
+        self._posicoes = self._agentes(model)
+        agentes = [[uid, *pos, self._estilo(model.agents_by_id[uid])] for uid, pos in self._posicoes.items()]
+        self._motor = self._posicoes_motor(model)
+        estilo_motor = self._estilo_motor(model)
+
+        self._estilos_novos = []
+        return {
+            "tipo": "completo",
+            "largura": largura,
+            "altura": altura,
+            "estilos": self._estilos,
+            "estaticos": estaticos,
+            "agentes": agentes,
+            "motor": {"estilo": estilo_motor, "pos": self._motor.ravel().tolist()},
+        }
+
+    def _estilo_motor(self, model):
+        if model.motor_reativo is None:
+            return None
+        from agentes import AgenteReativoSimples
+        chave = (AgenteReativoSimples, None)
+        if chave not in self._indices_estilo:
+            # O motor não tem objetos por agente; o portrayal vem de um agente de exemplo, sem posição
+            exemplo = AgenteReativoSimples.__new__(AgenteReativoSimples)
+            self._indices_estilo[chave] = len(self._estilos)
+            portrayal = dict(self.portrayal_method(exemplo) or {})
+            self._estilos.append(portrayal)
+            self._estilos_novos.append(portrayal)
+        return self._indices_estilo[chave]
+
+    def _quadro_delta(self, model):
+        removidos, movidos, adicionados = [], [], []
+
+        # Recursos só saem do grid, e o modelo anota cada um que sai (ver retirar_recurso)
+        retirados = model.recursos_retirados
+        for uid in retirados[self._retirados_lidos:]:
+            if self._recursos.pop(uid, None) is not None:
+                removidos.append(uid)
+        self._retirados_lidos = len(retirados)
+
+        for estrutura in model.estruturas:
+            if self._estruturas.get(estrutura.unique_id) != estrutura.pos:
+                self._estruturas[estrutura.unique_id] = estrutura.pos
+                movidos.append([estrutura.unique_id, *estrutura.pos])
+
+        posicoes = self._agentes(model)
+        for uid, pos in posicoes.items():
+            anterior = self._posicoes.get(uid)
+            if anterior is None:
+                adicionados.append([uid, *pos, self._estilo(model.agents_by_id[uid])])
+            elif anterior != pos:
+                movidos.append([uid, *pos])
+        removidos += [uid for uid in self._posicoes if uid not in posicoes]
+        self._posicoes = posicoes
+
+        # Agentes do motor vetorizado: índices e novas posições dos que andaram
+        motor = self._posicoes_motor(model)
+        andaram = np.flatnonzero((motor != self._motor).any(axis=1)) if len(motor) == len(self._motor) else None
+        self._motor = motor
+
+        quadro = {"tipo": "delta", "removidos": removidos, "movidos": movidos, "adicionados": adicionados}
+        if andaram is not None and len(andaram):
+            quadro["motor"] = {"indices": andaram.tolist(), "pos": motor[andaram].ravel().tolist()}
+        if self._estilos_novos:
+            quadro["estilos"] = self._estilos_novos
+            self._estilos_novos = []
+        return quadro
+
+    # ------------------------------------------------------------------
+    # Modo densidade (grid maior que o canvas)
+
+    def _blocos(self, model):
+        lado = int(np.ceil(self.pixels_minimos / min(self.canvas_width / model.grid.width,
+                                                      self.canvas_height / model.grid.height)))
+        return lado, -(-model.grid.width // lado), -(-model.grid.height // lado)
+
+    def _contar(self, posicoes, lado, bx, by):
+        posicoes = np.asarray(posicoes, dtype=np.int64).reshape(-1, 2)
+        indices = (posicoes[:, 0] // lado) * by + posicoes[:, 1] // lado
+        return np.bincount(indices, minlength=bx * by).astype(np.int32)
+
+    def _quadro_densidade(self, model, completo):
+        lado, bx, by = self._blocos(model)
+        agentes = [pos for pos in self._agentes(model).values() if pos is not None]
+        if model.motor_reativo is not None:
+            agentes += model.motor_reativo.pos.tolist()
+        camadas = {"agentes": self._contar(agentes, lado, bx, by)}
+
+        # Recursos e estruturas só são recontados quando mudam
+        if completo or len(model.indice_recursos) != self._total_recursos:
+            camadas["recursos"] = self._contar([r.pos for r in model.indice_recursos], lado, bx, by)
+            self._total_recursos = len(model.indice_recursos)
+        estruturas = [e.pos for e in model.estruturas]
+        if completo or estruturas != self._pos_estruturas:
+            camadas["estruturas"] = self._contar(estruturas, lado, bx, by)
+            self._pos_estruturas = estruturas
+
+        if completo:
+            self._camadas = camadas
+            return {
+                "tipo": "densidade",
+                "largura": model.grid.width,
+                "altura": model.grid.height,
+                "blocos": [bx, by],
+                "base": list(model.base_pos),
+                "cores": CAMADAS_DENSIDADE,
+                "camadas": {nome: valores.tolist() for nome, valores in camadas.items()},
+            }
+
+        alteracoes = {}
+        for nome, valores in camadas.items():
+            mudaram = np.flatnonzero(valores != self._camadas[nome])
+            if len(mudaram):
+                alteracoes[nome] = [mudaram.tolist(), valores[mudaram].tolist()]
+            self._camadas[nome] = valores
+        return {"tipo": "densidade_delta", "camadas": alteracoes}
+